@@ -0,0 +1,35 @@
+# backend/api/endpoints/bandwidth_routes.py
+import asyncio
+from fastapi import APIRouter, Body
+from backend.api.models import BandwidthStatus, BandwidthUpdate
+from backend.utils.bandwidth import BandwidthLimiter, get_limiter
+
+router = APIRouter()
+
+async def _status(limiter: BandwidthLimiter) -> BandwidthStatus:
+    await limiter.exchange_usage() # Current rates of the other processes
+    global_rate, host_rates = limiter.total_rates()
+    return BandwidthStatus(
+        global_limit=limiter.global_limit,
+        per_host_limit=limiter.per_host_limit,
+        host_limits=limiter.host_limits,
+        global_rate=global_rate,
+        host_rates=host_rates,
+    )
+
+@router.get("/bandwidth", response_model=BandwidthStatus, summary="Get Bandwidth Limits and Rates")
+async def get_bandwidth():
+    """Returns the download bandwidth limits and the rates all worker processes are currently receiving."""
+    return await _status(get_limiter())
+
+@router.put("/bandwidth", response_model=BandwidthStatus, summary="Change Bandwidth Limits")
+async def update_bandwidth(update: BandwidthUpdate = Body(...)):
+    """
+    Changes download bandwidth limits (bytes per second, 0 = unlimited) without a restart.
+    Downloads in progress slow down or speed up right away; other worker
+    processes pick the new limits up within about a second.
+    """
+    limiter = get_limiter()
+    limiter.update(update.global_limit, update.per_host_limit, update.host_limits)
+    await asyncio.to_thread(limiter.save_settings)
+    return await _status(limiter)
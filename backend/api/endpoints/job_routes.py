@@ -0,0 +1,61 @@
+# backend/api/endpoints/job_routes.py
+from fastapi import APIRouter, Body, HTTPException, Query
+from typing import Optional
+from backend.api.models import JobInfo, JobStatusResponse
+from backend.api.endpoints.pdf_routes import (
+    RequestPayload, CHECK_STRATEGY_DESCRIPTION, CHECK_STRATEGY_PATTERN, HEAD_PRECHECK_DESCRIPTION,
+    PRIORITY_DESCRIPTION, PRIORITY_PATTERN, SKIP_UNCHANGED_DESCRIPTION, to_input_payload
+)
+from backend.services.job_service import job_manager, JOB_KIND_CHECK, JOB_KIND_DOWNLOAD
+from backend.services.scheduler import PRIORITY_BULK
+from backend import config
+
+router = APIRouter()
+
+def _or_404(job_id: str, info: Optional[JobInfo]) -> JobInfo:
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return info
+
+@router.post("/jobs/check-links", response_model=JobInfo, status_code=202, summary="Submit Link Check Job")
+async def submit_check_links_job(payload: RequestPayload = Body(...),
+                                 strategy: Optional[str] = Query(None, pattern=CHECK_STRATEGY_PATTERN, description=CHECK_STRATEGY_DESCRIPTION),
+                                 priority: str = Query(PRIORITY_BULK, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION)):
+    """
+    Accepts the same payload as /check-links, starts checking in the background,
+    and immediately returns a job id to poll.
+    """
+    return await job_manager.submit(JOB_KIND_CHECK, to_input_payload(payload), strategy=strategy, priority=priority)
+
+@router.post("/jobs/download-pdfs", response_model=JobInfo, status_code=202, summary="Submit Download Job")
+async def submit_download_pdfs_job(payload: RequestPayload = Body(...),
+                                   skip_unchanged: bool = Query(False, description=SKIP_UNCHANGED_DESCRIPTION),
+                                   head_precheck: Optional[bool] = Query(None, description=HEAD_PRECHECK_DESCRIPTION),
+                                   priority: str = Query(PRIORITY_BULK, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION)):
+    """
+    Accepts the same payload as /download-pdfs, starts downloading in the background,
+    and immediately returns a job id to poll.
+    """
+    return await job_manager.submit(JOB_KIND_DOWNLOAD, to_input_payload(payload),
+                                    skip_unchanged=skip_unchanged, head_precheck=head_precheck, priority=priority)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse, summary="Get Job Progress")
+async def get_job(job_id: str,
+                  offset: int = Query(0, ge=0, description="Index of the first result to return"),
+                  limit: Optional[int] = Query(None, ge=0, description="Maximum number of results to return")):
+    """
+    Returns job progress plus a page of results in completion order.
+    Poll with `offset` set to the number of results already received to fetch only new ones.
+    """
+    info = _or_404(job_id, await job_manager.get(job_id))
+    page_size = config.JOB_RESULTS_PAGE_SIZE if limit is None else min(limit, config.JOB_RESULTS_PAGE_SIZE)
+    return JobStatusResponse(
+        **info.model_dump(),
+        offset=offset,
+        results=await job_manager.results(job_id, offset, page_size),
+    )
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo, summary="Cancel Job")
+async def cancel_job(job_id: str):
+    """Cancels a running job. Results gathered before cancellation remain available."""
+    return _or_404(job_id, await job_manager.cancel(job_id))
@@ -0,0 +1,17 @@
+# backend/api/endpoints/metrics_routes.py
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from backend.utils import metrics
+from backend import config
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus Metrics")
+async def get_metrics():
+    """Counters, gauges and histograms for HTTP requests, downloads, retries, the link cache and disk writes."""
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
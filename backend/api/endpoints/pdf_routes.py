@@ -1,46 +1,222 @@
 # backend/api/endpoints/pdf_routes.py
-from fastapi import APIRouter, Body, Depends
-from typing import List, Union
+import asyncio
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from typing import Awaitable, List, Optional, TypeVar, Union
 from backend.api.models import (
-    Guideline, InputPayload, CheckLinksResponse, DownloadPDFsResponse
+    Guideline, InputPayload, CheckLinksResponse, DownloadPDFsResponse, GroupedResultsResponse
 )
-from backend.services.pdf_service import pdf_service, PdfService
+from backend.api.streaming import STREAM_FORMAT_NDJSON, STREAM_FORMATS_PATTERN, stream_results
+from backend.services.pdf_service import pdf_service, PdfService, StreamingBatch, CHECK_STRATEGIES
+from backend.services.scheduler import PRIORITIES, PRIORITY_BULK, PRIORITY_NORMAL
+from backend.utils import cancellation, download_layout
+from backend.utils.payload_stream import PayloadFormatError, iter_pdf_links
 
 router = APIRouter()
 
+R = TypeVar("R")
+
+# Non-standard status logged for requests whose client went away (as nginx does)
+CLIENT_CLOSED_REQUEST = 499
+
+RequestPayload = Union[Guideline, List[Guideline], InputPayload]
+
+SKIP_UNCHANGED_DESCRIPTION = (
+    "Revalidate files already in the download manifest with If-None-Match/If-Modified-Since "
+    "and report them as UNCHANGED instead of downloading them again."
+)
+
+HEAD_PRECHECK_DESCRIPTION = (
+    "Send a HEAD request before each download. Defaults to the server setting "
+    "(off: a single GET is validated before anything is written)."
+)
+
+CHECK_STRATEGY_PATTERN = f"^({'|'.join(CHECK_STRATEGIES)})$"
+CHECK_STRATEGY_DESCRIPTION = (
+    "'head' sends HEAD only; 'range' GETs the first kilobyte and verifies status, content type "
+    "and the %PDF- magic; 'head_then_range' falls back to that GET when HEAD is rejected "
+    "(403, 405, ...). Defaults to the server setting."
+)
+
+STREAM_DESCRIPTION = (
+    "Optional streaming mode. 'ndjson' emits one result object per line and 'sse' "
+    "emits Server-Sent Events, each as soon as that link finishes."
+)
+
+PRIORITY_PATTERN = f"^({'|'.join(PRIORITIES)})$"
+PRIORITY_DESCRIPTION = (
+    "Scheduling class: 'interactive' work (e.g. checks from the UI) is served first and may use "
+    "reserved slots, then 'normal', then 'bulk'."
+)
+
+TIMEOUT_DESCRIPTION = (
+    "Deadline in seconds from receipt of the request. Links still queued or in progress when it "
+    "passes are cancelled and reported as failed with 'Deadline exceeded'; interrupted downloads "
+    "keep their partial file for a later resume."
+)
+
+GROUP_BY_GUIDELINE = "guideline"
+GROUP_BY_DESCRIPTION = (
+    "'guideline' returns the results under each guideline of the request (with its metadata "
+    "and per-guideline counts) instead of one flat list. Shared links are still fetched once. "
+    "Cannot be combined with stream."
+)
+
+BULK_STREAM_DESCRIPTION = "Response format: 'ndjson' (default) or 'sse'."
+
+# The bulk routes read the raw body themselves; describe it for the OpenAPI docs
+BULK_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "description": "Guidelines as a JSON array, {\"data\": [...]}, a single object, or NDJSON. "
+                       "Only pdf_links/pdf_link are read from each guideline.",
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+def to_input_payload(payload: RequestPayload) -> InputPayload:
+    """Normalizes the accepted body formats into an InputPayload."""
+    # Convert single Guideline to InputPayload
+    if isinstance(payload, Guideline):
+        return InputPayload(data=[payload])
+    # Convert list to InputPayload if needed
+    if isinstance(payload, list):
+        return InputPayload(data=payload)
+    return payload
+
 # Dependency Injection could be used here for more complex scenarios,
 # but direct import is fine for this simple case.
 # async def get_pdf_service() -> PdfService:
 #     return pdf_service
 
-@router.post("/check-links", response_model=CheckLinksResponse, summary="Check PDF Link Accessibility")
-async def check_links_endpoint(payload: Union[Guideline, List[Guideline], InputPayload] = Body(...)):
+def _check_grouping(stream: Optional[str], group_by: Optional[str]) -> None:
+    if stream and group_by:
+        raise HTTPException(status_code=400, detail="group_by cannot be combined with stream")
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The body has been read, so the next message only arrives when the client goes away
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def _unless_disconnected(request: Request, work: Awaitable[R]) -> R:
+    """
+    Runs a batch for a non-streamed response, abandoning it if the client disconnects first.
+
+    Abandoned work stops at once: queued links are dropped, open downloads are
+    closed and their partial files removed. (Streamed responses are cancelled
+    by Starlette when the client goes away and stop the same way.)
+    """
+    task = asyncio.ensure_future(work)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, disconnected), return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError as exc:
+        await cancellation.stop_remaining((task,), exc)
+        raise
+    finally:
+        disconnected.cancel()
+    if not task.done():
+        await cancellation.stop_remaining((task,), None)
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client disconnected")
+    return task.result()
+
+def _grouped(payload: InputPayload, results: list) -> GroupedResultsResponse:
+    return GroupedResultsResponse(unique_links=len(results),
+                                  guidelines=pdf_service.group_by_guideline(payload, results))
+
+@router.post("/check-links", response_model=Union[CheckLinksResponse, GroupedResultsResponse],
+             summary="Check PDF Link Accessibility")
+async def check_links_endpoint(request: Request, payload: RequestPayload = Body(...),
+                               stream: Optional[str] = Query(None, pattern=STREAM_FORMATS_PATTERN, description=STREAM_DESCRIPTION),
+                               strategy: Optional[str] = Query(None, pattern=CHECK_STRATEGY_PATTERN, description=CHECK_STRATEGY_DESCRIPTION),
+                               priority: str = Query(PRIORITY_NORMAL, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION),
+                               timeout: Optional[float] = Query(None, gt=0, description=TIMEOUT_DESCRIPTION),
+                               group_by: Optional[str] = Query(None, pattern=f"^{GROUP_BY_GUIDELINE}$", description=GROUP_BY_DESCRIPTION)):
     """
     Accepts a JSON payload containing guidelines with PDF links, checks accessibility,
     and returns the status of each unique link.
     """
-    # Convert single Guideline to InputPayload
-    if isinstance(payload, Guideline):
-        payload = InputPayload(data=[payload])
-    # Convert list to InputPayload if needed
-    elif isinstance(payload, list):
-        payload = InputPayload(data=payload)
-        
-    results = await pdf_service.check_pdf_links(payload)
+    _check_grouping(stream, group_by)
+    payload = to_input_payload(payload)
+    if stream:
+        links = pdf_service.extract_pdf_links(payload)
+        checks = pdf_service.iter_link_checks(links, strategy=strategy, priority=priority, timeout=timeout)
+        return stream_results(checks, stream, event="link_status")
+    results = await _unless_disconnected(request, pdf_service.check_pdf_links(
+        payload, strategy=strategy, priority=priority, timeout=timeout))
+    if group_by:
+        return _grouped(payload, results)
     return CheckLinksResponse(results=results)
 
-@router.post("/download-pdfs", response_model=DownloadPDFsResponse, summary="Download Accessible PDFs")
-async def download_pdfs_endpoint(payload: Union[Guideline, List[Guideline], InputPayload] = Body(...)):
+@router.post("/download-pdfs", response_model=Union[DownloadPDFsResponse, GroupedResultsResponse],
+             summary="Download Accessible PDFs")
+async def download_pdfs_endpoint(request: Request, payload: RequestPayload = Body(...),
+                                 stream: Optional[str] = Query(None, pattern=STREAM_FORMATS_PATTERN, description=STREAM_DESCRIPTION),
+                                 skip_unchanged: bool = Query(False, description=SKIP_UNCHANGED_DESCRIPTION),
+                                 head_precheck: Optional[bool] = Query(None, description=HEAD_PRECHECK_DESCRIPTION),
+                                 priority: str = Query(PRIORITY_NORMAL, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION),
+                                 timeout: Optional[float] = Query(None, gt=0, description=TIMEOUT_DESCRIPTION),
+                                 group_by: Optional[str] = Query(None, pattern=f"^{GROUP_BY_GUIDELINE}$", description=GROUP_BY_DESCRIPTION)):
     """
     Accepts a JSON payload containing guidelines with PDF links,
     attempts to download them, and returns the status.
     """
-    # Convert single Guideline to InputPayload
-    if isinstance(payload, Guideline):
-        payload = InputPayload(data=[payload])
-    # Convert list to InputPayload if needed
-    elif isinstance(payload, list):
-        payload = InputPayload(data=payload)
-        
-    results = await pdf_service.download_pdf_files(payload)
-    return DownloadPDFsResponse(results=results) 
\ No newline at end of file
+    _check_grouping(stream, group_by)
+    payload = to_input_payload(payload)
+    if stream:
+        links = pdf_service.extract_pdf_links(payload)
+        downloads = pdf_service.iter_downloads(links, skip_unchanged=skip_unchanged, head_precheck=head_precheck,
+                                               placements=pdf_service.guideline_placements(payload),
+                                               priority=priority, timeout=timeout)
+        return stream_results(downloads, stream, event="download_status")
+    results = await _unless_disconnected(request, pdf_service.download_pdf_files(
+        payload, skip_unchanged=skip_unchanged, head_precheck=head_precheck, priority=priority, timeout=timeout))
+    if group_by:
+        return _grouped(payload, results)
+    return DownloadPDFsResponse(results=results)
+
+async def _read_bulk_body(batch: StreamingBatch) -> None:
+    """Waits until the request body has been read (work is already underway), mapping parse errors to 400."""
+    try:
+        await batch.wait_until_read()
+    except PayloadFormatError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid payload: {exc}")
+
+@router.post("/check-links/bulk", summary="Check PDF Links from a Streamed Payload",
+             openapi_extra=BULK_REQUEST_BODY)
+async def check_links_bulk_endpoint(request: Request,
+                                    stream: str = Query(STREAM_FORMAT_NDJSON, pattern=STREAM_FORMATS_PATTERN, description=BULK_STREAM_DESCRIPTION),
+                                    strategy: Optional[str] = Query(None, pattern=CHECK_STRATEGY_PATTERN, description=CHECK_STRATEGY_DESCRIPTION),
+                                    priority: str = Query(PRIORITY_BULK, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION),
+                                    timeout: Optional[float] = Query(None, gt=0, description=TIMEOUT_DESCRIPTION)):
+    """
+    Like /check-links, for very large payloads: the body is parsed incrementally and
+    checks start while it is still being uploaded. Guideline fields other than the
+    links are not validated. Results are always streamed.
+    """
+    batch = pdf_service.start_link_checks(iter_pdf_links(request.stream()), strategy=strategy,
+                                          priority=priority, timeout=timeout)
+    # The body must be fully consumed before the response starts streaming
+    await _read_bulk_body(batch)
+    return stream_results(batch, stream, event="link_status")
+
+@router.post("/download-pdfs/bulk", summary="Download PDFs from a Streamed Payload",
+             openapi_extra=BULK_REQUEST_BODY)
+async def download_pdfs_bulk_endpoint(request: Request,
+                                      stream: str = Query(STREAM_FORMAT_NDJSON, pattern=STREAM_FORMATS_PATTERN, description=BULK_STREAM_DESCRIPTION),
+                                      skip_unchanged: bool = Query(False, description=SKIP_UNCHANGED_DESCRIPTION),
+                                      head_precheck: Optional[bool] = Query(None, description=HEAD_PRECHECK_DESCRIPTION),
+                                      priority: str = Query(PRIORITY_BULK, pattern=PRIORITY_PATTERN, description=PRIORITY_DESCRIPTION),
+                                      timeout: Optional[float] = Query(None, gt=0, description=TIMEOUT_DESCRIPTION)):
+    """
+    Like /download-pdfs, for very large payloads: the body is parsed incrementally
+    and downloads start while it is still being uploaded. Results are always streamed.
+    """
+    placements = download_layout.new_placements()
+    batch = pdf_service.start_downloads(iter_pdf_links(request.stream(), placements), skip_unchanged=skip_unchanged,
+                                        head_precheck=head_precheck, placements=placements, priority=priority,
+                                        timeout=timeout)
+    await _read_bulk_body(batch)
+    return stream_results(batch, stream, event="download_status")
@@ -0,0 +1,83 @@
+"""Tests for the background job endpoints."""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend import config
+from backend.main import app
+from backend.utils import http_client
+
+PDF_HEAD = b"%PDF-1.7\n"
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    if "missing" in request.url.path:
+        return httpx.Response(404)
+    return httpx.Response(200, headers={"content-type": "application/pdf"}, content=PDF_HEAD)
+
+
+class TestJobRoutes(unittest.TestCase):
+    """Test cases for submitting, polling and cancelling jobs over HTTP."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        for name, value in (("JOB_STORE_PATH", root / "jobs.sqlite3"), ("LINK_CACHE_ENABLED", False),
+                            ("DOWNLOAD_DIR", root / "downloads"),
+                            ("BANDWIDTH_SETTINGS_PATH", root / "bandwidth.json"),
+                            ("BANDWIDTH_USAGE_PATH", root / "bandwidth_usage.sqlite3")):
+            patcher = mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(http_client, "build_http_client",
+                                    lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.urls = [f"https://origin.example/{name}.pdf" for name in ("a", "b", "c", "missing")]
+        self.payload = [{"id": 1, "url": "https://origin.example/", "domain": "origin.example",
+                         "pdf_links": self.urls}]
+
+    def _wait_for(self, client: TestClient, job_id: str) -> dict:
+        deadline = time.monotonic() + 10
+        while True:
+            info = client.get(f"/api/v1/jobs/{job_id}", params={"limit": 0}).json()
+            if info["state"] in ("COMPLETED", "FAILED", "CANCELLED") or time.monotonic() > deadline:
+                return info
+            time.sleep(0.05)
+
+    def test_submit_poll_and_page_results(self):
+        """A submitted check job runs in the background; its results are paged by offset and limit."""
+        with TestClient(app) as client:
+            response = client.post("/api/v1/jobs/check-links", json=self.payload)
+            self.assertEqual(response.status_code, 202)
+            job = response.json()
+            self.assertEqual((job["kind"], job["total"]), ("check-links", 4))
+
+            info = self._wait_for(client, job["job_id"])
+            self.assertEqual((info["state"], info["completed"]), ("COMPLETED", 4))
+            first = client.get(f"/api/v1/jobs/{job['job_id']}", params={"offset": 0, "limit": 3}).json()
+            rest = client.get(f"/api/v1/jobs/{job['job_id']}", params={"offset": 3}).json()
+        self.assertEqual((len(first["results"]), rest["offset"], len(rest["results"])), (3, 3, 1))
+        statuses = {result["url"]: result["status"] for result in first["results"] + rest["results"]}
+        self.assertEqual(statuses, {**{url: "OK" for url in self.urls[:3]}, self.urls[3]: "FAILED"})
+
+    def test_cancel_and_unknown_job(self):
+        """Cancelling a queued job marks it CANCELLED; unknown job ids are 404s."""
+        with mock.patch.object(config, "JOB_WORKER_ENABLED", False), TestClient(app) as client:
+            job = client.post("/api/v1/jobs/check-links", json=self.payload).json()
+            cancelled = client.delete(f"/api/v1/jobs/{job['job_id']}")
+            self.assertEqual((cancelled.status_code, cancelled.json()["state"]), (200, "CANCELLED"))
+            info = client.get(f"/api/v1/jobs/{job['job_id']}").json()
+            self.assertEqual((info["state"], info["results"]), ("CANCELLED", []))
+            self.assertEqual(client.get("/api/v1/jobs/no-such-job").status_code, 404)
+            self.assertEqual(client.delete("/api/v1/jobs/no-such-job").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
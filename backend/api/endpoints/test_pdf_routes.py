@@ -0,0 +1,74 @@
+"""Tests for the streamed responses of the link check endpoints."""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+from fastapi.testclient import TestClient
+
+from backend import config
+from backend.main import app
+from backend.utils import http_client
+
+PDF_HEAD = b"%PDF-1.7\n"
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    if "missing" in request.url.path:
+        return httpx.Response(404)
+    return httpx.Response(200, headers={"content-type": "application/pdf"}, content=PDF_HEAD)
+
+
+class TestStreamedChecks(unittest.TestCase):
+    """Test cases for /check-links with stream=ndjson and stream=sse."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        for name, value in (("JOB_STORE_PATH", root / "jobs.sqlite3"), ("JOB_WORKER_ENABLED", False),
+                            ("LINK_CACHE_ENABLED", False)):
+            patcher = mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(http_client, "build_http_client",
+                                    lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.urls = [f"https://origin.example/{name}.pdf" for name in ("a", "b", "missing")]
+        self.payload = [{"id": 1, "url": "https://origin.example/", "domain": "origin.example",
+                         "pdf_links": self.urls}]
+
+    def _statuses(self, results):
+        return {result["url"]: result["status"] for result in results}
+
+    def test_ndjson_stream(self):
+        """One JSON result per line, one line per link."""
+        with TestClient(app) as client:
+            response = client.post("/api/v1/check-links", params={"stream": "ndjson"}, json=self.payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        self.assertTrue(response.text.endswith("\n"))
+        results = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(self._statuses(results), {self.urls[0]: "OK", self.urls[1]: "OK", self.urls[2]: "FAILED"})
+
+    def test_sse_stream(self):
+        """A `link_status` event per link, then a `done` event carrying the count."""
+        with TestClient(app) as client:
+            response = client.post("/api/v1/check-links", params={"stream": "sse"}, json=self.payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertTrue(response.text.endswith("\n\n"))
+        events = [dict(line.split(": ", 1) for line in block.splitlines())
+                  for block in response.text.strip("\n").split("\n\n")]
+        self.assertEqual([event["event"] for event in events], ["link_status"] * 3 + ["done"])
+        self.assertEqual(self._statuses(json.loads(event["data"]) for event in events[:-1]),
+                         {self.urls[0]: "OK", self.urls[1]: "OK", self.urls[2]: "FAILED"})
+        self.assertEqual(json.loads(events[-1]["data"]), {"count": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, Field
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional, Union
 from datetime import datetime
 
 # --- Guideline Model ---
@@ -38,18 +38,78 @@ class InputPayload(BaseModel):
 class LinkStatus(BaseModel):
     url: str
     status: str # "OK", "FAILED"
+    resolved_url: Optional[str] = None # Canonical URL actually checked (viewer URLs resolved)
     status_code: Optional[int] = None
     error_message: Optional[str] = None
+    from_cache: bool = False # True when answered from the link cache without a full check
+    checked_with: Optional[str] = None # "HEAD" or "GET" (ranged probe); None when served from the cache
+    attempts: int = 1 # Requests made, including retries (0 when served from the cache)
+
+# Result statuses (LinkStatus or DownloadStatus) that count as a working link
+SUCCESS_STATUSES = ("OK", "DOWNLOADED", "UNCHANGED")
 
 class DownloadStatus(BaseModel):
     url: str
-    status: str # "DOWNLOADED", "FAILED_DOWNLOAD", "FAILED_CHECK"
+    status: str # "DOWNLOADED", "UNCHANGED", "FAILED_DOWNLOAD", "FAILED_CHECK"
+    resolved_url: Optional[str] = None # Canonical URL actually downloaded (viewer URLs resolved)
     file_path: Optional[str] = None # Relative path inside container
     error_message: Optional[str] = None
+    size_bytes: Optional[int] = None
+    sha256: Optional[str] = None
+    pdf_version: Optional[str] = None # From the %PDF-x.y header
+    page_count: Optional[int] = None # When it can be read without parsing the file (else None)
+    attempts: int = 1 # Requests made, including retries
 
 # --- Response Wrappers ---
 class CheckLinksResponse(BaseModel):
     results: List[LinkStatus]
 
 class DownloadPDFsResponse(BaseModel):
-    results: List[DownloadStatus] 
\ No newline at end of file
+    results: List[DownloadStatus]
+
+# --- Grouped Output Models ---
+class GuidelineResults(Guideline):
+    results: List[Union[LinkStatus, DownloadStatus]] = [] # One per unique valid link, in pdf_links order
+    links_total: int = 0
+    links_ok: int = 0 # "OK", "DOWNLOADED" or "UNCHANGED"
+    links_failed: int = 0
+    all_ok: bool = True # No failed links (also true for a guideline without links)
+    bytes_downloaded: Optional[int] = None # Sum of size_bytes over DOWNLOADED files; None for link checks
+
+class GroupedResultsResponse(BaseModel):
+    unique_links: int # Links fetched, each once however many guidelines list it
+    guidelines: List[GuidelineResults]
+
+# --- Job Models ---
+class JobInfo(BaseModel):
+    job_id: str
+    kind: str # "check-links", "download-pdfs"
+    state: str # "PENDING", "RUNNING", "COMPLETED", "FAILED", "CANCELLED"
+    total: int # Number of unique links in the job
+    completed: int = 0 # Number of links with a final result
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+class JobStatusResponse(JobInfo):
+    offset: int = 0 # Index of the first entry in `results`
+    results: List[Union[LinkStatus, DownloadStatus]] = []
+
+# --- Bandwidth Models ---
+BytesPerSecond = Annotated[float, Field(ge=0)]
+
+class BandwidthLimits(BaseModel):
+    # Bytes per second for all worker processes together; 0 = unlimited
+    global_limit: float = Field(0.0, ge=0)
+    per_host_limit: float = Field(0.0, ge=0) # Applies to hosts without their own entry in host_limits
+    host_limits: Dict[str, BytesPerSecond] = {}
+
+class BandwidthUpdate(BaseModel):
+    # Omitted fields keep their current value; host_limits replaces the whole table
+    global_limit: Optional[float] = Field(None, ge=0)
+    per_host_limit: Optional[float] = Field(None, ge=0)
+    host_limits: Optional[Dict[str, BytesPerSecond]] = None
+
+class BandwidthStatus(BandwidthLimits):
+    global_rate: float = 0.0 # Bytes per second received by all processes over the last few seconds
+    host_rates: Dict[str, float] = {} # Same, per host that sent data recently
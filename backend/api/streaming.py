@@ -0,0 +1,53 @@
+# backend/api/streaming.py
+import asyncio
+import json
+from typing import AsyncIterable, AsyncIterator, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Send
+
+from backend.utils import cancellation
+
+STREAM_FORMAT_NDJSON = "ndjson"
+STREAM_FORMAT_SSE = "sse"
+STREAM_FORMATS_PATTERN = f"^({STREAM_FORMAT_NDJSON}|{STREAM_FORMAT_SSE})$"
+
+async def _ndjson_lines(results: AsyncIterable[BaseModel]) -> AsyncIterator[str]:
+    async for result in results:
+        yield result.model_dump_json() + "\n"
+
+async def _sse_events(results: AsyncIterable[BaseModel], event: str) -> AsyncIterator[str]:
+    count = 0
+    async for result in results:
+        count += 1
+        yield f"event: {event}\ndata: {result.model_dump_json()}\n\n"
+    # Explicit terminator so clients can tell completion from a dropped connection
+    yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+
+class _ResultsResponse(StreamingResponse):
+    """
+    StreamingResponse that abandons (see cancellation) the work behind its
+    results when the client disconnects. Starlette stops the stream by
+    cancelling it with a cancel scope, which on its own is an interruption.
+    """
+
+    _stream_task: Optional[asyncio.Task] = None
+
+    async def stream_response(self, send: Send) -> None:
+        self._stream_task = asyncio.current_task()
+        await super().stream_response(send)
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await super().listen_for_disconnect(receive)
+        if self._stream_task is not None:
+            cancellation.mark_abandoned(self._stream_task)
+
+def stream_results(results: AsyncIterable[BaseModel], stream_format: str, event: str = "result") -> StreamingResponse:
+    """Wraps an async iterator of result models in an NDJSON or Server-Sent-Events response."""
+    if stream_format == STREAM_FORMAT_SSE:
+        return _ResultsResponse(
+            _sse_events(results, event),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return _ResultsResponse(_ndjson_lines(results), media_type="application/x-ndjson")
@@ -0,0 +1,153 @@
+"""
+Command-line batch runner that drives PdfService directly, without the HTTP API.
+
+Reads guideline payloads (JSON array, {"data": [...]}, single object or NDJSON)
+from files or stdin, checks or downloads every PDF link, and writes one result
+per link as NDJSON or CSV.
+
+Usage:
+    python -m backend.cli check finalized_guideline_slice.json --format csv -o results.csv
+    cat export.ndjson | python -m backend.cli download --output-dir ./downloads --skip-unchanged
+
+Exit codes:
+    0  every link succeeded (OK, DOWNLOADED or UNCHANGED)
+    1  at least one link failed
+    2  invalid arguments or unreadable/malformed input
+    130  interrupted
+"""
+import argparse
+import asyncio
+import csv
+import sys
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+from typing import AsyncIterator, IO, List, Optional, Sequence
+
+from backend import config
+
+EXIT_OK = 0
+EXIT_LINK_FAILURES = 1
+EXIT_BAD_INPUT = 2
+EXIT_INTERRUPTED = 130
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("check", "download"), help="Check link accessibility or download the PDFs")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="Payload files ('-' or none reads stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Results file (default: stdout)")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson", help="Results format (default: ndjson)")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help=f"Download directory (default: PDF_DOWNLOAD_DIR or {config.DOWNLOAD_DIR})")
+    parser.add_argument("--concurrency", type=int, default=config.MAX_CONCURRENT_REQUESTS,
+                        help=f"Requests in flight across all hosts (default {config.MAX_CONCURRENT_REQUESTS})")
+    parser.add_argument("--per-host", type=int, default=config.MAX_REQUESTS_PER_HOST,
+                        help=f"Requests in flight per host (default {config.MAX_REQUESTS_PER_HOST})")
+    parser.add_argument("--skip-unchanged", action="store_true", help="Download: revalidate files already in the manifest")
+    parser.add_argument("--head-precheck", action="store_true", default=None, help="Download: send a HEAD before each GET")
+    parser.add_argument("--strategy", choices=("head", "range", "head_then_range"), default=None,
+                        help=f"Check: HEAD, a 1 KB ranged GET, or HEAD falling back to the GET "
+                             f"(default: PDF_CHECK_STRATEGY or {config.CHECK_STRATEGY})")
+    parser.add_argument("--no-cache", action="store_true", help="Check: bypass the link check cache")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the summary to stderr")
+    return parser
+
+async def _read_chunks(inputs: Sequence[str]) -> AsyncIterator[bytes]:
+    """Yields the raw bytes of each input in turn, reading off the event loop."""
+    with ExitStack() as stack:
+        for name in inputs:
+            stream = sys.stdin.buffer if name == "-" else stack.enter_context(open(name, "rb"))
+            while True:
+                chunk = await asyncio.to_thread(stream.read, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            # Separate inputs so consecutive NDJSON files can't run together
+            yield b"\n"
+
+class ResultWriter:
+    """Writes result models as NDJSON lines or CSV rows."""
+
+    def __init__(self, stream: IO[str], output_format: str, fields: List[str]):
+        self.stream = stream
+        self._csv = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore") \
+            if output_format == "csv" else None
+        if self._csv:
+            self._csv.writeheader()
+
+    def write(self, result) -> None:
+        if self._csv:
+            self._csv.writerow(result.model_dump())
+        else:
+            self.stream.write(result.model_dump_json() + "\n")
+
+async def run(args: argparse.Namespace, output: IO[str]) -> int:
+    # Imported here so config overrides from the command line are in place first
+    from backend.api.models import SUCCESS_STATUSES, DownloadStatus, LinkStatus
+    from backend.services.pdf_service import PdfService
+    from backend.services.scheduler import HostScheduler
+    from backend.utils import download_layout, http_client
+    from backend.utils.bandwidth import close_limiter
+    from backend.utils.disk_writer import shutdown_executor
+    from backend.utils.download_manifest import close_manifest
+    from backend.utils.link_cache import close_link_cache
+    from backend.utils.payload_stream import PayloadFormatError, iter_pdf_links
+
+    service = PdfService(scheduler=HostScheduler(args.concurrency, args.per_host))
+    model = LinkStatus if args.command == "check" else DownloadStatus
+    writer = ResultWriter(output, args.format, list(model.model_fields))
+    total = failed = 0
+    try:
+        async with http_client.lifespan_manager(None):
+            if args.command == "check":
+                batch = service.start_link_checks(iter_pdf_links(_read_chunks(args.inputs)), strategy=args.strategy)
+            else:
+                placements = download_layout.new_placements()
+                batch = service.start_downloads(iter_pdf_links(_read_chunks(args.inputs), placements),
+                                                skip_unchanged=args.skip_unchanged,
+                                                head_precheck=args.head_precheck, placements=placements)
+            try:
+                async for result in batch:
+                    total += 1
+                    failed += result.status not in SUCCESS_STATUSES
+                    writer.write(result)
+            except (PayloadFormatError, OSError) as exc:
+                print(f"Invalid input: {exc}", file=sys.stderr)
+                return EXIT_BAD_INPUT
+    finally:
+        close_link_cache()
+        close_manifest()
+        close_limiter()
+        shutdown_executor()
+
+    if not args.quiet:
+        print(f"{args.command}: {total} links, {total - failed} succeeded, {failed} failed", file=sys.stderr)
+    return EXIT_LINK_FAILURES if failed else EXIT_OK
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_intermixed_args(argv) # Inputs may follow options
+    if args.concurrency < 1 or args.per_host < 1:
+        print("--concurrency and --per-host must be at least 1", file=sys.stderr)
+        return EXIT_BAD_INPUT
+    if args.output_dir is not None:
+        config.DOWNLOAD_DIR = args.output_dir.resolve()
+    if args.no_cache:
+        config.LINK_CACHE_ENABLED = False
+
+    try:
+        with ExitStack() as stack:
+            output = sys.stdout if args.output == "-" else \
+                stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+            # The service logs with print(); keep stdout for results only
+            stack.enter_context(redirect_stdout(sys.stderr))
+            return asyncio.run(run(args, output))
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except OSError as exc:
+        print(f"Cannot open output: {exc}", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,174 @@
+import os
 from pathlib import Path
 
+def _env_bool(name: str, default: bool) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default)))
+
 # Define the base directory for downloads within the container
 # The actual path '/app/downloads' will be used in Docker.
-# This setting could be made more complex (e.g., environment variables) if needed.
-DOWNLOAD_DIR = Path("/app/downloads") 
\ No newline at end of file
+# Modules read config.DOWNLOAD_DIR at call time, so the CLI can point it elsewhere.
+DOWNLOAD_DIR = Path(os.environ.get("PDF_DOWNLOAD_DIR", "/app/downloads"))
+
+# --- Concurrency / Scheduling ---
+# Upper bound on requests in flight across all hosts at any moment.
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("PDF_MAX_CONCURRENT_REQUESTS", "64"))
+# Upper bound on requests in flight against a single host, so one large
+# domain in a payload cannot monopolize the global budget or get us throttled.
+MAX_REQUESTS_PER_HOST = int(os.environ.get("PDF_MAX_REQUESTS_PER_HOST", "4"))
+# Slots of MAX_CONCURRENT_REQUESTS only interactive-priority work may take, so a
+# check from the UI starts at once even while bulk downloads fill the rest.
+INTERACTIVE_RESERVED_SLOTS = int(os.environ.get("PDF_INTERACTIVE_RESERVED_SLOTS", "4"))
+
+# --- HTTP Client ---
+# Connection pool shared by all requests. Keep HTTP_MAX_CONNECTIONS at or above
+# MAX_CONCURRENT_REQUESTS, otherwise requests queue for a connection (pool timeout).
+HTTP_MAX_CONNECTIONS = int(os.environ.get("PDF_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("PDF_HTTP_MAX_KEEPALIVE_CONNECTIONS", "40"))
+HTTP_KEEPALIVE_EXPIRY = _env_float("PDF_HTTP_KEEPALIVE_EXPIRY", 30.0)
+# Per-phase timeouts in seconds
+HTTP_CONNECT_TIMEOUT = _env_float("PDF_HTTP_CONNECT_TIMEOUT", 10.0)
+HTTP_READ_TIMEOUT = _env_float("PDF_HTTP_READ_TIMEOUT", 15.0)
+HTTP_WRITE_TIMEOUT = _env_float("PDF_HTTP_WRITE_TIMEOUT", 15.0)
+HTTP_POOL_TIMEOUT = _env_float("PDF_HTTP_POOL_TIMEOUT", 30.0)
+# Read timeout for download bodies (time allowed between received chunks)
+DOWNLOAD_READ_TIMEOUT = _env_float("PDF_DOWNLOAD_READ_TIMEOUT", 60.0)
+# HTTP/2 multiplexing; requires the optional 'h2' package.
+HTTP2_ENABLED = _env_bool("PDF_HTTP2_ENABLED", False)
+# Seconds to cache DNS lookups (0 disables the cache).
+DNS_CACHE_TTL = _env_float("PDF_DNS_CACHE_TTL", 300.0)
+
+# --- Retries ---
+# Attempts per request (including the first) for transient failures: connection
+# errors, timeouts, and the statuses in RETRY_STATUSES.
+RETRY_MAX_ATTEMPTS = int(os.environ.get("PDF_RETRY_MAX_ATTEMPTS", "3"))
+# Exponential backoff with full jitter: the n-th retry waits up to
+# min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**(n-1)) seconds.
+RETRY_BASE_DELAY = _env_float("PDF_RETRY_BASE_DELAY", 0.5)
+RETRY_MAX_DELAY = _env_float("PDF_RETRY_MAX_DELAY", 20.0)
+# Total seconds one link may spend on attempts and waits before giving up.
+RETRY_DEADLINE = _env_float("PDF_RETRY_DEADLINE", 90.0)
+# Retry-After values above this are not honored; the link fails instead.
+RETRY_MAX_RETRY_AFTER = _env_float("PDF_RETRY_MAX_RETRY_AFTER", 60.0)
+RETRY_STATUSES = tuple(
+    int(s) for s in os.environ.get("PDF_RETRY_STATUSES", "429,500,502,503,504").split(",") if s.strip()
+)
+
+# --- Host Protection ---
+# Stop sending requests to a host after this many consecutive connection failures
+# or 5xx responses; after CIRCUIT_RESET_TIMEOUT seconds a single probe is let through.
+CIRCUIT_BREAKER_ENABLED = _env_bool("PDF_CIRCUIT_BREAKER_ENABLED", True)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("PDF_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = _env_float("PDF_CIRCUIT_RESET_TIMEOUT", 30.0)
+# Per-host request rate (requests/second). Unlimited (or RATE_LIMIT_MAX_RPS when set)
+# until the host throttles (429, or 503 with Retry-After); then halved from the
+# observed rate, honoring Retry-After, and recovered gradually on success.
+RATE_LIMIT_ENABLED = _env_bool("PDF_RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_MAX_RPS = _env_float("PDF_RATE_LIMIT_MAX_RPS", 0.0)
+RATE_LIMIT_MIN_RPS = _env_float("PDF_RATE_LIMIT_MIN_RPS", 0.2)
+
+# --- Background Jobs ---
+# Finished jobs (and their results) kept for polling before eviction.
+MAX_RETAINED_JOBS = int(os.environ.get("PDF_MAX_RETAINED_JOBS", "100"))
+# Maximum number of results returned by a single job status poll.
+JOB_RESULTS_PAGE_SIZE = int(os.environ.get("PDF_JOB_RESULTS_PAGE_SIZE", "1000"))
+# Jobs, their queued links and results live in this SQLite file, shared by every
+# worker process on the host (uvicorn --workers N, python -m backend.worker).
+JOB_STORE_PATH = Path(os.environ.get("PDF_JOB_STORE_PATH", "/app/cache/jobs.sqlite3"))
+# Run a job worker inside each API process (disable to leave jobs to backend.worker processes).
+JOB_WORKER_ENABLED = _env_bool("PDF_JOB_WORKER_ENABLED", True)
+# Links a worker leases at most at once (0 = twice MAX_CONCURRENT_REQUESTS).
+JOB_WORKER_MAX_IN_FLIGHT = int(os.environ.get("PDF_JOB_WORKER_MAX_IN_FLIGHT", "0"))
+# Seconds a lease lasts without renewal; links of a crashed worker are handed out again after this.
+JOB_LEASE_SECONDS = _env_float("PDF_JOB_LEASE_SECONDS", 60.0)
+# Seconds between checks for newly queued work from other processes.
+JOB_POLL_INTERVAL = _env_float("PDF_JOB_POLL_INTERVAL", 1.0)
+# Seconds between batched writes of finished results to the store.
+JOB_RESULT_FLUSH_INTERVAL = _env_float("PDF_JOB_RESULT_FLUSH_INTERVAL", 0.2)
+
+# --- Link Checks ---
+# "head": HEAD only. "range": a GET for the first RANGE_PROBE_BYTES, verifying the
+# status, content type and %PDF- magic. "head_then_range": HEAD, falling back to the
+# ranged GET when the HEAD status is in RANGE_FALLBACK_STATUSES (servers that reject
+# or mishandle HEAD). Can be overridden per request with ?strategy=.
+CHECK_STRATEGY = os.environ.get("PDF_CHECK_STRATEGY", "head_then_range")
+RANGE_PROBE_BYTES = int(os.environ.get("PDF_RANGE_PROBE_BYTES", "1024"))
+RANGE_FALLBACK_STATUSES = tuple(
+    int(s) for s in os.environ.get("PDF_RANGE_FALLBACK_STATUSES", "400,403,404,405,406,501").split(",") if s.strip()
+)
+
+# --- Link Check Cache ---
+# Persistent cache of HEAD results keyed by the resolved PDF URL.
+LINK_CACHE_ENABLED = _env_bool("PDF_LINK_CACHE_ENABLED", True)
+LINK_CACHE_PATH = Path(os.environ.get("PDF_LINK_CACHE_PATH", "/app/cache/link_cache.sqlite3"))
+# Seconds a cached result is trusted without contacting the origin; after that it is revalidated.
+LINK_CACHE_TTL = float(os.environ.get("PDF_LINK_CACHE_TTL", str(6 * 60 * 60)))
+# Least recently used entries beyond this count are evicted.
+LINK_CACHE_MAX_ENTRIES = int(os.environ.get("PDF_LINK_CACHE_MAX_ENTRIES", "200000"))
+
+# --- Downloads ---
+# Issue a HEAD request before each GET. Off by default: the GET response headers are
+# validated before anything is written, which saves a round-trip per file.
+DOWNLOAD_HEAD_PRECHECK = _env_bool("PDF_DOWNLOAD_HEAD_PRECHECK", False)
+# Responses with these content types are rejected instead of saved as PDFs.
+REJECTED_CONTENT_TYPES = tuple(
+    t.strip().lower() for t in os.environ.get("PDF_REJECTED_CONTENT_TYPES", "text/html,application/xhtml+xml").split(",") if t.strip()
+)
+# Reject bodies that are not PDFs: no %PDF- header in the first kilobyte (checked
+# while streaming, so the rest is never fetched) or no %%EOF at the end. Also
+# extracts the PDF version and page count into download results.
+VALIDATE_PDF_CONTENT = _env_bool("PDF_VALIDATE_PDF_CONTENT", True)
+# Largest file accepted, in bytes (0 disables the limit).
+MAX_DOWNLOAD_BYTES = int(os.environ.get("PDF_MAX_DOWNLOAD_BYTES", str(1024 * 1024 * 1024)))
+# Times a download may resume (via HTTP Range) after the connection drops mid-file
+# within a single request. Partial files are also resumed by later requests.
+DOWNLOAD_RESUME_ATTEMPTS = int(os.environ.get("PDF_DOWNLOAD_RESUME_ATTEMPTS", "3"))
+# Manifest of downloaded files (URL -> path, size, validators, sha256) used to skip
+# unchanged files. When unset, a file inside DOWNLOAD_DIR is used.
+_manifest_path = os.environ.get("PDF_DOWNLOAD_MANIFEST_PATH")
+DOWNLOAD_MANIFEST_PATH = Path(_manifest_path) if _manifest_path else None
+# Store each distinct file once under DOWNLOAD_DIR/.blobs (named by SHA-256) and
+# expose it under its friendly name via a hardlink. Disable on filesystems where
+# hardlinks are unavailable to keep plain files (copies are used as a fallback).
+CONTENT_ADDRESSED_STORAGE = _env_bool("PDF_CONTENT_ADDRESSED_STORAGE", True)
+# Where files go inside DOWNLOAD_DIR: "flat" (all in one directory), "hashed"
+# (sharded into subdirectories by a hash of the URL, so no directory grows past
+# a few thousand entries) or "template" (directories from DOWNLOAD_LAYOUT_TEMPLATE).
+DOWNLOAD_LAYOUT = os.environ.get("PDF_DOWNLOAD_LAYOUT", "flat")
+# Subdirectory levels for "hashed", each named by two hex digits (256 directories per level).
+DOWNLOAD_SHARD_LEVELS = int(os.environ.get("PDF_DOWNLOAD_SHARD_LEVELS", "1"))
+# Directory template for "template". Fields: {domain}, {publish_year}, {guideline_id}
+# (from the guideline listing the link, when the request carries guidelines), {host}
+# and {shard} (the "hashed" subdirectories). The file name is always appended.
+DOWNLOAD_LAYOUT_TEMPLATE = os.environ.get("PDF_DOWNLOAD_LAYOUT_TEMPLATE", "{domain}/{publish_year}")
+
+# --- Bandwidth ---
+# Download body limits in bytes per second (0 = unlimited), enforced with token
+# buckets while reading and shared by all processes on the host (see
+# BANDWIDTH_USAGE_PATH). Adjustable at runtime via /api/v1/bandwidth.
+BANDWIDTH_LIMIT = _env_float("PDF_BANDWIDTH_LIMIT", 0.0)
+BANDWIDTH_PER_HOST_LIMIT = _env_float("PDF_BANDWIDTH_PER_HOST_LIMIT", 0.0)
+# Seconds of traffic at the limit that may arrive in one burst.
+BANDWIDTH_BURST_SECONDS = _env_float("PDF_BANDWIDTH_BURST_SECONDS", 1.0)
+# Limits changed at runtime are saved here and picked up by every process sharing the file.
+BANDWIDTH_SETTINGS_PATH = Path(os.environ.get("PDF_BANDWIDTH_SETTINGS_PATH", "/app/cache/bandwidth.json"))
+# Current receive rates of each process, so processes sharing this file split the limits between them.
+BANDWIDTH_USAGE_PATH = Path(os.environ.get("PDF_BANDWIDTH_USAGE_PATH", "/app/cache/bandwidth_usage.sqlite3"))
+
+# --- Disk I/O ---
+# Worker threads that perform file writes (and hashing) for downloads, off the event loop.
+DISK_WRITER_THREADS = int(os.environ.get("PDF_DISK_WRITER_THREADS", "8"))
+# Re-chunk response bodies to this many bytes before buffering (0 = use chunks as they
+# arrive from the socket, which avoids a copy and keeps every received byte resumable).
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("PDF_DOWNLOAD_CHUNK_SIZE", "0"))
+# Bytes buffered per file before a (vectored) write is handed to the writer threads.
+WRITE_BUFFER_SIZE = int(os.environ.get("PDF_WRITE_BUFFER_SIZE", str(1024 * 1024)))
+
+# --- Metrics ---
+# Prometheus-style metrics at GET /metrics (HTTP latency per host, bytes, pool
+# utilization, retries, cache hits, disk write time, operation timings).
+METRICS_ENABLED = _env_bool("PDF_METRICS_ENABLED", True)
+# Also print one JSON line per link check / download with its phase timings.
+METRICS_LOG_SPANS = _env_bool("PDF_METRICS_LOG_SPANS", False)
@@ -1,18 +1,43 @@
 # backend/main.py
 from fastapi import FastAPI
-from backend.api.endpoints import pdf_routes
+from contextlib import asynccontextmanager
+from backend.api.endpoints import pdf_routes, job_routes, bandwidth_routes, metrics_routes
+from backend import config
+from backend.services.job_service import job_manager
+from backend.services.job_store import close_job_store
+from backend.utils.bandwidth import close_limiter
 from backend.utils.http_client import lifespan_manager
+from backend.utils.link_cache import close_link_cache
+from backend.utils.download_manifest import close_manifest
+from backend.utils.disk_writer import shutdown_executor
+
+@asynccontextmanager
+async def app_lifespan(app):
+    """Starts shared resources and stops background jobs before they are torn down."""
+    async with lifespan_manager(app):
+        if config.JOB_WORKER_ENABLED:
+            job_manager.start_worker()
+        yield
+        await job_manager.shutdown()
+    close_job_store()
+    close_link_cache()
+    close_manifest()
+    close_limiter()
+    shutdown_executor()
 
 # Create FastAPI app instance with lifespan management for the HTTP client
 app = FastAPI(
     title="PdfDownloader API",
     description="Check and download PDF links.",
     version="0.1.0",
-    lifespan=lifespan_manager # Register lifespan context manager
+    lifespan=app_lifespan # Register lifespan context manager
 )
 
 # Include the API router
 app.include_router(pdf_routes.router, prefix="/api/v1") # Add a version prefix
+app.include_router(job_routes.router, prefix="/api/v1")
+app.include_router(bandwidth_routes.router, prefix="/api/v1")
+app.include_router(metrics_routes.router) # Unversioned, where scrapers expect it
 
 @app.get("/", summary="Health Check")
 async def read_root():
@@ -0,0 +1,220 @@
+# backend/services/job_service.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dataclasses import asdict
+from itertools import groupby
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from backend import config
+from backend.utils import cancellation
+from backend.api.models import DownloadStatus, InputPayload, JobInfo, LinkStatus
+from backend.services.job_store import (
+    JOB_KIND_CHECK, JOB_KIND_DOWNLOAD, JobStore, JobTask, get_job_store
+)
+from backend.services.pdf_service import PdfService, pdf_service
+from backend.utils.download_layout import Placement
+from backend.utils.link_index import link_key
+
+logger = logging.getLogger(__name__)
+
+JobResult = Union[LinkStatus, DownloadStatus]
+
+def runner_for(service: PdfService, kind: str) -> Callable[..., AsyncIterator[JobResult]]:
+    """The PdfService iterator that processes links of a job kind."""
+    if kind == JOB_KIND_CHECK:
+        return service.iter_link_checks
+    if kind == JOB_KIND_DOWNLOAD:
+        return service.iter_downloads
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+class JobWorker:
+    """
+    Works through queued job links from the shared JobStore in this process.
+
+    Every process (uvicorn worker or `python -m backend.worker`) runs one, so a
+    large job is spread across processes and cores. Links are leased in small
+    batches and the leases renewed while they run; results are written back in
+    batches. A worker that dies simply stops renewing, and its links are
+    handed to the others once the lease expires.
+    """
+
+    def __init__(self, store: JobStore, service: PdfService, worker_id: Optional[str] = None,
+                 max_in_flight: Optional[int] = None, lease_seconds: Optional[float] = None,
+                 poll_interval: Optional[float] = None):
+        self.store = store
+        self.service = service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Enough queued work to keep the scheduler busy while results are written back
+        self.max_in_flight = max_in_flight or config.JOB_WORKER_MAX_IN_FLIGHT or 2 * service.scheduler.max_concurrency
+        self.lease_seconds = lease_seconds or config.JOB_LEASE_SECONDS
+        self.poll_interval = poll_interval or config.JOB_POLL_INTERVAL
+        self._in_flight = 0
+        self._groups: Dict[asyncio.Task, str] = {} # Running batch -> job id
+        self._finished: List[Tuple[JobTask, JobResult]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    def wake(self) -> None:
+        """Claims new work now instead of at the next poll (e.g. after a local submit)."""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stops claiming, abandons running links and hands them back to the queue."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self) -> None:
+        housekeeping = asyncio.create_task(self._housekeeping())
+        try:
+            while True:
+                # Claim in batches rather than one link per transaction
+                free = self.max_in_flight - self._in_flight
+                if free >= max(1, self.max_in_flight // 4):
+                    try:
+                        tasks = await self.store.claim(self.worker_id, free, self.lease_seconds)
+                    except Exception as exc:
+                        logger.warning("Job worker could not claim work: %s - %s", type(exc).__name__, exc)
+                        tasks = []
+                    for job_id, group in groupby(tasks, key=lambda task: task.job_id):
+                        self._start_batch(job_id, list(group))
+                    if tasks and len(tasks) == free:
+                        continue # Probably more queued; claim again once there is room
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            housekeeping.cancel()
+            batches = list(self._groups)
+            for batch in batches:
+                batch.cancel()
+            await asyncio.gather(housekeeping, *batches, return_exceptions=True)
+            await asyncio.shield(self._shutdown_store())
+
+    async def _shutdown_store(self) -> None:
+        await self._flush()
+        await self.store.release(self.worker_id)
+
+    def _start_batch(self, job_id: str, tasks: List[JobTask]) -> None:
+        self._in_flight += len(tasks)
+        batch = asyncio.create_task(self._run_batch(job_id, tasks))
+        self._groups[batch] = job_id
+        batch.add_done_callback(self._groups.pop)
+
+    async def _run_batch(self, job_id: str, tasks: List[JobTask]) -> None:
+        """Processes one job's claimed links through the service."""
+        pending = {task.url: task for task in tasks}
+        options = dict(tasks[0].options)
+        placements = {link_key(task.url): Placement(**task.placement) for task in tasks if task.placement}
+        if placements:
+            options["placements"] = placements
+        try:
+            runner = runner_for(self.service, tasks[0].kind)
+            async for result in runner(list(pending), **options):
+                task = pending.pop(result.url, None)
+                if task is not None:
+                    self._finished.append((task, result))
+                    self._in_flight -= 1
+                    self._wakeup.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception("Job %s failed: %s - %s", job_id, type(exc).__name__, exc)
+            await self.store.fail(job_id, f"Unexpected job error: {str(exc)}")
+        finally:
+            self._in_flight -= len(pending)
+            self._wakeup.set()
+
+    async def _flush(self) -> None:
+        if self._finished:
+            finished, self._finished = self._finished, []
+            try:
+                await self.store.complete(self.worker_id, finished)
+            except BaseException:
+                self._finished[:0] = finished
+                raise
+
+    async def _housekeeping(self) -> None:
+        """Writes results back, renews leases and stops batches of cancelled jobs."""
+        loop = asyncio.get_running_loop()
+        next_renewal = 0.0
+        while True:
+            await asyncio.sleep(config.JOB_RESULT_FLUSH_INTERVAL)
+            try:
+                await self._flush()
+                if loop.time() >= next_renewal:
+                    next_renewal = loop.time() + self.lease_seconds / 3
+                    stopped = await self.store.renew(self.worker_id, self.lease_seconds)
+                    for batch, job_id in list(self._groups.items()):
+                        if job_id in stopped:
+                            cancellation.abandon(batch)
+            except Exception as exc:
+                # Keep going: unsaved results are retried on the next round
+                logger.warning("Job worker housekeeping failed: %s - %s", type(exc).__name__, exc)
+
+
+class JobManager:
+    """Submits, tracks and cancels background batches kept in the shared JobStore."""
+
+    def __init__(self, service: PdfService, max_retained_jobs: int = 100):
+        self.service = service
+        self.max_retained_jobs = max_retained_jobs
+        self.worker: Optional[JobWorker] = None
+
+    @property
+    def store(self) -> JobStore:
+        return get_job_store()
+
+    def start_worker(self) -> None:
+        """Starts this process's JobWorker (called from the app lifespan)."""
+        if self.worker is None:
+            self.worker = JobWorker(self.store, self.service)
+            self.worker.start()
+
+    async def submit(self, kind: str, payload: InputPayload, **options: Any) -> JobInfo:
+        """Queues a job for the payload's links; any worker process may pick it up.
+
+        Keyword options are passed through to the PdfService iterator for the job kind.
+        """
+        runner_for(self.service, kind) # Reject unknown kinds before storing anything
+        urls = sorted(self.service.extract_pdf_links(payload))
+        # Guideline fields go with each link, since workers only see the links
+        placements = self.service.guideline_placements(payload) if kind == JOB_KIND_DOWNLOAD else None
+        task_placements = {url: asdict(placements[link_key(url)]) for url in urls
+                           if link_key(url) in placements} if placements else None
+        info = await self.store.create_job(uuid.uuid4().hex, kind, urls, options, self.max_retained_jobs,
+                                           task_placements)
+        if self.worker is not None:
+            self.worker.wake()
+        return info
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        return await self.store.get_info(job_id)
+
+    async def results(self, job_id: str, offset: int, limit: int) -> List[JobResult]:
+        """Results in completion order."""
+        return await self.store.get_results(job_id, offset, limit)
+
+    async def cancel(self, job_id: str) -> Optional[JobInfo]:
+        """Cancels an unfinished job. Results collected so far are kept."""
+        return await self.store.cancel(job_id)
+
+    async def shutdown(self) -> None:
+        """Stops this process's worker. Unfinished jobs stay queued for other workers or the next start."""
+        if self.worker is not None:
+            await self.worker.stop()
+            self.worker = None
+
+
+# Instantiate the manager for use in the API layer
+job_manager = JobManager(pdf_service, max_retained_jobs=config.MAX_RETAINED_JOBS)
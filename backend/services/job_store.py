@@ -0,0 +1,328 @@
+# backend/services/job_store.py
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from backend import config
+from backend.api.models import DownloadStatus, JobInfo, LinkStatus
+from backend.utils.sqlite_store import SqliteStore
+
+JOB_KIND_CHECK = "check-links"
+JOB_KIND_DOWNLOAD = "download-pdfs"
+
+FINISHED_STATES = ("COMPLETED", "FAILED", "CANCELLED")
+
+_RESULT_MODELS = {JOB_KIND_CHECK: LinkStatus, JOB_KIND_DOWNLOAD: DownloadStatus}
+
+@dataclass
+class JobTask:
+    """One link of a job, leased to a worker until it reports a result."""
+    job_id: str
+    seq: int
+    url: str
+    kind: str
+    options: Dict[str, Any]
+    placement: Optional[Dict[str, Any]] = None # Guideline fields for the "template" download layout
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+class JobStore(ABC):
+    """
+    Shared job state: jobs, their links as a work queue, and results in completion order.
+
+    Workers claim links under a lease, keep the lease alive while working, and
+    report results; links whose lease expires (the worker died) are handed out
+    again. Any process can submit, poll or cancel a job. SqliteJobStore covers a
+    single host; other backends implement the same methods.
+    """
+
+    @abstractmethod
+    async def create_job(self, job_id: str, kind: str, urls: Sequence[str], options: Dict[str, Any],
+                         max_retained: int, placements: Optional[Mapping[str, Dict[str, Any]]] = None) -> JobInfo:
+        """Records a job with one queued task per URL, evicting the oldest finished jobs beyond max_retained.
+
+        placements maps URLs to the JSON-ready placement handed back with their tasks.
+        """
+
+    @abstractmethod
+    async def get_info(self, job_id: str) -> Optional[JobInfo]:
+        """The job's progress, or None if it is unknown (or was evicted)."""
+
+    @abstractmethod
+    async def get_results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        """Results in completion order, starting at offset."""
+
+    @abstractmethod
+    async def cancel(self, job_id: str) -> Optional[JobInfo]:
+        """Marks an unfinished job CANCELLED; its queued links are no longer handed out."""
+
+    @abstractmethod
+    async def fail(self, job_id: str, error_message: str) -> None:
+        """Marks an unfinished job FAILED with error_message."""
+
+    @abstractmethod
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[JobTask]:
+        """Leases up to limit queued (or abandoned) links, oldest job first."""
+
+    @abstractmethod
+    async def complete(self, worker_id: str, results: Iterable[Tuple[JobTask, Any]]) -> None:
+        """Stores results for leased tasks; tasks whose lease was lost meanwhile are ignored."""
+
+    @abstractmethod
+    async def renew(self, worker_id: str, lease_seconds: float) -> Set[str]:
+        """Extends the worker's leases. Returns ids of its jobs that are no longer running."""
+
+    @abstractmethod
+    async def release(self, worker_id: str) -> None:
+        """Returns the worker's unfinished tasks to the queue (clean shutdown)."""
+
+class SqliteJobStore(JobStore, SqliteStore):
+    """JobStore in a SQLite file (WAL mode), shared by every worker process on the host."""
+
+    def __init__(self, path: Path):
+        SqliteStore.__init__(self, path, [
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                options TEXT NOT NULL,
+                state TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                error_message TEXT
+            )""",
+            """CREATE TABLE IF NOT EXISTS job_tasks (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                placement TEXT,
+                PRIMARY KEY (job_id, seq)
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_job_tasks_state ON job_tasks (state, lease_expires)",
+            """CREATE TABLE IF NOT EXISTS job_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                result TEXT NOT NULL
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_job_results_job ON job_results (job_id, id)",
+        ])
+        # Stores written before placements were kept lack their column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_tasks)")}
+        if "placement" not in columns:
+            self._conn.execute("ALTER TABLE job_tasks ADD COLUMN placement TEXT")
+            self._conn.commit()
+
+    def _write(self):
+        # Take the write lock up front so concurrent processes serialize cleanly
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def _info(self, job_id: str) -> Optional[JobInfo]:
+        row = self._conn.execute(
+            "SELECT job_id, kind, state, total, completed, created_at, finished_at, error_message "
+            "FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return JobInfo(job_id=row[0], kind=row[1], state=row[2], total=row[3], completed=row[4],
+                       created_at=_timestamp(row[5]), finished_at=_timestamp(row[6]), error_message=row[7])
+
+    def _create_job(self, job_id: str, kind: str, urls: Sequence[str], options: Dict[str, Any],
+                    max_retained: int, placements: Optional[Mapping[str, Dict[str, Any]]]) -> JobInfo:
+        now = time.time()
+        placements = placements or {}
+        self._write()
+        try:
+            self._evict_finished(max_retained - 1)
+            empty = not urls
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, options, state, total, created_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(options), "COMPLETED" if empty else "PENDING", len(urls), now,
+                 now if empty else None),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_tasks (job_id, seq, url, state, placement) VALUES (?, ?, ?, 'PENDING', ?)",
+                ((job_id, seq, url, json.dumps(placements[url]) if url in placements else None)
+                 for seq, url in enumerate(urls)),
+            )
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        return self._info(job_id)
+
+    def _evict_finished(self, keep: int) -> None:
+        """Deletes the oldest finished jobs (with their tasks and results) so at most `keep` jobs remain."""
+        excess = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - max(keep, 0)
+        if excess <= 0:
+            return
+        placeholders = ",".join("?" * len(FINISHED_STATES))
+        doomed = [row[0] for row in self._conn.execute(
+            f"SELECT job_id FROM jobs WHERE state IN ({placeholders}) ORDER BY created_at LIMIT ?",
+            (*FINISHED_STATES, excess),
+        )]
+        for table in ("job_results", "job_tasks", "jobs"):
+            self._conn.executemany(f"DELETE FROM {table} WHERE job_id = ?", ((job_id,) for job_id in doomed))
+
+    def _get_results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        row = self._conn.execute("SELECT kind FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or limit <= 0:
+            return []
+        model = _RESULT_MODELS[row[0]]
+        return [model.model_validate_json(result) for (result,) in self._conn.execute(
+            "SELECT result FROM job_results WHERE job_id = ? ORDER BY id LIMIT ? OFFSET ?",
+            (job_id, limit, offset),
+        )]
+
+    def _set_finished(self, job_id: str, state: str, error_message: Optional[str] = None) -> None:
+        placeholders = ",".join("?" * len(FINISHED_STATES))
+        self._conn.execute(
+            f"UPDATE jobs SET state = ?, finished_at = ?, error_message = COALESCE(?, error_message) "
+            f"WHERE job_id = ? AND state NOT IN ({placeholders})",
+            (state, time.time(), error_message, job_id, *FINISHED_STATES),
+        )
+        self._conn.commit()
+
+    def _cancel(self, job_id: str) -> Optional[JobInfo]:
+        self._set_finished(job_id, "CANCELLED")
+        return self._info(job_id)
+
+    def _claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[JobTask]:
+        now = time.time()
+        self._write()
+        try:
+            rows = self._conn.execute(
+                "SELECT t.job_id, t.seq, t.url, j.kind, j.options, t.placement "
+                "FROM job_tasks t JOIN jobs j ON j.job_id = t.job_id "
+                "WHERE j.state IN ('PENDING', 'RUNNING') "
+                "AND (t.state = 'PENDING' OR (t.state = 'LEASED' AND t.lease_expires < ?)) "
+                "ORDER BY j.created_at, t.seq LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE job_tasks SET state = 'LEASED', lease_owner = ?, lease_expires = ? "
+                "WHERE job_id = ? AND seq = ?",
+                ((worker_id, now + lease_seconds, job_id, seq) for job_id, seq, *_ in rows),
+            )
+            self._conn.executemany("UPDATE jobs SET state = 'RUNNING' WHERE job_id = ? AND state = 'PENDING'",
+                                   {(row[0],) for row in rows})
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        options: Dict[str, Dict[str, Any]] = {}
+        return [JobTask(job_id, seq, url, kind, options.setdefault(job_id, json.loads(raw)),
+                        json.loads(placement) if placement else None)
+                for job_id, seq, url, kind, raw, placement in rows]
+
+    def _complete(self, worker_id: str, results: List[Tuple[JobTask, str]]) -> None:
+        self._write()
+        try:
+            finished_jobs = set()
+            for task, result in results:
+                updated = self._conn.execute(
+                    "UPDATE job_tasks SET state = 'DONE', lease_owner = NULL, lease_expires = NULL "
+                    "WHERE job_id = ? AND seq = ? AND state = 'LEASED' AND lease_owner = ?",
+                    (task.job_id, task.seq, worker_id),
+                ).rowcount
+                if not updated:
+                    continue # Lease expired and the task went to another worker
+                self._conn.execute("INSERT INTO job_results (job_id, result) VALUES (?, ?)", (task.job_id, result))
+                self._conn.execute("UPDATE jobs SET completed = completed + 1 WHERE job_id = ?", (task.job_id,))
+                finished_jobs.add(task.job_id)
+            self._conn.executemany(
+                "UPDATE jobs SET state = 'COMPLETED', finished_at = ? "
+                "WHERE job_id = ? AND state = 'RUNNING' AND completed >= total",
+                ((time.time(), job_id) for job_id in finished_jobs),
+            )
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def _renew(self, worker_id: str, lease_seconds: float) -> Set[str]:
+        self._write()
+        try:
+            stopped = {row[0] for row in self._conn.execute(
+                "SELECT DISTINCT t.job_id FROM job_tasks t JOIN jobs j ON j.job_id = t.job_id "
+                "WHERE t.lease_owner = ? AND t.state = 'LEASED' AND j.state NOT IN ('PENDING', 'RUNNING')",
+                (worker_id,),
+            )}
+            # Leases on cancelled or failed jobs are dropped rather than renewed
+            self._conn.executemany(
+                "UPDATE job_tasks SET state = 'PENDING', lease_owner = NULL, lease_expires = NULL "
+                "WHERE lease_owner = ? AND state = 'LEASED' AND job_id = ?",
+                ((worker_id, job_id) for job_id in stopped),
+            )
+            self._conn.execute(
+                "UPDATE job_tasks SET lease_expires = ? WHERE lease_owner = ? AND state = 'LEASED'",
+                (time.time() + lease_seconds, worker_id),
+            )
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        return stopped
+
+    def _release(self, worker_id: str) -> None:
+        self._conn.execute(
+            "UPDATE job_tasks SET state = 'PENDING', lease_owner = NULL, lease_expires = NULL "
+            "WHERE lease_owner = ? AND state = 'LEASED'", (worker_id,),
+        )
+        self._conn.commit()
+
+    async def create_job(self, job_id: str, kind: str, urls: Sequence[str], options: Dict[str, Any],
+                         max_retained: int, placements: Optional[Mapping[str, Dict[str, Any]]] = None) -> JobInfo:
+        return await self._run(self._create_job, job_id, kind, urls, options, max_retained, placements)
+
+    async def get_info(self, job_id: str) -> Optional[JobInfo]:
+        return await self._run(self._info, job_id)
+
+    async def get_results(self, job_id: str, offset: int, limit: int) -> List[Any]:
+        return await self._run(self._get_results, job_id, offset, limit)
+
+    async def cancel(self, job_id: str) -> Optional[JobInfo]:
+        return await self._run(self._cancel, job_id)
+
+    async def fail(self, job_id: str, error_message: str) -> None:
+        await self._run(self._set_finished, job_id, "FAILED", error_message)
+
+    async def claim(self, worker_id: str, limit: int, lease_seconds: float) -> List[JobTask]:
+        return await self._run(self._claim, worker_id, limit, lease_seconds)
+
+    async def complete(self, worker_id: str, results: Iterable[Tuple[JobTask, Any]]) -> None:
+        serialized = [(task, result.model_dump_json()) for task, result in results]
+        if serialized:
+            await self._run(self._complete, worker_id, serialized)
+
+    async def renew(self, worker_id: str, lease_seconds: float) -> Set[str]:
+        return await self._run(self._renew, worker_id, lease_seconds)
+
+    async def release(self, worker_id: str) -> None:
+        await self._run(self._release, worker_id)
+
+# Global store instance, opened lazily on first use
+_store: Optional[JobStore] = None
+
+def get_job_store() -> JobStore:
+    """Returns the shared job store, opening it on first use."""
+    global _store
+    if _store is None:
+        _store = SqliteJobStore(config.JOB_STORE_PATH)
+    return _store
+
+def close_job_store() -> None:
+    """Closes the shared job store if it was opened."""
+    global _store
+    if _store is not None:
+        _store.close()
+    _store = None
@@ -1,110 +1,612 @@
 # backend/services/pdf_service.py
 import asyncio
+import functools
+import time
+import weakref
 import httpx
-from typing import List, Set
-from backend.api.models import InputPayload, LinkStatus, DownloadStatus
-from backend.utils import http_client, file_utils
-from backend.config import DOWNLOAD_DIR
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generic, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar, Union
+from pydantic import BaseModel
+from backend.api.models import SUCCESS_STATUSES, GuidelineResults, InputPayload, LinkStatus, DownloadStatus
+from backend.utils import http_client, file_utils, link_cache, blob_store, metrics, pdf_inspect, download_layout, cancellation, disk_writer
+from backend.utils.file_lock import PathLock
+from backend.utils.download_layout import Placement
+from backend.utils.download_manifest import ManifestEntry, get_manifest
+from backend.utils.link_index import LinkIndex, link_key
+from backend.utils.payload_stream import pdf_links_in
+from backend.utils.retry import RetryPolicy, RetryState, raise_for_retryable_status
+from backend import config
+from backend.services.scheduler import DeadlineExceeded, HostScheduler, Urgency, create_scheduler
+
+T = TypeVar("T", bound=BaseModel)
+
+# How link checks reach the origin: HEAD only, a small ranged GET only, or HEAD
+# with a ranged GET when the HEAD answer is one servers commonly get wrong
+CHECK_STRATEGY_HEAD = "head"
+CHECK_STRATEGY_RANGE = "range"
+CHECK_STRATEGY_HEAD_THEN_RANGE = "head_then_range"
+CHECK_STRATEGIES = (CHECK_STRATEGY_HEAD, CHECK_STRATEGY_RANGE, CHECK_STRATEGY_HEAD_THEN_RANGE)
+
+def _for_input(result: T, url: str, target: str) -> T:
+    """A target's result as reported for one of the input URLs that resolve to it."""
+    return result.model_copy(update={"url": url, "resolved_url": target})
+
+class StreamingBatch(Generic[T]):
+    """
+    Work scheduled from an async source of links while the source is still being read.
+
+    Reading starts immediately in a background task and every new canonical target
+    is scheduled as soon as it arrives; later inputs resolving to a known target
+    reuse its result. Iterating the batch yields one result per input in
+    completion order once the source is exhausted; results that finished earlier
+    are queued. Stopping iteration early abandons the remaining work.
+    """
+
+    def __init__(self, links: AsyncIterable[str], schedule: Callable[[str], Awaitable[T]]):
+        self.total = 0 # Distinct input URLs read so far
+        self._schedule = schedule
+        self._index = LinkIndex()
+        self._finished: Dict[str, Tuple[asyncio.Future, str]] = {} # dedup key -> (task, target)
+        self._tasks: Set[asyncio.Future] = set()
+        self._done: "asyncio.Queue[Tuple[asyncio.Future, str, str]]" = asyncio.Queue()
+        self._reader = asyncio.create_task(self._read(links))
+
+    async def _read(self, links: AsyncIterable[str]) -> None:
+        async for url in links:
+            key = self._index.add(url)
+            if key is None:
+                continue
+            self.total += 1
+            if key in self._finished:
+                task, target = self._finished[key]
+                self._done.put_nowait((task, url, target))
+            elif len(self._index.originals(key)) == 1:
+                target = self._index.target(key)
+                task = asyncio.ensure_future(self._schedule(target))
+                self._tasks.add(task)
+                task.add_done_callback(functools.partial(self._on_done, key, target))
+
+    def _on_done(self, key: str, target: str, task: asyncio.Future) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        self._finished[key] = (task, target)
+        for url in self._index.originals(key):
+            self._done.put_nowait((task, url, target))
+
+    async def wait_until_read(self) -> None:
+        """Waits for the source to be exhausted, re-raising any error it raised."""
+        try:
+            await self._reader
+        except BaseException as exc:
+            await self.cancel(exc)
+            raise
+
+    async def cancel(self, reason: Optional[BaseException] = None) -> None:
+        """Stops reading and abandons the outstanding work (see cancellation.stop_remaining)."""
+        self._reader.cancel()
+        await cancellation.stop_remaining(list(self._tasks), reason)
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        await self.wait_until_read()
+        try:
+            for _ in range(self.total):
+                task, url, target = await self._done.get()
+                yield _for_input(task.result(), url, target)
+        except BaseException as exc:
+            # Consumer stopped early (or was cancelled): don't leave work running
+            await self.cancel(exc)
+            raise
 
 class PdfService:
 
+    def __init__(self, scheduler: Optional[HostScheduler] = None, retry_policy: Optional[RetryPolicy] = None):
+        # Shared across requests so the concurrency caps hold service-wide
+        self.scheduler = scheduler or create_scheduler()
+        self.retry_policy = retry_policy or RetryPolicy.from_config()
+        # One writer per resolved URL, since downloads of the same URL share a staging file.
+        # Other processes are kept out by a PathLock on the file being written.
+        self._download_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def guideline_links(item: Any) -> List[str]:
+        """The valid-looking PDF links of one guideline, without duplicates, in input order."""
+        # If the item is a Guideline object, access the pdf_links attribute directly
+        if hasattr(item, 'pdf_links') and isinstance(item.pdf_links, list):
+            links = (link for link in item.pdf_links
+                     if link and isinstance(link, str) and link.lower().startswith(('http://', 'https://')))
+        # For backward compatibility with dictionary inputs
+        elif isinstance(item, dict):
+            # pdf_links array, or pdf_link for backward compatibility
+            links = pdf_links_in(item)
+        else:
+            return []
+        return list(dict.fromkeys(links))
+
     def extract_pdf_links(self, payload: InputPayload) -> Set[str]:
         """Extracts unique, valid-looking PDF links from the payload."""
         pdf_links = set()
         for item in payload.data:
-            # If the item is a Guideline object, access the pdf_links attribute directly
-            if hasattr(item, 'pdf_links') and isinstance(item.pdf_links, list):
-                for link in item.pdf_links:
-                    if link and isinstance(link, str) and link.lower().startswith(('http://', 'https://')):
-                        pdf_links.add(link)
-            # For backward compatibility with dictionary inputs
-            elif isinstance(item, dict):
-                # Check for pdf_links array
-                if 'pdf_links' in item and isinstance(item['pdf_links'], list):
-                    for link in item['pdf_links']:
-                        if link and isinstance(link, str) and link.lower().startswith(('http://', 'https://')):
-                            pdf_links.add(link)
-                # Also check for pdf_link for backward compatibility
-                elif 'pdf_link' in item:
-                    link = item.get('pdf_link')
-                    if link and isinstance(link, str) and link.lower().startswith(('http://', 'https://')):
-                        pdf_links.add(link)
+            pdf_links.update(self.guideline_links(item))
         return pdf_links
 
-    async def check_pdf_links(self, payload: InputPayload) -> List[LinkStatus]:
-        """Checks the status of PDF links extracted from the payload."""
+    def guideline_placements(self, payload: InputPayload) -> Optional[Dict[str, Placement]]:
+        """Guideline fields to file each link under, for the "template" download layout.
+
+        Keyed by link_key(); a link listed by several guidelines goes with the first.
+        None when the configured layout does not use guideline fields.
+        """
+        placements = download_layout.new_placements()
+        if placements is None:
+            return None
+        for item in payload.data:
+            links = self.guideline_links(item)
+            if links:
+                placement = Placement.for_guideline(item)
+                for link in links:
+                    placements.setdefault(link_key(link), placement)
+        return placements
+
+    def group_by_guideline(self, payload: InputPayload,
+                           results: Iterable[Union[LinkStatus, DownloadStatus]]) -> List[GuidelineResults]:
+        """
+        Regroups results of a batch under the guidelines whose links they answer.
+
+        Each unique link was fetched once; a link shared by several guidelines
+        reports the same result under each of them. Guidelines keep their
+        request order and metadata, with per-guideline counts added.
+        """
+        by_url = {result.url: result for result in results}
+        grouped = []
+        for item in payload.data:
+            fields = item.model_dump() if isinstance(item, BaseModel) else dict(item)
+            links = [by_url[link] for link in self.guideline_links(item) if link in by_url]
+            ok = sum(result.status in SUCCESS_STATUSES for result in links)
+            downloaded = None
+            if any(isinstance(result, DownloadStatus) for result in links):
+                downloaded = sum(result.size_bytes or 0 for result in links if result.status == "DOWNLOADED")
+            grouped.append(GuidelineResults(
+                **fields,
+                results=links,
+                links_total=len(links),
+                links_ok=ok,
+                links_failed=len(links) - ok,
+                all_ok=ok == len(links),
+                bytes_downloaded=downloaded,
+            ))
+        return grouped
+
+    def _schedule(self, worker: Callable[[str], Awaitable[T]], expired: Callable[[str, DeadlineExceeded], T],
+                  priority: Optional[str], timeout: Optional[float]) -> Callable[[str], Awaitable[T]]:
+        """Binds a per-target worker to a batch's priority and deadline (timeout seconds from now)."""
+        return functools.partial(self._scheduled, worker=worker, expired=expired,
+                                 urgency=Urgency.create(priority, timeout))
+
+    async def _scheduled(self, target: str, worker: Callable[[str], Awaitable[T]],
+                         expired: Callable[[str, DeadlineExceeded], T], urgency: Urgency) -> T:
+        """Runs worker(target) once the scheduler grants a slot for the target's host.
+
+        Work still queued or running at the batch deadline is cancelled and
+        reported through expired() instead of using up slots and bandwidth.
+        """
+        try:
+            return await self.scheduler.run(target, lambda: worker(target), urgency)
+        except DeadlineExceeded as exc:
+            metrics.DEADLINES_EXCEEDED.inc(stage="running" if exc.started else "queued")
+            return expired(target, exc)
+
+    async def _run_target(self, index: LinkIndex, key: str, schedule: Callable[[str], Awaitable[T]]) -> List[T]:
+        """Fetches one canonical target and reports its result for every input resolving to it."""
+        target = index.target(key)
+        result = await schedule(target)
+        return [_for_input(result, url, target) for url in index.originals(key)]
+
+    async def _gather(self, pdf_links: Iterable[str], schedule: Callable[[str], Awaitable[T]]) -> List[T]:
+        index = LinkIndex(pdf_links)
+        tasks = [asyncio.ensure_future(self._run_target(index, key, schedule)) for key, _ in index.items()]
+        try:
+            groups = await asyncio.gather(*tasks)
+        except BaseException as exc:
+            # gather() returns as soon as one task is cancelled; stop (and wait for) the rest too
+            await cancellation.stop_remaining(tasks, exc)
+            raise
+        return [result for group in groups for result in group]
+
+    async def _iter_completed(self, pdf_links: Iterable[str],
+                              schedule: Callable[[str], Awaitable[T]]) -> AsyncIterator[T]:
+        """Schedules work once per canonical target and yields results in completion order."""
+        index = LinkIndex(pdf_links)
+        tasks = [asyncio.ensure_future(self._run_target(index, key, schedule)) for key, _ in index.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    yield result
+        except BaseException as exc:
+            # Consumer stopped early (or was cancelled): don't leave work running
+            await cancellation.stop_remaining(tasks, exc)
+            raise
+
+    # Every batch method also takes priority (one of scheduler.PRIORITIES, default
+    # "normal") and timeout: seconds from the call after which links still queued
+    # or running are cancelled and reported as failed (None: no deadline).
+
+    def _check_schedule(self, strategy: Optional[str], priority: Optional[str],
+                        timeout: Optional[float]) -> Callable[[str], Awaitable[LinkStatus]]:
+        worker = functools.partial(self._check_single_link, strategy=strategy)
+        return self._schedule(worker, self._check_expired, priority, timeout)
+
+    def _download_schedule(self, skip_unchanged: bool, head_precheck: Optional[bool],
+                           placements: Optional[Mapping[str, Placement]], priority: Optional[str],
+                           timeout: Optional[float]) -> Callable[[str], Awaitable[DownloadStatus]]:
+        worker = functools.partial(self._download_single_pdf, skip_unchanged=skip_unchanged,
+                                   head_precheck=head_precheck, placements=placements)
+        return self._schedule(worker, self._download_expired, priority, timeout)
+
+    def iter_link_checks(self, pdf_links: Iterable[str], strategy: Optional[str] = None,
+                         priority: Optional[str] = None, timeout: Optional[float] = None) -> AsyncIterator[LinkStatus]:
+        """Checks the given links, yielding each LinkStatus as soon as it is known."""
+        return self._iter_completed(pdf_links, self._check_schedule(strategy, priority, timeout))
+
+    def iter_downloads(self, pdf_links: Iterable[str], skip_unchanged: bool = False,
+                       head_precheck: Optional[bool] = None,
+                       placements: Optional[Mapping[str, Placement]] = None,
+                       priority: Optional[str] = None, timeout: Optional[float] = None) -> AsyncIterator[DownloadStatus]:
+        """Downloads the given links, yielding each DownloadStatus as soon as it is known."""
+        file_utils.ensure_download_dir_exists()
+        schedule = self._download_schedule(skip_unchanged, head_precheck, placements, priority, timeout)
+        return self._iter_completed(pdf_links, schedule)
+
+    def start_link_checks(self, links: AsyncIterable[str], strategy: Optional[str] = None,
+                          priority: Optional[str] = None, timeout: Optional[float] = None) -> StreamingBatch[LinkStatus]:
+        """Starts checking links from an async source, beginning before the source is exhausted."""
+        return StreamingBatch(links, self._check_schedule(strategy, priority, timeout))
+
+    def start_downloads(self, links: AsyncIterable[str], skip_unchanged: bool = False,
+                        head_precheck: Optional[bool] = None,
+                        placements: Optional[Mapping[str, Placement]] = None,
+                        priority: Optional[str] = None, timeout: Optional[float] = None) -> StreamingBatch[DownloadStatus]:
+        """Starts downloading links from an async source, beginning before the source is exhausted.
+
+        placements may still be filled while the source is read (see iter_pdf_links);
+        each download looks up its link when it starts.
+        """
+        file_utils.ensure_download_dir_exists()
+        schedule = self._download_schedule(skip_unchanged, head_precheck, placements, priority, timeout)
+        return StreamingBatch(links, schedule)
+
+    async def check_pdf_links(self, payload: InputPayload, strategy: Optional[str] = None,
+                              priority: Optional[str] = None, timeout: Optional[float] = None) -> List[LinkStatus]:
+        """Checks the status of PDF links extracted from the payload.
+
+        strategy (one of CHECK_STRATEGIES) overrides the configured CHECK_STRATEGY for this batch.
+        """
         pdf_links = self.extract_pdf_links(payload)
         if not pdf_links:
             return []
 
-        tasks = [self._check_single_link(url) for url in pdf_links]
-        results = await asyncio.gather(*tasks)
-        return results
+        return await self._gather(pdf_links, self._check_schedule(strategy, priority, timeout))
+
+    @staticmethod
+    def _check_expired(url: str, exc: DeadlineExceeded) -> LinkStatus:
+        return LinkStatus(url=url, status="FAILED", error_message=str(exc), attempts=int(exc.started))
+
+    async def _check_single_link(self, pdf_url: str, strategy: Optional[str] = None) -> LinkStatus:
+        """Helper to check one canonical link's status (viewer URLs are already resolved), timed as a span."""
+        strategy = strategy or config.CHECK_STRATEGY
+        with metrics.span("check", url=pdf_url, strategy=strategy) as span:
+            result = await self._check_link(pdf_url, span, strategy)
+            span.set(status=result.status, status_code=result.status_code, attempts=result.attempts,
+                     from_cache=result.from_cache)
+            return result
 
-    async def _check_single_link(self, url: str) -> LinkStatus:
-        """Helper to check one link's status."""
+    async def _check_link(self, pdf_url: str, span: metrics.Span, strategy: str) -> LinkStatus:
+        retry = RetryState(self.retry_policy)
         try:
-            from backend.utils.file_utils import extract_pdf_url
-            
-            # Extract the actual PDF URL if this is a viewer URL
-            pdf_url = extract_pdf_url(url)
-            
-            response = await http_client.perform_head_request(pdf_url)
-            if response.status_code == 200:
-                return LinkStatus(url=url, status="OK", status_code=response.status_code)
-            else:
-                return LinkStatus(url=url, status="FAILED", status_code=response.status_code, error_message=f"HTTP status code: {response.status_code}")
+            # Serve fresh results from the cache; revalidate stale ones conditionally
+            cache = link_cache.get_link_cache()
+            with span.phase("cache"):
+                cached = await cache.get(pdf_url) if cache else None
+            if (cached and strategy != CHECK_STRATEGY_HEAD and cached.checked_with != "GET"
+                    and cached.status_code in config.RANGE_FALLBACK_STATUSES):
+                cached = None # Possibly a HEAD-only failure; let the ranged GET decide
+            if cached and cached.is_fresh(cache.ttl):
+                metrics.LINK_CACHE_LOOKUPS.inc(result="hit")
+                return self._link_status(pdf_url, cached.status_code, from_cache=True, attempts=0)
+
+            headers = cached.validators() if cached and cached.status_code == 200 else None
+            if strategy == CHECK_STRATEGY_RANGE:
+                return await self._range_check(pdf_url, span, retry, cache, cached, headers)
+            with span.phase("head"):
+                response = await retry.run(lambda: self._head(pdf_url, headers))
+            if response.status_code == 304 and cached:
+                return await self._revalidated(pdf_url, cache, cached, retry.attempts)
+            if strategy == CHECK_STRATEGY_HEAD_THEN_RANGE and response.status_code in config.RANGE_FALLBACK_STATUSES:
+                # Many servers reject or mishandle HEAD; ask for the first kilobyte instead
+                return await self._range_check(pdf_url, span, retry, cache, None, None)
+            if cache:
+                metrics.LINK_CACHE_LOOKUPS.inc(result="miss")
+            if cache and link_cache.is_cacheable_status(response.status_code):
+                await cache.put(link_cache.cache_entry_from_response(pdf_url, response, "HEAD"))
+            return self._link_status(pdf_url, response.status_code, attempts=retry.attempts, checked_with="HEAD")
+        except file_utils.DownloadRejected as exc:
+            # The ranged GET showed something other than a PDF
+            return LinkStatus(url=pdf_url, status="FAILED", error_message=f"Rejected response: {exc}",
+                              attempts=retry.attempts, checked_with="GET")
+        except httpx.HTTPStatusError as exc:
+            # Retryable status (429, 5xx) that persisted through every attempt
+            return self._link_status(pdf_url, exc.response.status_code, attempts=retry.attempts)
         except httpx.RequestError as exc:
-            return LinkStatus(url=url, status="FAILED", error_message=f"Request error: {exc.__class__.__name__}")
+            return LinkStatus(url=pdf_url, status="FAILED", error_message=f"Request error: {exc.__class__.__name__}",
+                              attempts=retry.attempts)
         except Exception as exc:
-            return LinkStatus(url=url, status="FAILED", error_message=f"Unexpected error: {str(exc)}")
+            return LinkStatus(url=pdf_url, status="FAILED", error_message=f"Unexpected error: {str(exc)}",
+                              attempts=retry.attempts)
+
+    async def _range_check(self, pdf_url: str, span: metrics.Span, retry: RetryState,
+                           cache: Optional[link_cache.LinkCache], cached: Optional[link_cache.CachedLink],
+                           headers: Optional[Dict[str, str]]) -> LinkStatus:
+        """Checks a link with a ranged GET: status, content type and the %PDF- magic of the first kilobyte."""
+        with span.phase("range"):
+            response, head = await retry.run(lambda: self._range_probe(pdf_url, headers))
+        if response.status_code == 304 and cached:
+            return await self._revalidated(pdf_url, cache, cached, retry.attempts)
+        if cache:
+            metrics.LINK_CACHE_LOOKUPS.inc(result="miss")
+        if cache and response.status_code >= 300 and link_cache.is_cacheable_status(response.status_code):
+            await cache.put(link_cache.cache_entry_from_response(pdf_url, response, "GET"))
+        if response.status_code >= 300:
+            return self._link_status(pdf_url, response.status_code, attempts=retry.attempts, checked_with="GET")
+        file_utils.validate_download_response(response)
+        if not pdf_inspect.header_version(head):
+            raise file_utils.DownloadRejected(f"not a PDF (starts with {pdf_inspect.describe_start(head)!r})")
+        if cache:
+            await cache.put(link_cache.cache_entry_from_response(pdf_url, response, "GET"))
+        # Reported as the logical 200 (not the 206 the range got), the same as the cached entry
+        return self._link_status(pdf_url, 200, attempts=retry.attempts, checked_with="GET")
+
+    async def _revalidated(self, pdf_url: str, cache: link_cache.LinkCache, cached: link_cache.CachedLink,
+                           attempts: int) -> LinkStatus:
+        """The origin answered 304: the cached result still holds."""
+        metrics.LINK_CACHE_LOOKUPS.inc(result="revalidated")
+        cached.checked_at = time.time()
+        await cache.put(cached)
+        return self._link_status(pdf_url, cached.status_code, from_cache=True, attempts=attempts)
+
+    async def _head(self, pdf_url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """HEAD request that raises on retryable statuses, for use with RetryState.run."""
+        response = await http_client.perform_head_request(pdf_url, headers=headers or None)
+        return raise_for_retryable_status(response, self.retry_policy)
+
+    async def _range_probe(self, pdf_url: str,
+                           headers: Optional[Dict[str, str]] = None) -> Tuple[httpx.Response, bytes]:
+        """Ranged GET that raises on retryable statuses, for use with RetryState.run."""
+        response, head = await http_client.perform_range_probe(pdf_url, headers=headers or None)
+        return raise_for_retryable_status(response, self.retry_policy), head
+
+    @staticmethod
+    def _link_status(url: str, status_code: int, from_cache: bool = False, attempts: int = 1,
+                     checked_with: Optional[str] = None) -> LinkStatus:
+        if status_code == 200:
+            return LinkStatus(url=url, status="OK", status_code=status_code, from_cache=from_cache,
+                              attempts=attempts, checked_with=checked_with)
+        return LinkStatus(url=url, status="FAILED", status_code=status_code,
+                          error_message=f"HTTP status code: {status_code}", from_cache=from_cache,
+                          attempts=attempts, checked_with=checked_with)
 
-    async def download_pdf_files(self, payload: InputPayload) -> List[DownloadStatus]:
-        """Downloads PDF files from links extracted from the payload."""
+    async def download_pdf_files(self, payload: InputPayload, skip_unchanged: bool = False,
+                                 head_precheck: Optional[bool] = None, priority: Optional[str] = None,
+                                 timeout: Optional[float] = None) -> List[DownloadStatus]:
+        """Downloads PDF files from links extracted from the payload.
+
+        With skip_unchanged, files already recorded in the download manifest are
+        revalidated with a conditional request and reported as UNCHANGED on a 304.
+        head_precheck overrides the configured DOWNLOAD_HEAD_PRECHECK for this batch.
+        """
         pdf_links = self.extract_pdf_links(payload)
         if not pdf_links:
             return []
 
         file_utils.ensure_download_dir_exists() # Ensure download dir exists
 
-        tasks = [self._download_single_pdf(url) for url in pdf_links]
-        results = await asyncio.gather(*tasks)
-        return results
+        schedule = self._download_schedule(skip_unchanged, head_precheck, self.guideline_placements(payload),
+                                           priority, timeout)
+        return await self._gather(pdf_links, schedule)
+
+    @staticmethod
+    def _download_expired(url: str, exc: DeadlineExceeded) -> DownloadStatus:
+        # An interrupted transfer keeps its partial file, so a later request resumes it
+        return DownloadStatus(url=url, status="FAILED_DOWNLOAD", error_message=str(exc), attempts=int(exc.started))
+
+    async def _download_single_pdf(self, pdf_url: str, skip_unchanged: bool = False,
+                                   head_precheck: Optional[bool] = None,
+                                   placements: Optional[Mapping[str, Placement]] = None) -> DownloadStatus:
+        """Helper to download one PDF file from its canonical URL.
+
+        By default a single GET is issued and its headers are validated before any
+        bytes are written; head_precheck adds the older HEAD round-trip first.
+        Transient failures are retried under the service's RetryPolicy; an
+        interrupted attempt resumes from the partial file. Timed as a span.
+        """
+        with metrics.span("download", url=pdf_url) as span:
+            placement = placements.get(link_key(pdf_url)) if placements else None
+            result = await self._download(pdf_url, span, skip_unchanged, head_precheck, placement)
+            span.set(status=result.status, attempts=result.attempts, size_bytes=result.size_bytes)
+            return result
 
-    async def _download_single_pdf(self, url: str) -> DownloadStatus:
-        """Helper to download one PDF file."""
+    async def _download(self, pdf_url: str, span: metrics.Span, skip_unchanged: bool,
+                        head_precheck: Optional[bool], placement: Optional[Placement] = None) -> DownloadStatus:
+        if head_precheck is None:
+            head_precheck = config.DOWNLOAD_HEAD_PRECHECK
+        retry = RetryState(self.retry_policy)
         try:
-            from backend.utils.file_utils import extract_pdf_url
-            
-            # Extract the actual PDF URL if this is a viewer URL
-            pdf_url = extract_pdf_url(url)
-            
-            # Optional pre-check with HEAD request
-            head_response = await http_client.perform_head_request(pdf_url)
-            head_response.raise_for_status() # Check if accessible before GET
-
-            file_name = file_utils.generate_filename_from_url(url)
-            save_path = DOWNLOAD_DIR / file_name
+            manifest = get_manifest()
+            with span.phase("manifest"):
+                previous = await manifest.get(pdf_url)
+            if skip_unchanged and previous and await asyncio.get_running_loop().run_in_executor(
+                    disk_writer.get_executor(), previous.local_copy_intact):
+                current_copy = previous
+            else:
+                current_copy = None
+            conditional = current_copy.validators() if current_copy else {}
+
+            if head_precheck:
+                # Optional pre-check with HEAD request (conditional when we hold a copy)
+                with span.phase("head"):
+                    head_response = await retry.run(lambda: self._head(pdf_url, conditional))
+                if current_copy and self._is_unchanged(current_copy, head_response):
+                    return self._unchanged_status(pdf_url, current_copy, retry.attempts)
+                head_response.raise_for_status() # Check if accessible before GET
+                conditional = {} # Origin says the file changed; fetch it unconditionally
+
+            save_path = config.DOWNLOAD_DIR / download_layout.relative_path(pdf_url, placement)
+            if save_path.parent != config.DOWNLOAD_DIR:
+                await asyncio.to_thread(save_path.parent.mkdir, parents=True, exist_ok=True)
 
             # Perform streaming download
-            async with http_client.stream_download_request(pdf_url) as response:
-                 await file_utils.save_stream_to_file(response, save_path)
-                 return DownloadStatus(url=url, status="DOWNLOADED", file_path=str(save_path))
+            if config.CONTENT_ADDRESSED_STORAGE:
+                staging = blob_store.staging_path(pdf_url)
+                lock = self._download_locks.setdefault(pdf_url, asyncio.Lock())
+                async with lock, PathLock(staging):
+                    with span.phase("fetch"):
+                        saved = await retry.run(lambda: self._stream_to_file(
+                            pdf_url, staging, current_copy, conditional))
+                    if saved:
+                        with span.phase("store"):
+                            saved.path = await asyncio.to_thread(
+                                blob_store.commit, saved.path, saved.sha256, save_path, pdf_url,
+                                previous.path if previous else None, previous.sha256 if previous else None)
+            else:
+                save_path, path_lock = await self._claim_path(save_path, pdf_url, previous)
+                try:
+                    with span.phase("fetch"):
+                        saved = await retry.run(lambda: self._stream_to_file(
+                            pdf_url, save_path, current_copy, conditional))
+                finally:
+                    await path_lock.release()
+            if saved is None:
+                return self._unchanged_status(pdf_url, current_copy, retry.attempts)
+            with span.phase("commit"):
+                await manifest.put(ManifestEntry(
+                    url=pdf_url, path=str(saved.path), size=saved.size, sha256=saved.sha256,
+                    etag=saved.etag, last_modified=saved.last_modified,
+                    pdf_version=saved.pdf_version, page_count=saved.page_count,
+                ))
+            return DownloadStatus(url=pdf_url, status="DOWNLOADED", file_path=str(saved.path),
+                                  size_bytes=saved.size, sha256=saved.sha256, pdf_version=saved.pdf_version,
+                                  page_count=saved.page_count, attempts=retry.attempts)
 
+        except file_utils.DownloadRejected as exc:
+            # GET succeeded but its headers (or body size) show it is not a file we want
+            return DownloadStatus(url=pdf_url, status="FAILED_CHECK", error_message=f"Rejected response: {str(exc)}",
+                                  attempts=retry.attempts)
         except httpx.HTTPStatusError as exc:
              # Error during HEAD check or GET stream opening
-            return DownloadStatus(url=url, status="FAILED_CHECK", error_message=f"HTTP error: {exc.response.status_code} - {exc.__class__.__name__}")
+            return DownloadStatus(url=pdf_url, status="FAILED_CHECK", error_message=f"HTTP error: {exc.response.status_code} - {exc.__class__.__name__}",
+                                  attempts=retry.attempts)
         except httpx.RequestError as exc:
             # Network error during check or download
-            return DownloadStatus(url=url, status="FAILED_CHECK", error_message=f"Request error: {exc.__class__.__name__}")
+            return DownloadStatus(url=pdf_url, status="FAILED_CHECK", error_message=f"Request error: {exc.__class__.__name__}",
+                                  attempts=retry.attempts)
         except IOError as exc:
              # Error saving file
-             return DownloadStatus(url=url, status="FAILED_DOWNLOAD", error_message=f"File writing error: {str(exc)}")
+             return DownloadStatus(url=pdf_url, status="FAILED_DOWNLOAD", error_message=f"File writing error: {str(exc)}",
+                                   attempts=retry.attempts)
         except Exception as exc:
             # Other unexpected errors during the process
             # Add extra logging here too if needed
-            print(f"Caught exception for {url}: {type(exc).__name__} - {str(exc)}")
-            return DownloadStatus(url=url, status="FAILED_DOWNLOAD", error_message=f"Unexpected download error: {str(exc)}")
+            print(f"Caught exception for {pdf_url}: {type(exc).__name__} - {str(exc)}")
+            return DownloadStatus(url=pdf_url, status="FAILED_DOWNLOAD", error_message=f"Unexpected download error: {str(exc)}",
+                                  attempts=retry.attempts)
+
+    @staticmethod
+    async def _claim_path(path: Path, url: str, previous: Optional[ManifestEntry]) -> Tuple[Path, PathLock]:
+        """A plain-file path for url that holds neither another document nor another download in progress,
+        locked against every other download (in any process) until the returned lock is released.
+
+        Mirrors blob_store.commit: the layout's path when free or already this URL's
+        file, else the stable URL-suffixed alternative.
+        """
+        lock = PathLock(path)
+        if await lock.acquire(wait=False):
+            free = not await asyncio.get_running_loop().run_in_executor(disk_writer.get_executor(), path.exists)
+            if free or (previous and previous.path == str(path)):
+                return path, lock
+            await lock.release()
+        # Named after this URL, so only an earlier copy of it (or a download of it in progress) can be there
+        candidate = blob_store.disambiguated_path(path, url)
+        lock = PathLock(candidate)
+        await lock.acquire()
+        return candidate, lock
+
+    @staticmethod
+    def _is_unchanged(previous: ManifestEntry, response: httpx.Response) -> bool:
+        """True if the origin confirms the recorded copy is current."""
+        if response.status_code == 304:
+            return True
+        if response.status_code != 200:
+            return False
+        # Some servers ignore conditional HEADs but still return matching validators
+        etag = response.headers.get("etag")
+        if etag and previous.etag:
+            return etag == previous.etag
+        last_modified = response.headers.get("last-modified")
+        content_length = response.headers.get("content-length")
+        return bool(last_modified and last_modified == previous.last_modified
+                    and content_length == str(previous.size))
+
+    @staticmethod
+    def _unchanged_status(url: str, entry: ManifestEntry, attempts: int = 1) -> DownloadStatus:
+        return DownloadStatus(url=url, status="UNCHANGED", file_path=entry.path,
+                              size_bytes=entry.size, sha256=entry.sha256, pdf_version=entry.pdf_version,
+                              page_count=entry.page_count, attempts=attempts)
+
+    async def _stream_to_file(self, pdf_url: str, save_path: Path,
+                              current_copy: Optional[ManifestEntry] = None,
+                              conditional: Optional[Dict[str, str]] = None) -> Optional[file_utils.SavedFile]:
+        """Streams pdf_url into save_path, resuming from a partial file whenever possible.
+
+        Response headers are validated before the first byte is written. Returns
+        None when the origin confirms current_copy is still up to date. Abandoned
+        (see cancellation) the partial file is removed, since no request will resume it.
+        """
+        try:
+            return await self._fetch_to_file(pdf_url, save_path, current_copy, conditional)
+        except asyncio.CancelledError as exc:
+            if cancellation.is_abandoned(exc):
+                await asyncio.shield(asyncio.get_running_loop().run_in_executor(
+                    disk_writer.get_executor(), file_utils.discard_partial, save_path))
+            raise
+
+    async def _fetch_to_file(self, pdf_url: str, save_path: Path, current_copy: Optional[ManifestEntry],
+                             conditional: Optional[Dict[str, str]]) -> Optional[file_utils.SavedFile]:
+        loop = asyncio.get_running_loop()
+        executor = disk_writer.get_executor()
+        resumes_left = config.DOWNLOAD_RESUME_ATTEMPTS
+        resume = None # Resume state already read after a dropped connection
+        while True:
+            if resume is None:
+                resume = await loop.run_in_executor(executor, file_utils.get_resume_headers, save_path)
+            (offset, resume_headers), resume = resume, None
+            headers = {**(conditional or {}), **resume_headers}
+            try:
+                async with http_client.stream_download_request(pdf_url, headers=headers or None) as response:
+                    if current_copy and self._is_unchanged(current_copy, response):
+                        # Closing the stream here skips the body entirely
+                        return None
+                    if response.status_code == 416 and offset and resumes_left > 0:
+                        # Partial file no longer matches the remote one; start over
+                        await loop.run_in_executor(executor, file_utils.discard_partial, save_path)
+                        resumes_left -= 1
+                        continue
+                    file_utils.validate_download_response(response)
+                    return await file_utils.save_stream_to_file(response, save_path, resume_offset=offset)
+            except httpx.TransportError:
+                # Connection dropped mid-body: retry for the missing bytes only,
+                # as long as the previous attempt made progress
+                resume = await loop.run_in_executor(executor, file_utils.get_resume_headers, save_path)
+                if resumes_left <= 0 or resume[0] <= offset:
+                    raise
+                resumes_left -= 1
 
 # Instantiate the service for use in the API layer
 pdf_service = PdfService() 
\ No newline at end of file
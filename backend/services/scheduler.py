@@ -0,0 +1,267 @@
+# backend/services/scheduler.py
+import asyncio
+import time
+import weakref
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from backend import config
+from backend.utils import metrics
+
+R = TypeVar("R")
+
+# Priority classes, most urgent first. Waiting interactive work is always served
+# before normal work, and normal before bulk; within a class hosts take turns.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK)
+
+# Live schedulers, summed into the pdf_scheduler_requests gauge at scrape time
+_schedulers: "weakref.WeakSet[HostScheduler]" = weakref.WeakSet()
+
+
+class DeadlineExceeded(Exception):
+    """Work did not finish (or start) before its deadline and was cancelled."""
+
+    def __init__(self, started: bool):
+        self.started = started
+        super().__init__("Deadline exceeded " + ("while running" if started else "while queued"))
+
+
+@dataclass(frozen=True)
+class Urgency:
+    """How a batch competes for slots: its priority class and an optional loop-time deadline."""
+    priority: str = PRIORITY_NORMAL
+    deadline: Optional[float] = None # asyncio loop.time() by which each link must be done
+
+    @classmethod
+    def create(cls, priority: Optional[str] = None, timeout: Optional[float] = None) -> "Urgency":
+        """Urgency for a batch starting now; timeout is in seconds from now (None: no deadline)."""
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r} (expected one of {', '.join(PRIORITIES)})")
+        deadline = asyncio.get_running_loop().time() + timeout if timeout is not None else None
+        return cls(priority or PRIORITY_NORMAL, deadline)
+
+
+class _DeadlineTimer:
+    """
+    Cancels the current task at a loop-time deadline (None: never), raising
+    TimeoutError out of the block; expired() tells that apart from other
+    cancellations. Works like asyncio.timeout_at, which needs Python 3.11.
+    """
+
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self._expired = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def expired(self) -> bool:
+        return self._expired
+
+    def _expire(self) -> None:
+        self._expired = True
+        self._task.cancel()
+
+    def __enter__(self) -> "_DeadlineTimer":
+        if self.deadline is not None:
+            self._task = asyncio.current_task()
+            self._handle = asyncio.get_running_loop().call_at(self.deadline, self._expire)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._expired and exc_type is asyncio.CancelledError:
+            if hasattr(self._task, "uncancel"):
+                self._task.uncancel() # Keep 3.11+ cancellation counts balanced
+            raise TimeoutError from exc
+
+
+def host_key(url: str) -> str:
+    """Returns the key used to group requests by origin host."""
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+class HostScheduler:
+    """
+    Grants request slots under a global concurrency cap and a per-host cap.
+
+    Waiters are queued per priority class and host. Free slots go to the most
+    urgent class with a waiter that fits under the caps, and within a class
+    hosts are served round-robin, so a payload dominated by one domain cannot
+    starve links on other domains. `reserved_slots` of the global cap are kept
+    for interactive work, so it never waits behind a pool full of long bulk
+    downloads. Work is not preempted once it holds a slot.
+    """
+
+    def __init__(self, max_concurrency: int, max_per_host: int, reserved_slots: int = 0):
+        if max_concurrency < 1 or max_per_host < 1:
+            raise ValueError("Concurrency limits must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        # Other classes always keep at least one slot
+        self.reserved_slots = min(max(reserved_slots, 0), max_concurrency - 1)
+        self._active_total = 0
+        self._active_per_host: Dict[str, int] = defaultdict(int)
+        # Priority -> host -> queued waiters. Insertion order is the round-robin ring.
+        self._waiters: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        _schedulers.add(self)
+
+    @property
+    def active(self) -> int:
+        return self._active_total
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for hosts in self._waiters.values() for queue in hosts.values())
+
+    def _has_capacity(self, host: str, priority: str = PRIORITY_NORMAL) -> bool:
+        limit = self.max_concurrency if priority == PRIORITY_INTERACTIVE else self.max_concurrency - self.reserved_slots
+        return self._active_total < limit and self._active_per_host[host] < self.max_per_host
+
+    def _grant(self, host: str) -> None:
+        self._active_total += 1
+        self._active_per_host[host] += 1
+
+    def _queued_ahead(self, host: str, priority: str) -> bool:
+        """True if work of the same or a more urgent class is already waiting for host."""
+        for level in PRIORITIES[:PRIORITIES.index(priority) + 1]:
+            if host in self._waiters[level]:
+                return True
+        return False
+
+    async def acquire(self, host: str, priority: str = PRIORITY_NORMAL, deadline: Optional[float] = None) -> None:
+        """Waits until a slot for `host` is available and takes it.
+
+        Raises DeadlineExceeded if no slot is granted by `deadline` (loop time).
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is not None and loop.time() >= deadline:
+            raise DeadlineExceeded(started=False)
+        if not self._queued_ahead(host, priority) and self._has_capacity(host, priority):
+            self._grant(host)
+            metrics.SCHEDULER_WAIT.observe(0.0, priority=priority)
+            return
+
+        started = time.perf_counter()
+        future = loop.create_future()
+        self._waiters[priority].setdefault(host, deque()).append(future)
+        timeout = _DeadlineTimer(deadline)
+        try:
+            with timeout:
+                await future
+        except (asyncio.CancelledError, TimeoutError):
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation; hand it back.
+                self.release(host)
+            else:
+                self._discard_waiter(priority, host, future)
+            if timeout.expired():
+                raise DeadlineExceeded(started=False) from None
+            raise
+        metrics.SCHEDULER_WAIT.observe(time.perf_counter() - started, priority=priority)
+
+    def release(self, host: str) -> None:
+        """Returns a slot for `host` and wakes the next eligible waiters."""
+        self._active_total -= 1
+        self._active_per_host[host] -= 1
+        if self._active_per_host[host] <= 0:
+            del self._active_per_host[host]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, host: str, priority: str = PRIORITY_NORMAL,
+                   deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """Context manager holding one slot for `host` for its duration."""
+        await self.acquire(host, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def _discard_waiter(self, priority: str, host: str, future: asyncio.Future) -> None:
+        queue = self._waiters[priority].get(host)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiters[priority][host]
+
+    def _dispatch(self) -> None:
+        """Hands free slots to waiting hosts, most urgent class first, round-robin within a class."""
+        while self._active_total < self.max_concurrency:
+            if not any(self._grant_next(priority) for priority in PRIORITIES):
+                # Nothing waiting, or every waiting host is at a cap.
+                return
+
+    def _grant_next(self, priority: str) -> bool:
+        """Grants one slot to the next eligible waiter of a class; False if there is none."""
+        waiters = self._waiters[priority]
+        while True:
+            for host in list(waiters):
+                if not self._has_capacity(host, priority):
+                    continue
+                queue = waiters[host]
+                future = queue.popleft()
+                if queue:
+                    # Move host to the back of the ring so others go next.
+                    waiters.move_to_end(host)
+                else:
+                    del waiters[host]
+                if future.done():
+                    # Stale waiter; rescan the ring from the front.
+                    break
+                self._grant(host)
+                future.set_result(None)
+                return True
+            else:
+                return False
+
+    async def run(self, url: str, func: Callable[[], Awaitable[R]], urgency: Optional[Urgency] = None) -> R:
+        """Runs `func` while holding a slot for the host of `url`.
+
+        With a deadline, `func` is cancelled when it passes and DeadlineExceeded
+        is raised, whether the work was still queued or already running.
+        """
+        urgency = urgency or Urgency()
+        async with self.slot(host_key(url), urgency.priority, urgency.deadline):
+            timeout = _DeadlineTimer(urgency.deadline)
+            try:
+                with timeout:
+                    return await func()
+            except TimeoutError:
+                if timeout.expired():
+                    raise DeadlineExceeded(started=True) from None
+                raise
+
+
+def _slot_counts() -> Dict[tuple, float]:
+    schedulers = list(_schedulers)
+    return {
+        ("active",): sum(scheduler.active for scheduler in schedulers),
+        ("pending",): sum(scheduler.pending for scheduler in schedulers),
+    }
+
+metrics.SCHEDULER_SLOTS.set_collector(_slot_counts)
+
+
+def create_scheduler() -> HostScheduler:
+    """Builds a scheduler from the configured limits."""
+    return HostScheduler(
+        max_concurrency=config.MAX_CONCURRENT_REQUESTS,
+        max_per_host=config.MAX_REQUESTS_PER_HOST,
+        reserved_slots=config.INTERACTIVE_RESERVED_SLOTS,
+    )
@@ -0,0 +1,143 @@
+"""Tests for the shared SQLite job store and job workers."""
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from backend.api.models import DownloadStatus, LinkStatus
+from backend.services.job_service import JobWorker
+from backend.services.job_store import JOB_KIND_CHECK, JOB_KIND_DOWNLOAD, SqliteJobStore
+from backend.utils.download_layout import Placement
+from backend.utils.link_index import link_key
+
+
+class StubService:
+    """Stands in for PdfService: every link checks OK."""
+
+    class scheduler:
+        max_concurrency = 4
+
+    async def iter_link_checks(self, urls, **options):
+        for url in urls:
+            await asyncio.sleep(0)
+            yield LinkStatus(url=url, status="OK", status_code=200)
+
+    async def iter_downloads(self, urls, placements=None, **options):
+        self.placements = placements
+        for url in urls:
+            yield DownloadStatus(url=url, status="SUCCESS")
+
+
+class TestSqliteJobStore(unittest.IsolatedAsyncioTestCase):
+    """Test cases for SqliteJobStore."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "jobs.sqlite3"
+        self.store = SqliteJobStore(self.path)
+
+    async def asyncTearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    async def test_claim_complete_finishes_job(self):
+        """A job completes once every claimed link has a result."""
+        info = await self.store.create_job("j1", JOB_KIND_CHECK, ["https://a/1.pdf", "https://a/2.pdf"],
+                                           {"strategy": "head"}, max_retained=10)
+        self.assertEqual((info.state, info.total), ("PENDING", 2))
+        tasks = await self.store.claim("w1", 10, lease_seconds=60)
+        self.assertEqual([task.url for task in tasks], ["https://a/1.pdf", "https://a/2.pdf"])
+        self.assertEqual(tasks[0].options, {"strategy": "head"})
+        self.assertEqual((await self.store.get_info("j1")).state, "RUNNING")
+        self.assertEqual(await self.store.claim("w2", 10, lease_seconds=60), [])
+
+        await self.store.complete("w1", [(task, LinkStatus(url=task.url, status="OK")) for task in tasks])
+        info = await self.store.get_info("j1")
+        self.assertEqual((info.state, info.completed), ("COMPLETED", 2))
+        results = await self.store.get_results("j1", 1, 10)
+        self.assertEqual([result.url for result in results], ["https://a/2.pdf"])
+
+    async def test_processes_do_not_share_claims(self):
+        """Two stores on the same file never lease the same link."""
+        other = SqliteJobStore(self.path)
+        try:
+            await self.store.create_job("j1", JOB_KIND_CHECK, [f"https://a/{i}.pdf" for i in range(20)], {}, 10)
+            first, second = await asyncio.gather(self.store.claim("w1", 15, 60), other.claim("w2", 15, 60))
+            urls = [task.url for task in first + second]
+            self.assertEqual(len(urls), 20)
+            self.assertEqual(len(set(urls)), 20)
+        finally:
+            other.close()
+
+    async def test_expired_lease_is_reclaimed(self):
+        """Links of a worker that stopped renewing go to another worker, whose result wins."""
+        await self.store.create_job("j1", JOB_KIND_CHECK, ["https://a/1.pdf"], {}, 10)
+        (lost,) = await self.store.claim("dead", 1, lease_seconds=0.01)
+        time.sleep(0.02)
+        (task,) = await self.store.claim("alive", 1, lease_seconds=60)
+        self.assertEqual(task.url, lost.url)
+        await self.store.complete("dead", [(lost, LinkStatus(url=lost.url, status="FAILED"))])
+        await self.store.complete("alive", [(task, LinkStatus(url=task.url, status="OK"))])
+        results = await self.store.get_results("j1", 0, 10)
+        self.assertEqual([result.status for result in results], ["OK"])
+
+    async def test_cancel_stops_claims_and_renewals(self):
+        """Cancelled jobs hand out no more links and are reported to their workers."""
+        await self.store.create_job("j1", JOB_KIND_CHECK, ["https://a/1.pdf", "https://a/2.pdf"], {}, 10)
+        await self.store.claim("w1", 1, 60)
+        self.assertEqual((await self.store.cancel("j1")).state, "CANCELLED")
+        self.assertEqual(await self.store.claim("w2", 10, 60), [])
+        self.assertEqual(await self.store.renew("w1", 60), {"j1"})
+        self.assertIsNone(await self.store.cancel("missing"))
+
+
+class TestJobWorker(unittest.IsolatedAsyncioTestCase):
+    """Test cases for JobWorker."""
+
+    async def test_workers_share_a_job(self):
+        """Two workers on one store finish a job together with one result per link."""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SqliteJobStore(Path(tmp) / "jobs.sqlite3")
+            urls = [f"https://a/{i}.pdf" for i in range(50)]
+            await store.create_job("j1", JOB_KIND_CHECK, urls, {}, 10)
+            workers = [JobWorker(store, StubService(), worker_id=f"w{i}", poll_interval=0.01) for i in range(2)]
+            for worker in workers:
+                worker.start()
+            try:
+                for _ in range(500):
+                    info = await store.get_info("j1")
+                    if info.state == "COMPLETED":
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                for worker in workers:
+                    await worker.stop()
+            self.assertEqual(info.state, "COMPLETED")
+            results = await store.get_results("j1", 0, 100)
+            self.assertEqual(sorted(result.url for result in results), sorted(urls))
+            store.close()
+
+    async def test_download_tasks_keep_their_placements(self):
+        """Guideline fields stored with a download job's links reach the download runner."""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SqliteJobStore(Path(tmp) / "jobs.sqlite3")
+            urls = ["https://a/1.pdf", "https://a/2.pdf"]
+            placement = {"domain": "mhlw.go.jp", "publish_year": 2021, "guideline_id": 7}
+            await store.create_job("j1", JOB_KIND_DOWNLOAD, urls, {}, 10, placements={urls[0]: placement})
+            service = StubService()
+            worker = JobWorker(store, service, worker_id="w1", poll_interval=0.01)
+            worker.start()
+            try:
+                for _ in range(500):
+                    if (await store.get_info("j1")).state == "COMPLETED":
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await worker.stop()
+                store.close()
+            self.assertEqual(service.placements, {link_key(urls[0]): Placement(**placement)})
+
+
+if __name__ == "__main__":
+    unittest.main()
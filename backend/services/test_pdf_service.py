@@ -0,0 +1,182 @@
+"""Tests for PdfService downloads against a mock origin."""
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+
+from backend import config
+from backend.services.pdf_service import PdfService
+from backend.utils import bandwidth, blob_store, download_manifest, file_utils, http_client
+
+PDF = b"%PDF-1.7\n" + b"0" * 4000 + b"\n%%EOF\n"
+
+
+class ServiceTestCase(unittest.IsolatedAsyncioTestCase):
+    """Runs PdfService in a scratch directory, with requests answered by self.respond."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.requests = []
+        for name, value in (("DOWNLOAD_DIR", root / "downloads"), ("DOWNLOAD_MANIFEST_PATH", None),
+                            ("BANDWIDTH_SETTINGS_PATH", root / "bandwidth.json"),
+                            ("BANDWIDTH_USAGE_PATH", root / "bandwidth_usage.sqlite3")):
+            patcher = mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+        patcher = mock.patch.object(http_client, "_client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = PdfService()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        download_manifest.close_manifest()
+        bandwidth.close_limiter()
+        self.tmp.cleanup()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.respond(request)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "application/pdf", "etag": '"v1"'}, content=PDF)
+
+    async def download(self, url: str = "https://origin.example/guide.pdf", **options):
+        file_utils.ensure_download_dir_exists()
+        return await self.service._download_single_pdf(url, **options)
+
+
+class TestSingleGet(ServiceTestCase):
+    """Test cases for the single-GET download path (no HEAD pre-check)."""
+
+    def _staged_files(self):
+        return list((config.DOWNLOAD_DIR / blob_store.BLOB_DIR_NAME / "staging").iterdir())
+
+    async def test_one_get_downloads(self):
+        """A download is a single GET, with no HEAD round-trip first."""
+        result = await self.download(head_precheck=False)
+        self.assertEqual(result.status, "DOWNLOADED", result.error_message)
+        self.assertEqual([request.method for request in self.requests], ["GET"])
+
+    async def test_headers_rejected_before_writing(self):
+        """An HTML content type is rejected from the headers alone; nothing is written."""
+        self.respond = lambda request: httpx.Response(200, headers={"content-type": "text/html"}, content=PDF)
+        result = await self.download(head_precheck=False)
+        self.assertEqual(result.status, "FAILED_CHECK")
+        self.assertIn("content type", result.error_message)
+        self.assertEqual(self._staged_files(), [])
+
+    async def test_html_body_with_200_rejected(self):
+        """A login page served as a 200 PDF is rejected by its first bytes and its partial file removed."""
+        page = b"<!DOCTYPE html><html><body>Please sign in</body></html>" * 100
+        self.respond = lambda request: httpx.Response(200, headers={"content-type": "application/pdf"}, content=page)
+        result = await self.download(head_precheck=False)
+        self.assertEqual(result.status, "FAILED_CHECK")
+        self.assertIn("not a PDF", result.error_message)
+        self.assertEqual(self._staged_files(), [])
+
+    async def test_size_cap(self):
+        """Bodies over MAX_DOWNLOAD_BYTES are rejected, whether declared in Content-Length or not."""
+        with mock.patch.object(config, "MAX_DOWNLOAD_BYTES", 1000):
+            declared = await self.download(head_precheck=False)
+
+            async def body():
+                yield PDF # Sent without Content-Length
+
+            self.respond = lambda request: httpx.Response(
+                200, headers={"content-type": "application/pdf"}, content=body())
+            undeclared = await self.download(head_precheck=False)
+        for result in (declared, undeclared):
+            self.assertEqual(result.status, "FAILED_CHECK")
+        self.assertIn("too large", declared.error_message)
+        self.assertIn("exceeds 1000 bytes", undeclared.error_message)
+        self.assertEqual(self._staged_files(), [])
+
+
+class TestSkipUnchanged(ServiceTestCase):
+    """Test cases for revalidating recorded downloads with skip_unchanged."""
+
+    async def test_not_modified_is_unchanged(self):
+        """A 304 to the conditional GET reports the recorded copy as UNCHANGED."""
+        first = await self.download()
+        self.assertEqual(first.status, "DOWNLOADED", first.error_message)
+        self.respond = lambda request: httpx.Response(304)
+        second = await self.download(skip_unchanged=True)
+        self.assertEqual((second.status, second.file_path, second.sha256), ("UNCHANGED", first.file_path, first.sha256))
+        self.assertEqual(self.requests[-1].headers["if-none-match"], '"v1"')
+
+    async def test_changed_etag_downloads_again(self):
+        """A 200 with a different ETag replaces the recorded copy."""
+        await self.download()
+        content = PDF.replace(b"0", b"1")
+        self.respond = lambda request: httpx.Response(
+            200, headers={"content-type": "application/pdf", "etag": '"v2"'}, content=content)
+        second = await self.download(skip_unchanged=True)
+        self.assertEqual(second.status, "DOWNLOADED")
+        self.assertEqual(Path(second.file_path).read_bytes(), content)
+
+    async def test_missing_local_copy_downloads_again(self):
+        """A recorded copy deleted from disk is fetched again, without validators."""
+        first = await self.download()
+        Path(first.file_path).unlink()
+        second = await self.download(skip_unchanged=True)
+        self.assertEqual(second.status, "DOWNLOADED")
+        self.assertNotIn("if-none-match", self.requests[-1].headers)
+        self.assertEqual(Path(second.file_path).read_bytes(), PDF)
+
+
+class TestResume(ServiceTestCase):
+    """Test cases for resuming from a partial file in _fetch_to_file."""
+
+    url = "https://origin.example/guide.pdf"
+
+    def _leave_partial(self, content: bytes) -> None:
+        file_utils.ensure_download_dir_exists()
+        staging = blob_store.staging_path(self.url)
+        file_utils.partial_path(staging).write_bytes(content)
+        file_utils._save_validator(staging, self.url, '"v1"')
+
+    def _assert_complete(self, result) -> None:
+        self.assertEqual(result.status, "DOWNLOADED", result.error_message)
+        self.assertEqual(Path(result.file_path).read_bytes(), PDF)
+        self.assertEqual(result.sha256, hashlib.sha256(PDF).hexdigest())
+        self.assertEqual(list((config.DOWNLOAD_DIR / blob_store.BLOB_DIR_NAME / "staging").iterdir()), [])
+
+    async def test_partial_file_is_resumed(self):
+        """Only the missing tail is requested, guarded by If-Range, and appended to the partial file."""
+        self._leave_partial(PDF[:1000])
+        self.respond = lambda request: httpx.Response(
+            206, headers={"content-type": "application/pdf", "etag": '"v1"',
+                          "content-range": f"bytes 1000-{len(PDF) - 1}/{len(PDF)}"}, content=PDF[1000:])
+        self._assert_complete(await self.download(self.url))
+        self.assertEqual((self.requests[0].headers["range"], self.requests[0].headers["if-range"]),
+                         ("bytes=1000-", '"v1"'))
+
+    async def test_full_reply_restarts_file(self):
+        """A 200 to the ranged request (the file changed) replaces the partial bytes instead of appending."""
+        self._leave_partial(b"%PDF-1.4\nstale bytes")
+        self._assert_complete(await self.download(self.url))
+        self.assertIn("range", self.requests[0].headers)
+
+    async def test_unsatisfiable_range_discards_partial(self):
+        """A 416 drops the partial file and the download starts over without Range."""
+        self._leave_partial(PDF + b"extra")
+
+        def respond(request):
+            if "range" in request.headers:
+                return httpx.Response(416, headers={"content-range": f"bytes */{len(PDF)}"})
+            return ServiceTestCase.respond(self, request)
+
+        self.respond = respond
+        self._assert_complete(await self.download(self.url))
+        self.assertEqual(len(self.requests), 2)
+        self.assertNotIn("range", self.requests[1].headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests for grouping batch results by guideline."""
+import unittest
+
+from backend.api.models import DownloadStatus, Guideline, InputPayload, LinkStatus
+from backend.services.pdf_service import PdfService
+
+
+class TestGroupByGuideline(unittest.TestCase):
+    """Test cases for PdfService.group_by_guideline."""
+
+    def setUp(self):
+        self.service = PdfService()
+        self.payload = InputPayload(data=[
+            Guideline(id=1, url="https://g/1", domain="a.org", publish_year=2021,
+                      pdf_links=["https://a.org/shared.pdf", "https://a.org/one.pdf", "https://a.org/shared.pdf",
+                                 "not-a-link"]),
+            Guideline(id=2, url="https://g/2", domain="b.org",
+                      pdf_links=["https://a.org/shared.pdf", "https://b.org/gone.pdf"]),
+            Guideline(id=3, url="https://g/3", domain="c.org"),
+        ])
+
+    def test_shared_links_reported_under_each_guideline(self):
+        """Each guideline lists its own unique links with counts, keeping its metadata."""
+        results = [LinkStatus(url="https://a.org/shared.pdf", status="OK"),
+                   LinkStatus(url="https://a.org/one.pdf", status="OK"),
+                   LinkStatus(url="https://b.org/gone.pdf", status="FAILED", status_code=404)]
+        first, second, empty = self.service.group_by_guideline(self.payload, results)
+        self.assertEqual((first.id, first.domain, first.publish_year), (1, "a.org", 2021))
+        self.assertEqual([result.url for result in first.results], ["https://a.org/shared.pdf", "https://a.org/one.pdf"])
+        self.assertEqual((first.links_total, first.links_ok, first.all_ok), (2, 2, True))
+        self.assertEqual((second.links_ok, second.links_failed, second.all_ok), (1, 1, False))
+        self.assertIsNone(second.bytes_downloaded)
+        self.assertEqual((empty.links_total, empty.all_ok), (0, True))
+
+    def test_bytes_downloaded_counts_new_files_only(self):
+        """Unchanged files count as OK but not as downloaded bytes."""
+        results = [DownloadStatus(url="https://a.org/shared.pdf", status="UNCHANGED", size_bytes=500),
+                   DownloadStatus(url="https://a.org/one.pdf", status="DOWNLOADED", size_bytes=100)]
+        first = self.service.group_by_guideline(self.payload, results)[0]
+        self.assertEqual((first.links_ok, first.bytes_downloaded), (2, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
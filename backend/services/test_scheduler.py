@@ -0,0 +1,152 @@
+"""Tests for the per-host concurrency scheduler."""
+import asyncio
+import unittest
+
+from backend.services.scheduler import DeadlineExceeded, HostScheduler, Urgency, host_key
+
+
+class TestHostScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for HostScheduler."""
+
+    async def test_respects_global_and_per_host_limits(self):
+        """Never exceeds either cap while work is in flight."""
+        scheduler = HostScheduler(max_concurrency=3, max_per_host=2)
+        peak_total = 0
+        peak_per_host = {}
+        active = {}
+
+        async def work(host):
+            nonlocal peak_total
+            active[host] = active.get(host, 0) + 1
+            peak_total = max(peak_total, sum(active.values()))
+            peak_per_host[host] = max(peak_per_host.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+        hosts = ["a.example"] * 6 + ["b.example"] * 3 + ["c.example"] * 3
+        await asyncio.gather(*(
+            scheduler.run(f"https://{host}/x.pdf", lambda host=host: work(host)) for host in hosts
+        ))
+
+        self.assertLessEqual(peak_total, 3)
+        self.assertTrue(all(peak <= 2 for peak in peak_per_host.values()))
+        self.assertEqual(scheduler.active, 0)
+        self.assertEqual(scheduler.pending, 0)
+
+    async def test_round_robin_across_hosts(self):
+        """A host with a long queue does not starve other hosts."""
+        scheduler = HostScheduler(max_concurrency=1, max_per_host=1)
+        order = []
+        await scheduler.acquire("busy")  # Hold the only slot so everyone queues
+
+        async def work(host):
+            order.append(host)
+
+        tasks = [asyncio.create_task(scheduler.run(f"https://{host}/", lambda host=host: work(host)))
+                 for host in ["busy"] * 3 + ["other"] * 2]
+        await asyncio.sleep(0)
+        scheduler.release("busy")
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(order, ["busy", "other", "busy", "other", "busy"])
+
+    async def test_cancelled_waiter_releases_queue(self):
+        """Cancelling a queued request removes it without leaking a slot."""
+        scheduler = HostScheduler(max_concurrency=1, max_per_host=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        scheduler.release("a")
+        self.assertEqual(scheduler.active, 0)
+        self.assertEqual(scheduler.pending, 0)
+
+    async def test_more_urgent_classes_go_first(self):
+        """Queued interactive work is served before normal, and normal before bulk."""
+        scheduler = HostScheduler(max_concurrency=1, max_per_host=1)
+        order = []
+        await scheduler.acquire("a")
+
+        async def work(name):
+            order.append(name)
+
+        tasks = [asyncio.create_task(scheduler.run(f"https://{host}/", lambda name=name: work(name), Urgency(priority)))
+                 for name, host, priority in [("bulk-1", "a", "bulk"), ("bulk-2", "b", "bulk"),
+                                              ("normal", "c", "normal"), ("interactive", "a", "interactive")]]
+        await asyncio.sleep(0)
+        scheduler.release("a")
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(order, ["interactive", "normal", "bulk-1", "bulk-2"])
+
+    async def test_reserved_slots_only_for_interactive(self):
+        """Bulk work leaves the reserved slots free for interactive work."""
+        scheduler = HostScheduler(max_concurrency=3, max_per_host=3, reserved_slots=1)
+        await scheduler.acquire("a", "bulk")
+        await scheduler.acquire("b", "bulk")
+        blocked = asyncio.create_task(scheduler.acquire("c", "bulk"))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+        await asyncio.wait_for(scheduler.acquire("c", "interactive"), 1)
+        self.assertEqual(scheduler.active, 3)
+        scheduler.release("c")
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done()) # The freed slot is a reserved one
+        scheduler.release("a")
+        await asyncio.wait_for(blocked, 1)
+
+    async def test_deadline_while_queued_and_running(self):
+        """Work past its deadline is cancelled, before or after it got a slot, without leaking slots."""
+        scheduler = HostScheduler(max_concurrency=1, max_per_host=1)
+        deadline = asyncio.get_running_loop().time() + 0.05
+        started = []
+
+        async def work(name):
+            started.append(name)
+            await asyncio.sleep(10)
+
+        running = asyncio.create_task(scheduler.run("https://a/", lambda: work("first"), Urgency("normal", deadline)))
+        queued = asyncio.create_task(scheduler.run("https://a/", lambda: work("second"), Urgency("normal", deadline)))
+        results = await asyncio.gather(running, queued, return_exceptions=True)
+
+        self.assertEqual([type(result) for result in results], [DeadlineExceeded, DeadlineExceeded])
+        self.assertEqual([result.started for result in results], [True, False])
+        self.assertEqual(started, ["first"])
+        self.assertEqual((scheduler.active, scheduler.pending), (0, 0))
+        with self.assertRaises(DeadlineExceeded):
+            await scheduler.run("https://a/", lambda: work("late"), Urgency("normal", deadline))
+
+    async def test_deadline_leaves_other_cancellations_alone(self):
+        """Work finished in time keeps running afterwards; an outside cancel reaches the work unchanged."""
+        scheduler = HostScheduler(max_concurrency=1, max_per_host=1)
+        deadline = asyncio.get_running_loop().time() + 0.05
+        self.assertEqual(await scheduler.run("https://a/", lambda: asyncio.sleep(0, "done"), Urgency("normal", deadline)),
+                         "done")
+        await asyncio.sleep(0.1) # The expired timer must not cancel this task later
+
+        seen = []
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError as exc:
+                seen.extend(exc.args)
+                raise
+
+        task = asyncio.create_task(scheduler.run("https://a/", work, Urgency("normal", deadline + 10)))
+        await asyncio.sleep(0.01)
+        task.cancel("abandoned")
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(seen, ["abandoned"])
+        self.assertEqual((scheduler.active, scheduler.pending), (0, 0))
+
+    def test_host_key_normalizes_case(self):
+        """Hosts are grouped case-insensitively."""
+        self.assertEqual(host_key("https://WWW.Example.org/a.pdf"), "www.example.org")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for the command-line batch runner."""
+import csv
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import mock
+
+import httpx
+
+from backend import cli, config
+from backend.utils import http_client
+
+
+def respond(request: httpx.Request) -> httpx.Response:
+    if "missing" in request.url.path:
+        return httpx.Response(404)
+    return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF-1.7\n")
+
+
+class TestCli(unittest.TestCase):
+    """Test cases for cli.main against a mock origin."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        # main() sets these from its options; restore them afterwards
+        for name in ("DOWNLOAD_DIR", "LINK_CACHE_ENABLED"):
+            patcher = mock.patch.object(config, name, getattr(config, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(http_client, "build_http_client",
+                                    lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.output = self.root / "results"
+
+    def _payload(self, *names: str) -> str:
+        path = self.root / f"payload-{len(names)}.ndjson"
+        path.write_text("\n".join(json.dumps({"id": i, "pdf_links": [f"https://origin.example/{name}.pdf"]})
+                                  for i, name in enumerate(names)))
+        return str(path)
+
+    def _main(self, *argv: str) -> int:
+        self.stderr = io.StringIO()
+        with redirect_stderr(self.stderr):
+            return cli.main(["check", "--no-cache", "-o", str(self.output), *argv])
+
+    def test_all_links_ok(self):
+        """Every link succeeding exits 0, with one NDJSON result per link."""
+        self.assertEqual(self._main(self._payload("a", "b")), cli.EXIT_OK)
+        results = [json.loads(line) for line in self.output.read_text().splitlines()]
+        self.assertEqual(sorted((result["url"], result["status"]) for result in results),
+                         [("https://origin.example/a.pdf", "OK"), ("https://origin.example/b.pdf", "OK")])
+        self.assertIn("check: 2 links, 2 succeeded, 0 failed", self.stderr.getvalue())
+
+    def test_failed_link_and_csv(self):
+        """A failed link exits 1; CSV output has a header and a row per link."""
+        self.assertEqual(self._main(self._payload("a", "missing"), "--format", "csv"), cli.EXIT_LINK_FAILURES)
+        with open(self.output, newline="") as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(sorted((row["url"], row["status"], row["status_code"]) for row in rows),
+                         [("https://origin.example/a.pdf", "OK", "200"),
+                          ("https://origin.example/missing.pdf", "FAILED", "404")])
+
+    def test_bad_input(self):
+        """Malformed or missing input and invalid options exit 2."""
+        malformed = self.root / "malformed.json"
+        malformed.write_text('[{"pdf_links": ["https://origin.example/a.pdf"]}, {"id":')
+        self.assertEqual(self._main(str(malformed)), cli.EXIT_BAD_INPUT)
+        self.assertIn("Invalid input", self.stderr.getvalue())
+        self.assertEqual(self._main(str(self.root / "absent.json")), cli.EXIT_BAD_INPUT)
+        self.assertEqual(self._main("--concurrency", "0", self._payload("a")), cli.EXIT_BAD_INPUT)
+
+
+if __name__ == "__main__":
+    unittest.main()
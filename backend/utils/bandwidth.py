@@ -0,0 +1,352 @@
+# backend/utils/bandwidth.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from backend import config
+from backend.utils import metrics
+from backend.utils.sqlite_store import SqliteStore
+
+# Rates are reported over this many seconds, counted in slots of RATE_SLOT seconds
+RATE_WINDOW = 5.0
+RATE_SLOT = 0.25
+# Seconds between checks of the shared settings file for changes made by other processes,
+# and between exchanges of current rates with them
+_RELOAD_INTERVAL = 1.0
+# A process whose usage was not updated for this long has stopped downloading (or exited)
+_USAGE_TTL = RATE_WINDOW
+
+class TokenBucket:
+    """
+    Byte-rate limiter: refills at `rate` bytes per second up to `burst_seconds` worth.
+
+    reserve() takes the tokens at once and may go into debt; the caller sleeps
+    for the returned delay. Concurrent consumers queue up behind each other's
+    debt, so their combined rate stays at the limit. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate: float = 0.0, burst_seconds: float = 1.0):
+        self.rate = rate
+        self.burst_seconds = burst_seconds
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def capacity(self) -> float:
+        return self.rate * self.burst_seconds
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        self._refill(time.monotonic())
+        was_unlimited = self.rate <= 0
+        self.rate = rate
+        # Forget debt run up under the old rate; an unlimited bucket starts full
+        self._tokens = self.capacity if was_unlimited else min(max(self._tokens, 0.0), self.capacity)
+
+    def reserve(self, amount: int) -> float:
+        """Takes amount tokens and returns the seconds to wait before using them."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= amount
+        return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+class RateMeter:
+    """Bytes per second over the last RATE_WINDOW seconds."""
+
+    def __init__(self):
+        self._slots: Deque[List[float]] = deque() # [slot start, bytes]
+
+    def add(self, amount: int, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        start = now - now % RATE_SLOT
+        if self._slots and self._slots[-1][0] == start:
+            self._slots[-1][1] += amount
+        else:
+            self._slots.append([start, amount])
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        while self._slots and self._slots[0][0] <= now - RATE_WINDOW:
+            self._slots.popleft()
+
+    def idle(self, now: float) -> bool:
+        self._prune(now)
+        return not self._slots
+
+    def rate(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        return sum(amount for _, amount in self._slots) / RATE_WINDOW
+
+@dataclass
+class PeerUsage:
+    """What another process sharing the limits last reported receiving."""
+    global_rate: float
+    host_rates: Dict[str, float]
+
+class BandwidthUsageStore(SqliteStore):
+    """
+    Current receive rates of every process sharing the bandwidth limits, so each
+    can take its share of a limit and report the combined rates.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path, [
+            """CREATE TABLE IF NOT EXISTS bandwidth_usage (
+                process_id TEXT PRIMARY KEY,
+                global_rate REAL NOT NULL,
+                host_rates TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )""",
+        ])
+
+    def _exchange(self, process_id: str, global_rate: float, host_rates: Dict[str, float]) -> List[PeerUsage]:
+        now = time.time()
+        self._conn.execute("DELETE FROM bandwidth_usage WHERE updated_at < ?", (now - _USAGE_TTL,))
+        if global_rate > 0:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bandwidth_usage (process_id, global_rate, host_rates, updated_at) "
+                "VALUES (?, ?, ?, ?)", (process_id, global_rate, json.dumps(host_rates), now),
+            )
+        else:
+            self._conn.execute("DELETE FROM bandwidth_usage WHERE process_id = ?", (process_id,))
+        self._conn.commit()
+        return [PeerUsage(rate, json.loads(hosts)) for rate, hosts in self._conn.execute(
+            "SELECT global_rate, host_rates FROM bandwidth_usage WHERE process_id != ?", (process_id,)
+        )]
+
+    async def exchange(self, process_id: str, global_rate: float, host_rates: Dict[str, float]) -> List[PeerUsage]:
+        """Records this process's current rates and returns those of the other active processes."""
+        return await self._run(self._exchange, process_id, global_rate, host_rates)
+
+    def _remove(self, process_id: str) -> None:
+        self._conn.execute("DELETE FROM bandwidth_usage WHERE process_id = ?", (process_id,))
+        self._conn.commit()
+
+    def remove(self, process_id: str) -> None:
+        """Forgets a process that stopped (blocking)."""
+        self._locked(self._remove, process_id)
+
+class BandwidthLimiter:
+    """
+    Global and per-host byte-rate limits for download bodies, adjustable at runtime.
+
+    Limits are bytes per second (0 = unlimited). Changes saved with
+    save_settings() go to BANDWIDTH_SETTINGS_PATH and are picked up by the
+    other worker processes sharing that file within about a second.
+
+    With a usage store, the processes also exchange their current rates about
+    once a second, and each enforces an equal share of every limit among the
+    processes receiving data under it, so together they stay within the limits.
+    Rates are measured as bytes arrive, before any throttling delay.
+    """
+
+    def __init__(self, global_limit: float = 0.0, per_host_limit: float = 0.0,
+                 host_limits: Optional[Dict[str, float]] = None, burst_seconds: float = 1.0,
+                 usage: Optional[BandwidthUsageStore] = None):
+        self.burst_seconds = burst_seconds
+        self.process_id = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._usage = usage
+        self._peers: List[PeerUsage] = []
+        self._refreshing: Optional[asyncio.Task] = None
+        self.global_limit = global_limit
+        self.per_host_limit = per_host_limit
+        self.host_limits: Dict[str, float] = {host.lower(): rate for host, rate in (host_limits or {}).items()}
+        self._global = TokenBucket(global_limit, burst_seconds)
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._global_meter = RateMeter()
+        self._host_meters: Dict[str, RateMeter] = {}
+        self._settings_mtime: Optional[float] = None
+        self._next_housekeeping = 0.0
+        self._lock = threading.Lock() # Serializes settings file writes from worker threads
+
+    @classmethod
+    def from_config(cls) -> "BandwidthLimiter":
+        try:
+            usage = BandwidthUsageStore(config.BANDWIDTH_USAGE_PATH)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"Bandwidth limits apply per process, usage store unavailable: {exc}")
+            usage = None
+        limiter = cls(config.BANDWIDTH_LIMIT, config.BANDWIDTH_PER_HOST_LIMIT,
+                      burst_seconds=config.BANDWIDTH_BURST_SECONDS, usage=usage)
+        limiter._reload_settings()
+        return limiter
+
+    def limit_for(self, host: str) -> float:
+        return self.host_limits.get(host, self.per_host_limit)
+
+    def _share(self, limit: float, peers: int) -> float:
+        # Processes starting to download run over by up to one share until the next exchange
+        return limit / (1 + peers)
+
+    def _host_share(self, host: str) -> float:
+        return self._share(self.limit_for(host), sum(host in peer.host_rates for peer in self._peers))
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            bucket = self._hosts[host] = TokenBucket(self._host_share(host), self.burst_seconds)
+        return bucket
+
+    async def throttle(self, host: str, amount: int) -> None:
+        """Accounts for amount bytes received from host, sleeping as long as the limits require."""
+        now = time.monotonic()
+        if now >= self._next_housekeeping:
+            self._next_housekeeping = now + _RELOAD_INTERVAL
+            self._forget_idle_hosts(now)
+            if self._refreshing is None or self._refreshing.done():
+                # In the background: the settings file and usage store are read off the event loop
+                self._refreshing = asyncio.ensure_future(self.refresh())
+        self._global_meter.add(amount, now)
+        meter = self._host_meters.get(host)
+        if meter is None:
+            meter = self._host_meters[host] = RateMeter()
+        meter.add(amount, now)
+        # Reading stops while we sleep, so TCP flow control slows the sender too
+        delay = max(self._global.reserve(amount), self._host_bucket(host).reserve(amount))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _apply(self, global_limit: float, per_host_limit: float, host_limits: Dict[str, float]) -> None:
+        self.global_limit = global_limit
+        self.per_host_limit = per_host_limit
+        self.host_limits = {host.lower(): rate for host, rate in host_limits.items()}
+        self._apply_shares()
+
+    def _apply_shares(self) -> None:
+        self._global.set_rate(self._share(self.global_limit, len(self._peers)))
+        for host, bucket in self._hosts.items():
+            bucket.set_rate(self._host_share(host))
+
+    async def refresh(self) -> None:
+        """Applies changes to the shared settings file and exchanges usage with the other processes."""
+        settings = await asyncio.to_thread(self._read_settings)
+        if settings is not None:
+            self._apply(*settings)
+        await self.exchange_usage()
+
+    async def exchange_usage(self) -> None:
+        """Shares this process's current rates and takes up its share of the limits given the others'."""
+        if self._usage is None:
+            return
+        try:
+            self._peers = await self._usage.exchange(self.process_id, self.global_rate(), self.host_rates())
+        except sqlite3.Error as exc:
+            print(f"Could not exchange bandwidth usage: {exc}")
+            return
+        self._apply_shares()
+
+    def _forget_idle_hosts(self, now: float) -> None:
+        # Keep the tables from growing with every host ever seen
+        for host in [host for host, meter in self._host_meters.items() if meter.idle(now)]:
+            del self._host_meters[host]
+            self._hosts.pop(host, None)
+
+    def update(self, global_limit: Optional[float] = None, per_host_limit: Optional[float] = None,
+               host_limits: Optional[Dict[str, float]] = None) -> None:
+        """Changes the limits in this process (None keeps a value); save_settings() shares them."""
+        self._apply(self.global_limit if global_limit is None else global_limit,
+                    self.per_host_limit if per_host_limit is None else per_host_limit,
+                    self.host_limits if host_limits is None else host_limits)
+
+    def save_settings(self) -> None:
+        """Writes the current limits to the settings file shared with the other processes (blocking)."""
+        path = config.BANDWIDTH_SETTINGS_PATH
+        settings = {"global_limit": self.global_limit, "per_host_limit": self.per_host_limit,
+                    "host_limits": self.host_limits}
+        try:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(settings))
+                os.replace(tmp, path)
+                self._settings_mtime = path.stat().st_mtime
+        except OSError as exc:
+            print(f"Could not save bandwidth settings to {path}: {exc}")
+
+    def _read_settings(self) -> Optional[Tuple[float, float, Dict[str, float]]]:
+        """The limits in the shared settings file if it changed since it was last seen (blocking)."""
+        path = config.BANDWIDTH_SETTINGS_PATH
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        if mtime == self._settings_mtime:
+            return None
+        self._settings_mtime = mtime
+        try:
+            settings = json.loads(path.read_text())
+            return (float(settings["global_limit"]), float(settings["per_host_limit"]),
+                    {host: float(rate) for host, rate in settings.get("host_limits", {}).items()})
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            print(f"Ignoring unreadable bandwidth settings in {path}: {exc}")
+            return None
+
+    def _reload_settings(self) -> None:
+        """Applies the shared settings file if it changed since it was last seen (blocking)."""
+        settings = self._read_settings()
+        if settings is not None:
+            self._apply(*settings)
+
+    def host_rates(self) -> Dict[str, float]:
+        """Current bytes per second per host, for hosts that sent data within RATE_WINDOW."""
+        now = time.monotonic()
+        rates = {host: meter.rate(now) for host, meter in self._host_meters.items()}
+        return {host: rate for host, rate in rates.items() if rate > 0}
+
+    def global_rate(self) -> float:
+        """Current bytes per second received by this process."""
+        return self._global_meter.rate()
+
+    def total_rates(self) -> Tuple[float, Dict[str, float]]:
+        """Global and per-host rates of all processes, as of the last exchange_usage()."""
+        global_rate, host_rates = self.global_rate(), self.host_rates()
+        for peer in self._peers:
+            global_rate += peer.global_rate
+            for host, rate in peer.host_rates.items():
+                host_rates[host] = host_rates.get(host, 0.0) + rate
+        return global_rate, host_rates
+
+    def close(self) -> None:
+        """Withdraws this process from the shared usage so the others take over its share."""
+        if self._usage is not None:
+            self._usage.remove(self.process_id)
+            self._usage.close()
+            self._usage = None
+
+# Shared limiter for all downloads in this process, created on first use
+_limiter: Optional[BandwidthLimiter] = None
+
+def get_limiter() -> BandwidthLimiter:
+    """Returns the process-wide bandwidth limiter."""
+    global _limiter
+    if _limiter is None:
+        _limiter = BandwidthLimiter.from_config()
+    return _limiter
+
+def close_limiter() -> None:
+    """Closes the shared limiter if it was created."""
+    global _limiter
+    if _limiter is not None:
+        _limiter.close()
+    _limiter = None
+
+def _bandwidth_samples() -> Dict[tuple, float]:
+    if _limiter is None:
+        return {}
+    return {("rate",): _limiter.global_rate(), ("limit",): _limiter.global_limit}
+
+metrics.DOWNLOAD_RATE.set_collector(_bandwidth_samples)
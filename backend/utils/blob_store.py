@@ -0,0 +1,104 @@
+# backend/utils/blob_store.py
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+from backend import config
+
+# Content-addressed store layout under DOWNLOAD_DIR:
+#   .blobs/ab/cd/<sha256>.pdf   one copy per distinct file content
+#   .blobs/staging/<sha1(url)>.pdf(.part)   downloads in progress, one per source URL
+# Human-friendly names in DOWNLOAD_DIR are hardlinks to the blobs.
+BLOB_DIR_NAME = ".blobs"
+
+# Commits run in worker threads; serialize them so two URLs never claim the same friendly name
+_commit_lock = threading.Lock()
+
+def blob_root() -> Path:
+    return config.DOWNLOAD_DIR / BLOB_DIR_NAME
+
+def ensure_blob_dirs_exist() -> None:
+    """Creates the blob and staging directories if they don't exist."""
+    (blob_root() / "staging").mkdir(parents=True, exist_ok=True)
+
+def staging_path(url: str) -> Path:
+    """Download target for url before its content hash is known.
+
+    Keyed by URL, so concurrent downloads of different URLs sharing a basename
+    never write to the same file, and a partial download is found again on retry.
+    """
+    return blob_root() / "staging" / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.pdf"
+
+def blob_path(sha256: str) -> Path:
+    """Location of the blob holding content with the given SHA-256."""
+    return blob_root() / sha256[:2] / sha256[2:4] / f"{sha256}.pdf"
+
+def _same_file(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+def _link_into_place(blob: Path, target: Path) -> None:
+    """Atomically points target at blob, replacing whatever target was."""
+    tmp = target.with_name(f".{target.name}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        # Filesystem without hardlink support: fall back to a private copy
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, target)
+
+def disambiguated_path(target: Path, url: str) -> Path:
+    """Stable alternative name for target, derived from the source URL."""
+    url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+    return target.with_name(f"{target.stem}-{url_hash}{target.suffix}")
+
+def commit(staged: Path, sha256: str, target: Path, url: str, owned_path: Optional[str] = None,
+           owned_sha256: Optional[str] = None) -> Path:
+    """Moves a completed staged download into the store and links it at a friendly path.
+
+    If a blob with the same content already exists the staged copy is dropped, so
+    identical PDFs reached through different URLs occupy disk space once. The
+    friendly path is only replaced when it is free, already holds this content,
+    or was previously assigned to this same URL (owned_path); otherwise a
+    URL-derived suffix is added so different documents never overwrite each other.
+    The blob of the URL's previous content (owned_sha256) is removed once no
+    friendly name links to it any more.
+
+    Returns the friendly path the content is available at.
+    """
+    with _commit_lock:
+        path = _commit(staged, sha256, target, url, owned_path)
+        if owned_sha256 and owned_sha256 != sha256:
+            _drop_if_unreferenced(blob_path(owned_sha256))
+        return path
+
+def _drop_if_unreferenced(blob: Path) -> None:
+    """Removes blob when the store's own entry is its only remaining link."""
+    try:
+        if blob.stat().st_nlink == 1:
+            blob.unlink()
+    except FileNotFoundError:
+        pass
+
+def _commit(staged: Path, sha256: str, target: Path, url: str, owned_path: Optional[str]) -> Path:
+    blob = blob_path(sha256)
+    if blob.exists():
+        staged.unlink()
+    else:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged, blob)
+
+    for candidate in (target, disambiguated_path(target, url)):
+        if _same_file(candidate, blob):
+            return candidate
+        if not candidate.exists() or str(candidate) == owned_path:
+            _link_into_place(blob, candidate)
+            return candidate
+    # Both names taken by other documents: serve the blob directly
+    return blob
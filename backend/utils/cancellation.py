@@ -0,0 +1,55 @@
+# backend/utils/cancellation.py
+import asyncio
+import weakref
+from typing import Iterable, Optional
+
+# Message work is cancelled with when nobody is waiting for its result any more
+# (the client disconnected or stopped reading). Abandoned downloads discard
+# their partial files. A plain cancel() without a message, as used for
+# deadlines and shutdown, is an interruption: partial files are kept so a
+# later request can resume them. Compared by identity, so cancel messages
+# from other libraries (such as anyio's cancel scopes) never count as abandoned.
+class _Abandoned:
+    def __repr__(self) -> str:
+        return "abandoned"
+    __str__ = __repr__
+
+ABANDONED = _Abandoned()
+
+# Tasks cancelled through abandon(). Before Python 3.11 the message is lost
+# where a cancelled task or gather() is awaited, so it is recorded here too.
+_abandoned: "weakref.WeakSet[asyncio.Future]" = weakref.WeakSet()
+
+def mark_abandoned(task: asyncio.Future) -> None:
+    """Records that the cancellation task is about to receive from elsewhere
+    (such as a cancel scope) abandons its work."""
+    _abandoned.add(task)
+
+def abandon(task: asyncio.Future) -> bool:
+    """Cancels task as abandoned; False if it was already done."""
+    mark_abandoned(task)
+    return task.cancel(ABANDONED)
+
+def is_abandoned(exc: BaseException) -> bool:
+    """True if exc, raised in the current task, is the cancellation of abandoned work."""
+    return isinstance(exc, asyncio.CancelledError) and (
+        any(arg is ABANDONED for arg in exc.args) or asyncio.current_task() in _abandoned)
+
+async def stop_remaining(tasks: Iterable[asyncio.Future], reason: Optional[BaseException]) -> None:
+    """
+    Cancels the unfinished tasks of a batch whose consumer stopped early, and
+    waits until they have closed their streams and cleaned up.
+
+    Their results will never be read, so they are abandoned, unless the
+    consumer was itself interrupted by a cancellation other than abandon(),
+    which passes on as a plain one.
+    """
+    interrupted = isinstance(reason, asyncio.CancelledError) and not is_abandoned(reason)
+    tasks = [task for task in tasks if not task.done()]
+    for task in tasks:
+        if interrupted:
+            task.cancel()
+        else:
+            abandon(task)
+    if tasks:
+        await asyncio.wait(tasks)
@@ -0,0 +1,144 @@
+# backend/utils/disk_writer.py
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from backend import config
+from backend.utils import metrics
+
+# Linux caps a single writev at IOV_MAX (1024) buffers; join beyond this
+_MAX_IOVECS = 512
+
+# Shared pool for all file writes, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool that performs blocking disk I/O for downloads."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.DISK_WRITER_THREADS, thread_name_prefix="disk-writer")
+    return _executor
+
+def shutdown_executor() -> None:
+    """Stops the disk writer pool, waiting for queued writes to finish."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    _executor = None
+
+def _write_all(fd: int, chunks: List[bytes]) -> None:
+    """Writes chunks to fd, using one vectored write when the platform supports it."""
+    if hasattr(os, "writev") and len(chunks) <= _MAX_IOVECS:
+        total = sum(len(chunk) for chunk in chunks)
+        written = os.writev(fd, chunks)
+        if written == total:
+            return
+        # Short write (rare): finish the remainder with plain writes
+        view = memoryview(b"".join(chunks))[written:]
+    else:
+        view = memoryview(b"".join(chunks))
+    while view:
+        view = view[os.write(fd, view):]
+
+def _close_after(fd: int, write: asyncio.Future) -> None:
+    if not write.cancelled():
+        write.exception() # Already reported to whoever was waiting; don't warn about it
+    get_executor().submit(os.close, fd)
+
+class AsyncFileWriter:
+    """
+    Buffers downloaded chunks and writes them from a worker thread.
+
+    Buffers are flushed in large vectored writes, and a flush runs while the
+    next buffer is being filled from the network, so disk I/O overlaps with
+    receiving and never blocks the event loop. An optional hashlib digest and
+    inspector (anything with update(bytes)) are updated in the worker thread as well.
+    """
+
+    def __init__(self, path: Path, append: bool = False, digest=None,
+                 buffer_size: Optional[int] = None, inspector=None):
+        self.path = path
+        self.append = append
+        self.digest = digest
+        self.inspector = inspector
+        self.buffer_size = buffer_size or config.WRITE_BUFFER_SIZE
+        self.size = 0 # Total file size, including any bytes present before appending
+        self._fd: Optional[int] = None
+        self._buffer: List[bytes] = []
+        self._buffered = 0
+        self._pending: Optional[asyncio.Future] = None
+
+    def _run(self, func, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+    def _open(self) -> int:
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if self.append else os.O_TRUNC)
+        fd = os.open(self.path, flags, 0o644)
+        self.size = os.fstat(fd).st_size
+        return fd
+
+    def _write(self, chunks: List[bytes]) -> None:
+        started = time.perf_counter()
+        if self.digest is not None:
+            for chunk in chunks:
+                self.digest.update(chunk)
+        if self.inspector is not None:
+            for chunk in chunks:
+                self.inspector.update(chunk)
+        _write_all(self._fd, chunks)
+        metrics.DISK_WRITE_DURATION.observe(time.perf_counter() - started)
+        metrics.DOWNLOAD_BYTES.inc(sum(len(chunk) for chunk in chunks))
+
+    async def open(self) -> "AsyncFileWriter":
+        self._fd = await self._run(self._open)
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        """Queues chunk for writing; only waits when the previous flush is still running."""
+        if not chunk:
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        self.size += len(chunk)
+        if self._buffered >= self.buffer_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        # Writes to one file must stay ordered: wait for the previous flush first.
+        # Shielded, so a cancelled caller leaves it for close() to wait for.
+        pending = self._pending
+        if pending is not None:
+            try:
+                await asyncio.shield(pending)
+            finally:
+                if pending.done():
+                    self._pending = None # A failed write is raised once
+        if self._buffer:
+            chunks, self._buffer, self._buffered = self._buffer, [], 0
+            self._pending = self._run(self._write, chunks)
+
+    async def close(self) -> None:
+        """Flushes everything buffered and closes the file."""
+        if self._fd is None:
+            return
+        try:
+            await self._flush()
+            await self._flush() # Waits for the final write
+        finally:
+            fd, self._fd = self._fd, None
+            pending, self._pending = self._pending, None
+            if pending is not None and not pending.done():
+                # Cancelled during the last write: close the file once the write has finished
+                pending.add_done_callback(functools.partial(_close_after, fd))
+            else:
+                await asyncio.shield(self._run(os.close, fd))
+
+    async def __aenter__(self) -> "AsyncFileWriter":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
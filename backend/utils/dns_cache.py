@@ -0,0 +1,98 @@
+# backend/utils/dns_cache.py
+import asyncio
+import functools
+import ipaddress
+import socket
+import time
+import typing
+from typing import Dict, List, Optional, Tuple
+
+import httpcore
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that caches DNS lookups for a fixed TTL.
+
+    Guideline payloads hit a handful of hosts thousands of times; without a
+    cache every new connection repeats the same getaddrinfo call. Concurrent
+    lookups of one host share a single resolution. The TLS server name is
+    still taken from the URL by httpcore, so connecting by IP is transparent.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: float):
+        self._backend = backend
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses: List[str] = []
+        for _, _, _, _, sockaddr in infos:
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        return addresses
+
+    async def _resolve_and_cache(self, key: Tuple[str, int]) -> List[str]:
+        try:
+            addresses = await self._lookup(*key)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        self._cache[key] = (time.monotonic() + self._ttl, addresses)
+        return addresses
+
+    def _lookup_done(self, key: Tuple[str, int], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception() # Mark as retrieved in case every waiter timed out
+
+    async def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> List[str]:
+        """Returns the addresses for host, from the cache when fresh.
+
+        The lookup runs as its own task, so a caller giving up after timeout
+        (raising httpcore.ConnectTimeout) leaves it running for the others.
+        """
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_and_cache(key))
+            task.add_done_callback(functools.partial(self._lookup_done, key))
+            self._inflight[key] = task
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise httpcore.ConnectTimeout(f"Timed out resolving {host}") from None
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None,
+                          socket_options: typing.Optional[typing.Iterable] = None) -> httpcore.AsyncNetworkStream:
+        last_exc: Optional[Exception] = None
+        for address in await self.resolve(host, port, timeout):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_exc = exc
+        if last_exc is None:
+            raise httpcore.ConnectError(f"No addresses found for {host}")
+        # Every cached address failed; resolve afresh next time
+        self._cache.pop((host, port), None)
+        raise last_exc
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options: typing.Optional[typing.Iterable] = None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
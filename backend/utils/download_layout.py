@@ -0,0 +1,90 @@
+# backend/utils/download_layout.py
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from backend import config
+from backend.utils.file_utils import generate_filename_from_url
+from backend.utils.link_index import canonical_url, link_key
+
+LAYOUT_FLAT = "flat"
+LAYOUT_HASHED = "hashed"
+LAYOUT_TEMPLATE = "template"
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_HASHED, LAYOUT_TEMPLATE)
+
+# Template fields fall back to this when the value is not known
+UNKNOWN = "unknown"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+_MAX_SEGMENT = 100
+
+@dataclass(frozen=True)
+class Placement:
+    """Guideline metadata a templated layout files a link under."""
+    domain: Optional[str] = None
+    publish_year: Optional[int] = None
+    guideline_id: Optional[int] = None
+
+    @classmethod
+    def for_guideline(cls, guideline: Any) -> "Placement":
+        """Placement for a Guideline model or a raw guideline dict."""
+        get = guideline.get if isinstance(guideline, dict) else lambda name: getattr(guideline, name, None)
+        return cls(domain=get("domain"), publish_year=get("publish_year"), guideline_id=get("id"))
+
+def new_placements() -> Optional[Dict[str, Placement]]:
+    """An empty link_key() -> Placement map to fill from guidelines, or None if the layout ignores them."""
+    return {} if config.DOWNLOAD_LAYOUT == LAYOUT_TEMPLATE else None
+
+def _segment(value: Any) -> str:
+    """One safe directory name: no separators, no dot-only names, bounded length."""
+    text = _UNSAFE.sub("_", str(value)).strip("._")[:_MAX_SEGMENT]
+    return text or "_"
+
+def shard(url: str, levels: Optional[int] = None) -> str:
+    """Hash-prefix subdirectories for url, e.g. "3f/a2" for two levels.
+
+    Keyed by the canonical link, so variants of one URL (viewer links, http and
+    https) land in the same shard, and stable across processes and restarts.
+    """
+    levels = config.DOWNLOAD_SHARD_LEVELS if levels is None else levels
+    digest = hashlib.sha1(link_key(url).encode("utf-8")).hexdigest()
+    return "/".join(digest[2 * level:2 * level + 2] for level in range(max(levels, 0)))
+
+def _template_dir(url: str, placement: Optional[Placement]) -> str:
+    placement = placement or Placement()
+    host = urlsplit(canonical_url(url)).hostname
+    fields = {
+        "domain": placement.domain or host,
+        "publish_year": placement.publish_year,
+        "guideline_id": placement.guideline_id,
+        "host": host,
+    }
+    values = {name: _segment(UNKNOWN if value is None else value) for name, value in fields.items()}
+    values["shard"] = shard(url)
+    return config.DOWNLOAD_LAYOUT_TEMPLATE.format(**values)
+
+def relative_path(url: str, placement: Optional[Placement] = None, layout: Optional[str] = None) -> PurePosixPath:
+    """
+    Location of url's file relative to DOWNLOAD_DIR under the configured layout.
+
+    The file name comes from the URL; placement supplies guideline fields for
+    the "template" layout (the URL host stands in for a missing domain). Two
+    documents that end up with the same path are told apart when the file is
+    committed (see blob_store.disambiguated_path).
+    """
+    layout = layout or config.DOWNLOAD_LAYOUT
+    name = generate_filename_from_url(url)
+    if layout == LAYOUT_FLAT:
+        return PurePosixPath(name)
+    if layout == LAYOUT_HASHED:
+        directory = shard(url)
+    elif layout == LAYOUT_TEMPLATE:
+        directory = _template_dir(url, placement)
+    else:
+        raise ValueError(f"Unknown download layout {layout!r} (expected one of {', '.join(LAYOUTS)})")
+    # Segments are rebuilt one by one so a template can never point outside DOWNLOAD_DIR
+    parts = [_segment(part) for part in directory.split("/") if part and part != "."]
+    return PurePosixPath(*parts, name)
@@ -0,0 +1,98 @@
+# backend/utils/download_manifest.py
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend import config
+from backend.utils import http_client
+from backend.utils.sqlite_store import SqliteStore
+
+@dataclass
+class ManifestEntry:
+    """What we know about the local copy of one remote PDF."""
+    url: str
+    path: str
+    size: int
+    sha256: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    downloaded_at: float = 0.0
+    pdf_version: Optional[str] = None
+    page_count: Optional[int] = None
+
+    def local_copy_intact(self) -> bool:
+        """True if the recorded file is still on disk with the recorded size (blocking)."""
+        try:
+            return Path(self.path).stat().st_size == self.size
+        except OSError:
+            return False
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the origin answer 304 if unchanged."""
+        return http_client.conditional_headers(self.etag, self.last_modified)
+
+class DownloadManifest(SqliteStore):
+    """Persistent record of downloaded files (URL -> path, size, validators, sha256)."""
+
+    def __init__(self, path: Path):
+        super().__init__(path, [
+            """CREATE TABLE IF NOT EXISTS downloads (
+                url TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                downloaded_at REAL NOT NULL,
+                pdf_version TEXT,
+                page_count INTEGER
+            )""",
+        ])
+        # Manifests written before PDF metadata was recorded lack its columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(downloads)")}
+        for column, kind in (("pdf_version", "TEXT"), ("page_count", "INTEGER")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE downloads ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def _get(self, url: str) -> Optional[ManifestEntry]:
+        row = self._conn.execute(
+            "SELECT url, path, size, sha256, etag, last_modified, downloaded_at, pdf_version, page_count "
+            "FROM downloads WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def _put(self, entry: ManifestEntry) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO downloads "
+            "(url, path, size, sha256, etag, last_modified, downloaded_at, pdf_version, page_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.url, entry.path, entry.size, entry.sha256, entry.etag, entry.last_modified,
+             entry.downloaded_at or time.time(), entry.pdf_version, entry.page_count),
+        )
+        self._conn.commit()
+
+    async def get(self, url: str) -> Optional[ManifestEntry]:
+        return await self._run(self._get, url)
+
+    async def put(self, entry: ManifestEntry) -> None:
+        await self._run(self._put, entry)
+
+# Global manifest instance, opened lazily on first use
+_manifest: Optional[DownloadManifest] = None
+
+def get_manifest() -> DownloadManifest:
+    """Returns the shared download manifest, opening it on first use."""
+    global _manifest
+    if _manifest is None:
+        _manifest = DownloadManifest(config.DOWNLOAD_MANIFEST_PATH or config.DOWNLOAD_DIR / ".manifest.sqlite3")
+    return _manifest
+
+def close_manifest() -> None:
+    """Closes the shared download manifest if it was opened."""
+    global _manifest
+    if _manifest is not None:
+        _manifest.close()
+    _manifest = None
@@ -0,0 +1,84 @@
+# backend/utils/file_lock.py
+import asyncio
+import fcntl
+import os
+from pathlib import Path
+from typing import Optional
+
+from backend.utils import disk_writer
+
+# Seconds between attempts to take a lock held by someone else
+_POLL_INTERVAL = 0.2
+
+class PathLock:
+    """
+    Exclusive lock on a file path, shared by every process on the host.
+
+    Taken with flock() on a `.<name>.lock` file beside the path, which the
+    holder removes on release. Each PathLock opens the lock file itself, so two
+    PathLocks for one path also exclude each other within a process. The
+    blocking calls run on the disk writer pool; waiting polls, so no thread is
+    tied up while another process holds the lock.
+    """
+
+    def __init__(self, path: Path):
+        self.lock_path = path.with_name(f".{path.name}.lock")
+        self._fd: Optional[int] = None
+
+    def _try_lock(self) -> bool:
+        while True:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            try:
+                current = os.stat(self.lock_path)
+                opened = os.fstat(fd)
+                same = (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+            except FileNotFoundError:
+                same = False
+            if same:
+                self._fd = fd
+                return True
+            # The previous holder removed the file while we waited for it; lock the new one
+            os.close(fd)
+
+    def _unlock(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            # Removed while still held, so a waiter that opened it notices and retries
+            self.lock_path.unlink(missing_ok=True)
+            os.close(fd)
+
+    def _unlock_if_taken(self, attempt: asyncio.Future) -> None:
+        if not attempt.cancelled() and attempt.exception() is None and attempt.result():
+            self._unlock()
+
+    async def acquire(self, wait: bool = True) -> bool:
+        """Takes the lock, waiting for it unless wait is False; True if it was taken."""
+        loop = asyncio.get_running_loop()
+        while True:
+            attempt = loop.run_in_executor(disk_writer.get_executor(), self._try_lock)
+            try:
+                taken = await asyncio.shield(attempt)
+            except asyncio.CancelledError:
+                # Don't leave the lock held if the attempt succeeds after all
+                attempt.add_done_callback(self._unlock_if_taken)
+                raise
+            if taken or not wait:
+                return taken
+            await asyncio.sleep(_POLL_INTERVAL)
+
+    async def release(self) -> None:
+        if self._fd is not None:
+            # Shielded: a cancelled caller must still give the lock back
+            await asyncio.shield(asyncio.get_running_loop().run_in_executor(disk_writer.get_executor(), self._unlock))
+
+    async def __aenter__(self) -> "PathLock":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
@@ -1,13 +1,36 @@
 # backend/utils/file_utils.py
 import os
+import re
+import json
+import asyncio
+import hashlib
+from dataclasses import dataclass
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 import httpx
-from backend.config import DOWNLOAD_DIR
+from backend import config
+from backend.utils import bandwidth, blob_store, disk_writer, pdf_inspect
+
+# Suffix for downloads in progress; renamed to the final name once complete
+PARTIAL_SUFFIX = ".part"
+
+@dataclass
+class SavedFile:
+    """Outcome of a completed download."""
+    path: Path
+    size: int
+    sha256: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    pdf_version: Optional[str] = None
+    page_count: Optional[int] = None
 
 def ensure_download_dir_exists():
     """Creates the download directory if it doesn't exist."""
-    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    config.DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    if config.CONTENT_ADDRESSED_STORAGE:
+        blob_store.ensure_blob_dirs_exist()
 
 def extract_pdf_url(url: str) -> str:
     """Extracts the actual PDF URL from viewer URLs.
@@ -40,6 +63,10 @@ def extract_pdf_url(url: str) -> str:
     # If not a viewer URL or extraction failed, return the original URL
     return url
 
+def _url_digest(url: str) -> str:
+    # Unlike hash(), stable across processes and restarts
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
 def generate_filename_from_url(url: str) -> str:
     """Generates a safe filename from a URL."""
     try:
@@ -51,8 +78,7 @@ def generate_filename_from_url(url: str) -> str:
         
         if not file_name or file_name == '/':
             # Generate a fallback name using hash if path is empty/root
-            safe_part = str(hash(url)).replace('-', '_') # Basic safety
-            file_name = f"downloaded_{safe_part}.pdf"
+            file_name = f"downloaded_{_url_digest(url)}.pdf"
         elif not file_name.lower().endswith('.pdf'):
             # Ensure it has a .pdf extension if it looks like a file
             if '.' in file_name: # Avoid adding .pdf to directory-like paths
@@ -67,13 +93,159 @@ def generate_filename_from_url(url: str) -> str:
     except Exception as e:
         print(f"Error generating filename from URL {url}: {e}")
         # Fallback in case of unexpected URL parsing errors
-        return f"downloaded_{str(hash(url)).replace('-', '_')}.pdf"
+        return f"downloaded_{_url_digest(url)}.pdf"
+
+def partial_path(file_path: Path) -> Path:
+    """Path of the in-progress download for file_path."""
+    return file_path.with_name(file_path.name + PARTIAL_SUFFIX)
+
+def _validator_path(file_path: Path) -> Path:
+    """Sidecar holding the validator the partial file was downloaded against."""
+    return file_path.with_name(file_path.name + PARTIAL_SUFFIX + ".json")
+
+def _if_range_validator(response: httpx.Response) -> Optional[str]:
+    """Picks a validator usable in If-Range (strong ETag preferred, else Last-Modified)."""
+    etag = response.headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("last-modified")
+
+def discard_partial(file_path: Path) -> None:
+    """Removes any partial download (and its validator) for file_path."""
+    for path in (partial_path(file_path), _validator_path(file_path)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+def get_resume_headers(file_path: Path) -> Tuple[int, Dict[str, str]]:
+    """Returns (offset, headers) for resuming a partial download of file_path.
+
+    The Range request is guarded by If-Range, so if the remote file changed the
+    server answers with the full body instead of a mismatched tail.
+    """
+    part = partial_path(file_path)
+    try:
+        offset = part.stat().st_size
+        validator = json.loads(_validator_path(file_path).read_text()).get("if_range")
+    except (OSError, ValueError):
+        offset, validator = 0, None
+    if offset == 0 or not validator:
+        # Nothing to resume, or no way to prove the partial bytes are still current
+        discard_partial(file_path)
+        return 0, {}
+    return offset, {"Range": f"bytes={offset}-", "If-Range": validator}
 
-async def save_stream_to_file(response: httpx.Response, file_path: Path) -> None:
+def _content_range_start(response: httpx.Response) -> Optional[int]:
+    """Parses the first byte position from a 'bytes start-end/total' Content-Range header."""
+    match = re.match(r"bytes\s+(\d+)-\d+/(?:\d+|\*)", response.headers.get("content-range", ""))
+    return int(match.group(1)) if match else None
+
+class DownloadRejected(Exception):
+    """Raised when a download response is not something we should save."""
+
+def validate_download_response(response: httpx.Response) -> None:
+    """Checks status, content type and declared size before any bytes are written."""
+    response.raise_for_status()
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in config.REJECTED_CONTENT_TYPES:
+        raise DownloadRejected(f"unexpected content type {content_type}")
+    content_length = response.headers.get("content-length")
+    if config.MAX_DOWNLOAD_BYTES and content_length and content_length.isdigit() \
+            and int(content_length) > config.MAX_DOWNLOAD_BYTES:
+        raise DownloadRejected(f"file too large ({content_length} bytes)")
+
+def _hash_file(path: Path, inspector: Optional[pdf_inspect.PdfInspector] = None):
+    """Hashes (and inspects) an existing file so a resumed download can continue the digest."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+            if inspector is not None:
+                inspector.update(block)
+    return digest
+
+def _save_validator(file_path: Path, url: str, validator: Optional[str]) -> None:
+    """Records (or clears) the If-Range validator a new partial file is downloaded against."""
+    if validator:
+        _validator_path(file_path).write_text(json.dumps({"url": url, "if_range": validator}))
+    else:
+        _validator_path(file_path).unlink(missing_ok=True)
+
+def _finalize_partial(file_path: Path) -> None:
+    os.replace(partial_path(file_path), file_path)
+    _validator_path(file_path).unlink(missing_ok=True)
+
+async def save_stream_to_file(response: httpx.Response, file_path: Path, resume_offset: int = 0) -> SavedFile:
     """Asynchronously saves the content stream from an httpx response to a file.
+
+    Bytes are written to a `.part` file that is atomically renamed to file_path on
+    completion. A 206 response matching resume_offset is appended to the existing
+    partial file; any other success response restarts it from zero. The SHA-256
+    of the file is computed while streaming. Disk writes and hashing run on the
+    disk writer thread pool, never on the event loop. Reading is paced by the
+    process-wide bandwidth limiter.
+
+    With VALIDATE_PDF_CONTENT, a body without a %PDF- header in its first
+    kilobyte is rejected as soon as that kilobyte arrives, one without a
+    trailing %%EOF once complete, and the PDF version and page count are
+    extracted while writing.
     Note: Assumes response is already being managed by a context manager in the calling code.
     """
     response.raise_for_status() # Check status code before writing
-    with open(file_path, "wb") as f:
-        async for chunk in response.aiter_bytes():
-            f.write(chunk) 
\ No newline at end of file
+    loop = asyncio.get_running_loop()
+    executor = disk_writer.get_executor()
+    part = partial_path(file_path)
+    inspector = pdf_inspect.PdfInspector() if config.VALIDATE_PDF_CONTENT else None
+    if response.status_code == 206:
+        if not resume_offset or _content_range_start(response) != resume_offset:
+            await loop.run_in_executor(executor, discard_partial, file_path)
+            raise IOError(f"Unexpected partial response: {response.headers.get('content-range')}")
+        append = True
+        digest = await loop.run_in_executor(executor, _hash_file, part, inspector)
+    else:
+        append = False
+        digest = hashlib.sha256()
+        await loop.run_in_executor(executor, _save_validator, file_path, str(response.url),
+                                   _if_range_validator(response))
+
+    writer = disk_writer.AsyncFileWriter(part, append=append, digest=digest, inspector=inspector)
+    await writer.open()
+    # Header bytes still being sniffed on the event loop (a resumed file was checked when it started)
+    head = b"" if inspector is not None and not append else None
+    limiter = bandwidth.get_limiter()
+    host = response.url.host
+    try:
+        async for chunk in response.aiter_bytes(config.DOWNLOAD_CHUNK_SIZE or None):
+            await limiter.throttle(host, len(chunk))
+            if head is not None:
+                # Reject error pages and login walls before paying for the rest of the body
+                head += chunk[:pdf_inspect.HEADER_WINDOW]
+                if pdf_inspect.header_version(head):
+                    head = None
+                elif len(head) >= pdf_inspect.HEADER_WINDOW:
+                    raise DownloadRejected(f"not a PDF (starts with {pdf_inspect.describe_start(head)!r})")
+            await writer.write(chunk)
+            if config.MAX_DOWNLOAD_BYTES and writer.size > config.MAX_DOWNLOAD_BYTES:
+                # Servers can omit or understate Content-Length; enforce the cap on actual bytes
+                raise DownloadRejected(f"file exceeds {config.MAX_DOWNLOAD_BYTES} bytes")
+        await writer.close()
+        if inspector is not None and inspector.problem():
+            raise DownloadRejected(inspector.problem())
+    except DownloadRejected:
+        await writer.close()
+        await loop.run_in_executor(executor, discard_partial, file_path)
+        raise
+    finally:
+        # Persist whatever arrived so an interrupted download can be resumed
+        await writer.close()
+    await loop.run_in_executor(executor, _finalize_partial, file_path)
+    return SavedFile(
+        path=file_path,
+        size=writer.size,
+        sha256=digest.hexdigest(),
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        pdf_version=inspector.version if inspector else None,
+        page_count=inspector.page_count if inspector else None,
+    )
@@ -0,0 +1,211 @@
+# backend/utils/host_guard.py
+import asyncio
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from backend import config
+from backend.utils.retry import parse_retry_after
+
+# Statuses that mean the host is failing (trip the breaker)
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+
+def is_throttled(response: httpx.Response) -> bool:
+    """True if the host asks us to slow down: a 429, or a 503 carrying Retry-After.
+
+    A bare 503 is treated as a server error only; sporadic errors would otherwise
+    drive the rate down to the minimum.
+    """
+    return response.status_code == 429 or (response.status_code == 503 and "retry-after" in response.headers)
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    Closed: requests flow. After failure_threshold consecutive failures the
+    circuit opens and requests fail immediately for reset_timeout seconds.
+    Then it is half-open: a single probe request is let through, and its
+    outcome closes the circuit again or re-opens it.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """True if a request may be sent now; in half-open state only one probe is allowed."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """A request ended without an answer either way (e.g. cancelled); free the probe slot."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token bucket whose rate adapts to the host (AIMD).
+
+    Without a configured max_rate a healthy host is not limited at all. The
+    first throttling response (see is_throttled) sets the rate to half the
+    request rate observed at that moment; further throttling halves it again,
+    at most once per second so a burst of throttled responses counts once, and
+    a Retry-After pauses the bucket. Each success adds back a fraction of a request per
+    second until the pre-throttle rate (or max_rate) is reached again.
+    """
+
+    def __init__(self, max_rate: float, min_rate: float, increase: float = 0.1):
+        self.max_rate = max_rate # 0 = no cap while the host is healthy
+        self.min_rate = min_rate
+        self.increase = increase
+        self.rate: Optional[float] = max_rate or None # None = unlimited
+        self._recovered_rate = 0.0 # Rate at which an uncapped limiter goes back to unlimited
+        self._tokens = max(1.0, max_rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._window_start = self._updated
+        self._window_count = 0
+        self._observed_rate = 0.0
+        self._lock = asyncio.Lock()
+
+    def _observe(self, now: float) -> None:
+        """Tracks the request rate over one-second windows."""
+        if now - self._window_start >= 1.0:
+            self._observed_rate = self._window_count / (now - self._window_start)
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+
+    def _refill(self, now: float) -> None:
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Waits until the bucket holds a token, then takes it."""
+        if self.rate is None:
+            self._observe(time.monotonic())
+            return
+        async with self._lock: # Waiters take tokens in arrival order
+            while self.rate is not None:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        self._observe(time.monotonic())
+
+    def record_success(self) -> None:
+        if self.rate is None:
+            return
+        self.rate += self.increase
+        if self.max_rate:
+            self.rate = min(self.max_rate, self.rate)
+        elif self.rate >= self._recovered_rate:
+            self.rate = None
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        if self.rate is None:
+            # Start limiting from what the host was actually receiving (at least 1 req/s)
+            current = self._window_count / max(now - self._window_start, 1.0)
+            observed = max(self._observed_rate, current, 1.0)
+            self._recovered_rate = observed
+            self.rate = max(self.min_rate, observed / 2)
+            self._last_decrease = now
+            self._tokens, self._updated = 0.0, now
+        elif now - self._last_decrease >= 1.0:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + min(retry_after, config.RETRY_MAX_RETRY_AFTER))
+
+class HostGuard:
+    """Circuit breaker and rate limiter for one host."""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+        self.limiter = AdaptiveRateLimiter(config.RATE_LIMIT_MAX_RPS, config.RATE_LIMIT_MIN_RPS) \
+            if config.RATE_LIMIT_ENABLED else None
+
+class GuardedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper applying a HostGuard to every request by target host.
+
+    Connection failures and 5xx responses count against the host's circuit;
+    throttling responses (see is_throttled) slow its rate limiter. Requests to an open circuit fail
+    with CircuitOpenError without touching the network.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._guards: Dict[str, HostGuard] = {}
+
+    def guard_for(self, host: str) -> HostGuard:
+        guard = self._guards.get(host)
+        if guard is None:
+            guard = self._guards[host] = HostGuard()
+        return guard
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = self.guard_for(request.url.host)
+        if config.CIRCUIT_BREAKER_ENABLED and not guard.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for host {request.url.host}", request=request)
+        try:
+            if guard.limiter:
+                await guard.limiter.acquire()
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            guard.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled before the host answered; don't hold the half-open probe
+            guard.breaker.record_abandoned()
+            raise
+
+        if response.status_code in FAILURE_STATUSES:
+            guard.breaker.record_failure()
+        else:
+            guard.breaker.record_success()
+        if guard.limiter:
+            if is_throttled(response):
+                guard.limiter.record_throttle(parse_retry_after(response.headers.get("retry-after")))
+            else:
+                guard.limiter.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
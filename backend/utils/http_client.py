@@ -1,11 +1,99 @@
 # pdfdownloader/utils/http_client.py
+import time
 import httpx
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Optional, AsyncContextManager
+from typing import AsyncGenerator, Optional, AsyncContextManager, Dict, Tuple
+from backend import config
+from backend.utils.dns_cache import CachingResolverBackend
+from backend.utils import metrics
+from backend.utils.host_guard import GuardedTransport
 
 # Global variable to hold the client instance
 _client: Optional[httpx.AsyncClient] = None
 
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 -- optional dependency required by httpx for HTTP/2
+        return True
+    except ImportError:
+        return False
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Outermost transport layer recording per-host latency (until response headers),
+    status codes, errors and requests in flight. Keeps a reference to the
+    connection pool for the pool utilization gauge.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, pool=None):
+        self._transport = transport
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        method, host = request.method, request.url.host
+        metrics.HTTP_IN_FLIGHT.inc(method=method)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError as exc:
+            metrics.HTTP_ERRORS.inc(method=method, host=host, error=exc.__class__.__name__)
+            raise
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec(method=method)
+        metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, host=host)
+        metrics.HTTP_RESPONSES.inc(method=method, host=host, status=str(response.status_code))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+def _pool_connections() -> Dict[tuple, float]:
+    """Current pool utilization, read from httpcore's pool (empty when unavailable)."""
+    transport = getattr(_client, "_transport", None)
+    pool = getattr(transport, "pool", None)
+    if pool is None:
+        return {}
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    queued = sum(1 for request in getattr(pool, "_requests", ()) if getattr(request, "connection", None) is None)
+    return {("active",): len(connections) - idle, ("idle",): idle, ("queued",): queued}
+
+metrics.HTTP_POOL_CONNECTIONS.set_collector(_pool_connections)
+
+def build_http_client() -> httpx.AsyncClient:
+    """Creates the shared client with the pool, timeouts and protocol options from config."""
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=config.HTTP_CONNECT_TIMEOUT,
+        read=config.HTTP_READ_TIMEOUT,
+        write=config.HTTP_WRITE_TIMEOUT,
+        pool=config.HTTP_POOL_TIMEOUT,
+    )
+    http2 = config.HTTP2_ENABLED
+    if http2 and not _http2_available():
+        print("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+        http2 = False
+
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2, retries=0)
+    pool = getattr(transport, "_pool", None)
+    if config.DNS_CACHE_TTL > 0:
+        # httpx does not expose the network backend; wrap the one its pool created
+        # (private httpcore attributes, hence the httpcore pin in pyproject.toml)
+        if pool is not None and hasattr(pool, "_network_backend"):
+            pool._network_backend = CachingResolverBackend(pool._network_backend, config.DNS_CACHE_TTL)
+    if config.CIRCUIT_BREAKER_ENABLED or config.RATE_LIMIT_ENABLED:
+        # Per-host circuit breaker and adaptive rate limit in front of the pool
+        transport = GuardedTransport(transport)
+    if config.METRICS_ENABLED:
+        # Outermost, so open circuits and rate limit waits show up in the metrics
+        transport = InstrumentedTransport(transport, pool)
+
+    return httpx.AsyncClient(transport=transport, timeout=timeout, follow_redirects=True)
+
 @asynccontextmanager
 async def lifespan_manager(app):
     """
@@ -13,7 +101,7 @@ async def lifespan_manager(app):
     To be used with FastAPI's lifespan event handler.
     """
     global _client
-    _client = httpx.AsyncClient(timeout=15.0, follow_redirects=True) # Default timeout
+    _client = build_http_client()
     print("HTTP Client started.")
     yield
     if _client:
@@ -28,14 +116,47 @@ def get_http_client() -> httpx.AsyncClient:
         raise RuntimeError("HTTP client is not initialized. Ensure lifespan manager is used.")
     return _client
 
-async def perform_head_request(url: str) -> httpx.Response:
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """Conditional request headers that let the origin answer 304 if a copy with these validators is unchanged."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+async def perform_head_request(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
     """Performs an HTTP HEAD request using the shared client."""
     client = get_http_client()
-    return await client.head(url)
+    return await client.head(url, headers=headers)
+
+async def perform_range_probe(url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[httpx.Response, bytes]:
+    """
+    GETs the first RANGE_PROBE_BYTES of url with a Range request.
+
+    Returns the (closed) response and the bytes read. At most RANGE_PROBE_BYTES
+    are read even from servers that ignore Range and send the whole file.
+    """
+    client = get_http_client()
+    limit = config.RANGE_PROBE_BYTES
+    probe_headers = {**(headers or {}), "Range": f"bytes=0-{limit - 1}"}
+    async with client.stream("GET", url, headers=probe_headers) as response:
+        head = b""
+        async for chunk in response.aiter_bytes():
+            head += chunk
+            if len(head) >= limit:
+                break
+    return response, head[:limit]
 
-def stream_download_request(url: str) -> AsyncContextManager[httpx.Response]:
+def stream_download_request(url: str, headers: Optional[Dict[str, str]] = None) -> AsyncContextManager[httpx.Response]:
     """Initiates an async streaming HTTP GET request for downloading."""
     client = get_http_client()
-    # Use a longer timeout for potentially large downloads
+    # Use a longer read timeout for potentially large downloads
     # The 'stream' context manager handles response closing
-    return client.stream("GET", url, timeout=60.0) 
\ No newline at end of file
+    timeout = httpx.Timeout(
+        connect=config.HTTP_CONNECT_TIMEOUT,
+        read=config.DOWNLOAD_READ_TIMEOUT,
+        write=config.HTTP_WRITE_TIMEOUT,
+        pool=config.HTTP_POOL_TIMEOUT,
+    )
+    return client.stream("GET", url, headers=headers, timeout=timeout) 
\ No newline at end of file
@@ -0,0 +1,169 @@
+# backend/utils/link_cache.py
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend import config
+from backend.utils import http_client
+from backend.utils.sqlite_store import SqliteStore
+
+# Size-bound eviction runs every this many writes, so the bound is soft by up to this amount
+_EVICT_EVERY_WRITES = 256
+# Cache hits update last_access in memory; they are written with the next put, or
+# once this many are pending or the oldest is this many seconds old
+_TOUCH_FLUSH_ENTRIES = 1024
+_TOUCH_FLUSH_SECONDS = 60.0
+
+@dataclass
+class CachedLink:
+    """Last known check outcome for a resolved PDF URL."""
+    url: str
+    status_code: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    checked_at: float = 0.0
+    checked_with: Optional[str] = None # "HEAD" or "GET" (ranged probe)
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.checked_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the origin answer 304 if unchanged."""
+        return http_client.conditional_headers(self.etag, self.last_modified)
+
+class LinkCache(SqliteStore):
+    """SQLite-backed cache of link check results with a TTL and an LRU size bound."""
+
+    def __init__(self, path: Path, ttl: float, max_entries: int):
+        super().__init__(path, [
+            """CREATE TABLE IF NOT EXISTS link_cache (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_length INTEGER,
+                checked_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                checked_with TEXT
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_link_cache_access ON link_cache (last_access)",
+        ])
+        # Caches written before the check method was recorded lack its column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(link_cache)")}
+        if "checked_with" not in columns:
+            self._conn.execute("ALTER TABLE link_cache ADD COLUMN checked_with TEXT")
+            self._conn.commit()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes_since_evict = 0
+        self._touched: Dict[str, float] = {} # url -> last access not yet written
+        self._touch_flush_at = 0.0
+
+    def _get(self, url: str) -> Optional[CachedLink]:
+        row = self._conn.execute(
+            "SELECT url, status_code, etag, last_modified, content_length, checked_at, checked_with "
+            "FROM link_cache WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if not self._touched:
+            self._touch_flush_at = now + _TOUCH_FLUSH_SECONDS
+        self._touched[url] = now
+        if len(self._touched) >= _TOUCH_FLUSH_ENTRIES or now >= self._touch_flush_at:
+            self._flush_touched()
+            self._conn.commit()
+        return CachedLink(*row)
+
+    def _flush_touched(self) -> None:
+        """Writes the pending last_access updates of cache hits (caller commits)."""
+        if self._touched:
+            self._conn.executemany("UPDATE link_cache SET last_access = ? WHERE url = ?",
+                                   ((at, url) for url, at in self._touched.items()))
+            self._touched.clear()
+
+    def _put(self, entry: CachedLink) -> None:
+        now = time.time()
+        self._flush_touched()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO link_cache "
+            "(url, status_code, etag, last_modified, content_length, checked_at, last_access, checked_with) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.url, entry.status_code, entry.etag, entry.last_modified,
+             entry.content_length, entry.checked_at or now, now, entry.checked_with),
+        )
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= _EVICT_EVERY_WRITES:
+            self._evict_lru()
+        self._conn.commit()
+
+    def _evict_lru(self) -> None:
+        """Deletes least recently used entries beyond the size bound."""
+        self._writes_since_evict = 0
+        self._flush_touched()
+        self._conn.execute(
+            "DELETE FROM link_cache WHERE url IN ("
+            "SELECT url FROM link_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    _on_close = _evict_lru
+
+    async def get(self, url: str) -> Optional[CachedLink]:
+        return await self._run(self._get, url)
+
+    async def put(self, entry: CachedLink) -> None:
+        await self._run(self._put, entry)
+
+# Global cache instance, opened lazily on first use
+_cache: Optional[LinkCache] = None
+_open_failed = False
+
+def get_link_cache() -> Optional[LinkCache]:
+    """Returns the shared link cache, or None when caching is disabled or unavailable."""
+    global _cache, _open_failed
+    if not config.LINK_CACHE_ENABLED or _open_failed:
+        return None
+    if _cache is None:
+        try:
+            _cache = LinkCache(config.LINK_CACHE_PATH, config.LINK_CACHE_TTL, config.LINK_CACHE_MAX_ENTRIES)
+        except (OSError, sqlite3.Error) as exc:
+            # Checks still work without the cache; don't retry opening on every link
+            print(f"Link cache disabled, could not open {config.LINK_CACHE_PATH}: {exc}")
+            _open_failed = True
+            return None
+    return _cache
+
+def is_cacheable_status(status_code: int) -> bool:
+    """Only definitive answers are cached; throttling and server errors are retried next time."""
+    return status_code < 500 and status_code not in (304, 429)
+
+def close_link_cache() -> None:
+    """Closes the shared link cache if it was opened."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
+
+def cache_entry_from_response(url: str, response, checked_with: Optional[str] = None) -> CachedLink:
+    """Builds a cache entry from an httpx response's status and validator headers.
+
+    A 206 answer to a ranged probe is recorded as a 200 with the full size from Content-Range.
+    """
+    content_length = response.headers.get("content-length")
+    status_code = response.status_code
+    if status_code == 206:
+        status_code = 200
+        content_length = response.headers.get("content-range", "").rpartition("/")[2]
+    return CachedLink(
+        url=url,
+        status_code=status_code,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        content_length=int(content_length) if content_length and content_length.isdigit() else None,
+        checked_at=time.time(),
+        checked_with=checked_with,
+    )
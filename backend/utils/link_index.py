@@ -0,0 +1,94 @@
+# backend/utils/link_index.py
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from backend.utils.file_utils import extract_pdf_url
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_PERCENT_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+def _normalize_escapes(component: str, safe: str) -> str:
+    """Decodes escaped unreserved characters, uppercases other escapes and escapes raw unsafe characters."""
+    def fix(match: "re.Match[str]") -> str:
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else f"%{match.group(1).upper()}"
+    return quote(_PERCENT_ESCAPE.sub(fix, component), safe=safe + "%")
+
+def canonical_url(url: str) -> str:
+    """
+    Resolves a viewer URL to its PDF and normalizes the result.
+
+    Scheme and host are lowercased, default ports and the fragment dropped, an
+    empty path becomes "/" and percent-encoding is normalized (RFC 3986, 6.2.2).
+    URLs that cannot be parsed are returned unchanged.
+    """
+    try:
+        parts = urlsplit(extract_pdf_url(url.strip()))
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if ":" in host:
+        host = f"[{host}]" # IPv6 literal
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    userinfo = parts.netloc.rpartition("@")[0]
+    netloc = f"{userinfo}@{host}" if userinfo else host
+    path = _normalize_escapes(parts.path, safe="/:@!$&'()*+,;=") or "/"
+    query = _normalize_escapes(parts.query, safe="/?:@!$&'()*+,;=")
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+def _dedup_key(target: str) -> str:
+    # http and https variants of a URL name the same document
+    scheme, sep, rest = target.partition("://")
+    return rest if sep and scheme in DEFAULT_PORTS else target
+
+def link_key(url: str) -> str:
+    """Key shared by every spelling of the same document (viewer links, http/https, escapes)."""
+    return _dedup_key(canonical_url(url))
+
+class LinkIndex:
+    """
+    Dedup index from canonical fetch targets back to the input URLs resolving to them.
+
+    Every input is canonicalized once; each target is fetched once and its result
+    reported for every input. When both http and https variants are given, https
+    is fetched.
+    """
+
+    def __init__(self, links: Iterable[str] = ()):
+        self._targets: Dict[str, str] = {} # dedup key -> URL to fetch
+        self._originals: Dict[str, List[str]] = {} # dedup key -> input URLs
+        self._seen: Dict[str, str] = {} # input URL -> dedup key
+        for link in links:
+            self.add(link)
+
+    def add(self, url: str) -> Optional[str]:
+        """Indexes url and returns its dedup key, or None if url itself was already indexed."""
+        if url in self._seen:
+            return None
+        target = canonical_url(url)
+        key = _dedup_key(target)
+        self._seen[url] = key
+        current = self._targets.get(key)
+        if current is None or (target.startswith("https://") and not current.startswith("https://")):
+            self._targets[key] = target
+        self._originals.setdefault(key, []).append(url)
+        return key
+
+    def target(self, key: str) -> str:
+        return self._targets[key]
+
+    def originals(self, key: str) -> List[str]:
+        return self._originals[key]
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Yields (key, target) for every distinct target."""
+        return iter(self._targets.items())
+
+    def __len__(self) -> int:
+        return len(self._targets)
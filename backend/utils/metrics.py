@@ -0,0 +1,245 @@
+# backend/utils/metrics.py
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend import config
+
+# Minimal Prometheus-style metrics: counters, gauges and histograms with labels,
+# rendered in the text exposition format by render(). Metrics are updated from
+# the event loop and from disk writer threads, so every update takes a lock.
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DISK_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+_registry: List["_Metric"] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Gauge(_Metric):
+    """Gauge set directly, or computed at scrape time by `collect` (returning {label values: value})."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set_collector(self, collect: Optional[Callable[[], Dict[LabelValues, float]]]) -> None:
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self._collect is not None:
+            items = list(self._collect().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * len(self.buckets)
+                self._sums[key] = 0.0
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                yield f"{self.name}_bucket", labels, cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), cumulative
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+# --- HTTP ---
+HTTP_REQUEST_DURATION = Histogram(
+    "pdf_http_request_duration_seconds", "Time until response headers, per method and host.", ("method", "host"))
+HTTP_RESPONSES = Counter(
+    "pdf_http_responses_total", "HTTP responses by method, host and status code.", ("method", "host", "status"))
+HTTP_ERRORS = Counter(
+    "pdf_http_errors_total", "Requests that failed without a response (open circuits included), by error class.",
+    ("method", "host", "error"))
+HTTP_IN_FLIGHT = Gauge("pdf_http_requests_in_flight", "HTTP requests waiting for response headers.", ("method",))
+HTTP_POOL_CONNECTIONS = Gauge(
+    "pdf_http_pool_connections", "Pooled connections by state (active, idle), plus requests queued for one.",
+    ("state",))
+RETRIES = Counter("pdf_retries_total", "Retries performed, by reason (status code or error class).", ("reason",))
+
+# --- Downloads / disk ---
+DOWNLOAD_BYTES = Counter("pdf_download_bytes_total", "Response body bytes written to disk.")
+DISK_WRITE_DURATION = Histogram(
+    "pdf_disk_write_seconds", "Duration of one buffered (vectored) write, hashing included.", buckets=DISK_BUCKETS)
+DOWNLOAD_RATE = Gauge(
+    "pdf_download_rate_bytes_per_second",
+    "Download bytes per second over the last few seconds (rate) and the global bandwidth limit (limit, 0 = none).",
+    ("kind",))
+
+# --- Link cache ---
+LINK_CACHE_LOOKUPS = Counter(
+    "pdf_link_cache_lookups_total", "Link check cache lookups: hit, revalidated (304) or miss.", ("result",))
+
+# --- Operations ---
+SCHEDULER_SLOTS = Gauge(
+    "pdf_scheduler_requests", "Links holding a scheduler slot (active) or waiting for one (pending).", ("state",))
+SCHEDULER_WAIT = Histogram(
+    "pdf_scheduler_wait_seconds", "Time a link waited for a scheduler slot, by priority class.", ("priority",))
+DEADLINES_EXCEEDED = Counter(
+    "pdf_deadline_exceeded_total", "Links cancelled at their batch deadline, by stage (queued, running).",
+    ("stage",))
+OPERATION_DURATION = Histogram(
+    "pdf_operation_duration_seconds", "Duration of one link check or download, by outcome.", ("operation", "status"))
+OPERATION_PHASE_DURATION = Histogram(
+    "pdf_operation_phase_seconds", "Time spent in each phase of a link check or download.", ("operation", "phase"))
+
+class Span:
+    """Timing of one operation and its phases; see span()."""
+
+    def __init__(self, operation: str, attrs: Dict[str, object]):
+        self.operation = operation
+        self.attrs = attrs
+        self.phases: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def set(self, **attrs: object) -> None:
+        self.attrs.update(attrs)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times a phase; repeated phases accumulate."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            OPERATION_PHASE_DURATION.observe(elapsed, operation=self.operation, phase=name)
+
+@contextmanager
+def span(operation: str, **attrs: object) -> Iterator[Span]:
+    """
+    Times an operation, recording it in pdf_operation_duration_seconds.
+
+    The "status" attribute (set by the operation) labels the observation. With
+    METRICS_LOG_SPANS enabled, each span is also printed as one JSON line including
+    its phase timings.
+    """
+    current = Span(operation, dict(attrs))
+    try:
+        yield current
+    finally:
+        duration = time.perf_counter() - current.started
+        OPERATION_DURATION.observe(duration, operation=operation, status=str(current.attrs.get("status", "ERROR")))
+        if config.METRICS_LOG_SPANS:
+            print(json.dumps({
+                "span": operation,
+                "duration_ms": round(duration * 1000, 2),
+                "phases_ms": {name: round(value * 1000, 2) for name, value in current.phases.items()},
+                **current.attrs,
+            }, default=str))
@@ -0,0 +1,230 @@
+# backend/utils/payload_stream.py
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional
+
+from backend.utils.download_layout import Placement
+from backend.utils.link_index import link_key
+
+# `{"data": [` at the start of a body: the InputPayload wrapper, whose array is scanned in place
+_DATA_WRAPPER = re.compile(r'\{\s*"data"\s*:\s*\[')
+# Characters needed after a top-level `{` to tell the wrapper from a bare guideline
+_WRAPPER_LOOKAHEAD = 64
+# `, "key": ` introducing a wrapper member after the data array
+_WRAPPER_KEY = re.compile(r'\s*,\s*"(?:[^"\\]|\\.)*"\s*:\s*')
+# Largest single guideline accepted; also bounds buffering of malformed input
+MAX_ITEM_CHARS = 16 * 1024 * 1024
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATORS = re.compile(r"[\s,]*")
+# Outside strings: the next character that opens or closes a container or starts a string
+_STRUCTURE = re.compile(r'["{}\[\]]')
+# Inside a string: everything before its closing quote (stops short of an escape cut off by the chunk end)
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+class PayloadFormatError(ValueError):
+    """Raised when a streamed payload is not valid JSON or NDJSON."""
+
+def pdf_links_in(item: Any) -> Iterator[str]:
+    """Yields the http(s) links of one guideline dict (`pdf_links` list, or legacy `pdf_link`)."""
+    if not isinstance(item, dict):
+        return
+    if isinstance(item.get("pdf_links"), list):
+        links = item["pdf_links"]
+    elif "pdf_link" in item:
+        links = [item.get("pdf_link")]
+    else:
+        return
+    for link in links:
+        if link and isinstance(link, str) and link.lower().startswith(("http://", "https://")):
+            yield link
+
+class _ContainerEnd:
+    """
+    Finds where a JSON object or array ends as its text arrives, skipping
+    brackets inside strings, so an item split across many chunks is scanned
+    once and decoded once rather than re-decoded on every chunk.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False # The text so far ended right after a backslash
+
+    def feed(self, text: str, pos: int = 0) -> int:
+        """Scans text from pos; returns the index just past the container, or -1 if it continues."""
+        while pos < len(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                    pos += 1
+                    continue
+                pos = _STRING_BODY.match(text, pos).end()
+                if pos < len(text):
+                    if text[pos] == "\\":
+                        self.escaped = True
+                    else:
+                        self.in_string = False
+                    pos += 1
+                continue
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+        return -1
+
+class PayloadScanner:
+    """
+    Incremental parser for guideline payloads that never holds more than one guideline.
+
+    Accepts a JSON array of guidelines, the `{"data": [...]}` wrapper, a single
+    guideline object, or NDJSON (one guideline per line). Text is fed in as it
+    arrives; each complete guideline is decoded on its own with the C JSON
+    decoder and returned, so memory stays flat regardless of payload size.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._closers: List[str] = [] # Closing brackets of the containers we are inside
+        self._offset = 0 # Characters consumed before the current buffer, for error messages
+        # An incomplete object or array: its text so far, and where it will end
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._container: Optional[_ContainerEnd] = None
+
+    def feed(self, text: str) -> List[Any]:
+        """Adds text and returns the guidelines completed by it."""
+        if self._container is None:
+            self._buffer += text
+        else:
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            if self._container.feed(text) < 0:
+                if self._pending_chars > MAX_ITEM_CHARS:
+                    raise PayloadFormatError(f"Value at offset {self._offset} is longer than {MAX_ITEM_CHARS} characters")
+                return []
+            self._take_pending()
+        return self._scan(final=False)
+
+    def _take_pending(self) -> None:
+        self._buffer = "".join(self._pending)
+        self._pending, self._pending_chars, self._container = [], 0, None
+
+    def close(self) -> List[Any]:
+        """Returns any remaining guideline and checks the payload was complete."""
+        if self._container is not None:
+            self._take_pending()
+        items = self._scan(final=True)
+        if self._buffer.strip() or self._closers:
+            raise PayloadFormatError("Payload ended unexpectedly")
+        return items
+
+    def _decode(self, pos: int, final: bool):
+        """Decodes one JSON value at pos; returns (None, -1) if more text is needed."""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError as exc:
+            error = PayloadFormatError(f"Invalid JSON at offset {self._offset + exc.pos}: {exc.msg}")
+            if final or len(self._buffer) - pos > MAX_ITEM_CHARS:
+                raise error from None
+            if self._buffer.startswith(("{", "["), pos):
+                # Wait for the closing bracket before decoding again
+                container = _ContainerEnd()
+                if container.feed(self._buffer, pos) >= 0:
+                    raise error from None # Complete, yet invalid
+                self._container = container
+            return None, -1
+        if end == len(self._buffer) and not final and not self._buffer.startswith(("{", "[", '"'), pos):
+            return None, -1 # A number cut off by the chunk boundary would decode short
+        return value, end
+
+    def _scan(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        buf = self._buffer
+        pos = 0
+        while True:
+            in_array = bool(self._closers) and self._closers[-1] == "]"
+            pos = (_SEPARATORS if in_array else _WHITESPACE).match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+
+            if not self._closers:
+                if char == "[":
+                    self._closers.append("]")
+                    pos += 1
+                    continue
+                if char == "{":
+                    wrapper = _DATA_WRAPPER.match(buf, pos)
+                    if wrapper:
+                        self._closers += ["}", "]"]
+                        pos = wrapper.end()
+                        continue
+                    if len(buf) - pos < _WRAPPER_LOOKAHEAD and not final:
+                        break
+            elif char == self._closers[-1]:
+                self._closers.pop()
+                pos += 1
+                continue
+            elif self._closers[-1] == "}":
+                # Wrapper keys after "data": skip `, "key": value` pairs
+                pair = _WRAPPER_KEY.match(buf, pos)
+                if not pair:
+                    if final or len(buf) - pos > _WRAPPER_LOOKAHEAD:
+                        raise PayloadFormatError(f"Unexpected {char!r} at offset {self._offset + pos}")
+                    break
+                value, end = self._decode(pair.end(), final)
+                if end < 0:
+                    break
+                pos = end
+                continue
+
+            value, end = self._decode(pos, final)
+            if end < 0:
+                break
+            items.append(value)
+            pos = end
+
+        self._buffer = buf[pos:]
+        self._offset += pos
+        if self._container is not None:
+            # Kept as a list of chunks until the value is complete
+            self._pending, self._pending_chars, self._buffer = [self._buffer], len(self._buffer), ""
+        return items
+
+def _links_of(item: Any, placements: Optional[Dict[str, Placement]]) -> List[str]:
+    links = list(pdf_links_in(item))
+    if placements is not None and links:
+        placement = Placement.for_guideline(item)
+        for link in links:
+            placements.setdefault(link_key(link), placement)
+    return links
+
+async def iter_pdf_links(chunks: AsyncIterable[bytes],
+                         placements: Optional[Dict[str, Placement]] = None) -> AsyncIterator[str]:
+    """Yields the PDF links of a streamed guideline payload as soon as each guideline is read.
+
+    If placements is given, each link's guideline fields are recorded in it
+    (keyed by link_key(), first guideline wins) before the link is yielded.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = PayloadScanner()
+    try:
+        async for chunk in chunks:
+            for item in scanner.feed(decoder.decode(chunk)):
+                for link in _links_of(item, placements):
+                    yield link
+        for item in scanner.feed(decoder.decode(b"", final=True)) + scanner.close():
+            for link in _links_of(item, placements):
+                yield link
+    except UnicodeDecodeError as exc:
+        raise PayloadFormatError(f"Payload is not valid UTF-8: {exc.reason}") from None
@@ -0,0 +1,91 @@
+# backend/utils/pdf_inspect.py
+import re
+from typing import Optional
+
+# Readers accept the %PDF- header anywhere in the first 1024 bytes (some servers
+# prepend junk) and the %%EOF marker anywhere in the last 1024 bytes.
+HEADER_WINDOW = 1024
+TRAILER_WINDOW = 1024
+
+_HEADER = re.compile(rb"%PDF-(\d\.\d)")
+_LINEARIZED = re.compile(rb"<<\s*/Linearized\b(.{0,512}?)>>", re.S)
+_LINEARIZED_PAGES = re.compile(rb"/N\s+(\d+)")
+# Page objects (not the /Pages tree nodes) and cross-reference sections
+_PAGE_OBJECT = re.compile(rb"/Type\s{0,8}/Page(?![A-Za-z])")
+_STARTXREF = re.compile(rb"startxref(?![A-Za-z])")
+# Bytes carried over between chunks so markers split across them are still found
+_CARRY = 32
+
+def header_version(head: bytes) -> Optional[str]:
+    """The version from a %PDF-x.y header within the first HEADER_WINDOW bytes, or None."""
+    match = _HEADER.search(head, 0, HEADER_WINDOW + 8)
+    return match.group(1).decode("ascii") if match and match.start() < HEADER_WINDOW else None
+
+def describe_start(head: bytes) -> str:
+    """Short printable rendering of the first bytes of a body, for error messages."""
+    text = head[:16].decode("latin-1")
+    return "".join(char if char.isprintable() else "." for char in text)
+
+class PdfInspector:
+    """
+    Incremental PDF sniffer with a hashlib-style update(), fed the body as it is written.
+
+    Keeps the first and last kilobyte for the header, linearization dictionary
+    and %%EOF marker, and counts page objects and cross-reference sections on
+    the fly, so metadata comes without a second pass over the file. Only
+    uncompressed structure is visible: page objects inside compressed object
+    streams (PDF 1.5+) are not counted.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._head = b""
+        self._tail = b""
+        self._page_objects = 0
+        self._xref_sections = 0
+
+    def update(self, data: bytes) -> None:
+        if not data:
+            return
+        if len(self._head) < HEADER_WINDOW:
+            self._head += data[:HEADER_WINDOW - len(self._head)]
+        carry = self._tail[-_CARRY:]
+        boundary = carry + data[:_CARRY]
+        if any(marker in data or marker in boundary for marker in (b"/Type", b"startxref")):
+            window = carry + data
+            self._page_objects += self._count_new(_PAGE_OBJECT, window, len(carry))
+            self._xref_sections += self._count_new(_STARTXREF, window, len(carry))
+        self._tail = data[-TRAILER_WINDOW:] if len(data) >= TRAILER_WINDOW \
+            else (self._tail + data)[-TRAILER_WINDOW:]
+        self.size += len(data)
+
+    @staticmethod
+    def _count_new(pattern: "re.Pattern[bytes]", window: bytes, carried: int) -> int:
+        # A match is counted with the chunk holding the byte after it, so the lookahead
+        # has really seen that byte and a match is never counted twice
+        return sum(1 for match in pattern.finditer(window) if carried <= match.end() < len(window))
+
+    @property
+    def version(self) -> Optional[str]:
+        return header_version(self._head)
+
+    @property
+    def page_count(self) -> Optional[int]:
+        """Pages from the linearization dictionary, else from counted page objects; None if unknown."""
+        linearized = _LINEARIZED.search(self._head)
+        if linearized:
+            pages = _LINEARIZED_PAGES.search(linearized.group(1))
+            if pages:
+                return int(pages.group(1))
+        # Incremental updates repeat page objects, so only trust counts from a single revision
+        if self._page_objects and self._xref_sections == 1:
+            return self._page_objects
+        return None
+
+    def problem(self) -> Optional[str]:
+        """Why the bytes seen so far are not a complete PDF, or None when they look like one."""
+        if self.version is None:
+            return f"not a PDF (starts with {describe_start(self._head)!r})"
+        if b"%%EOF" not in self._tail:
+            return "truncated PDF (no %%EOF marker)"
+        return None
@@ -0,0 +1,126 @@
+# backend/utils/retry.py
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, FrozenSet, Optional, Tuple, Type, TypeVar
+
+import httpx
+
+from backend import config
+from backend.utils import metrics
+
+T = TypeVar("T")
+
+# Transport failures worth another attempt: the request may well succeed on a fresh
+# connection. Errors such as InvalidURL, UnsupportedProtocol or TooManyRedirects are
+# deterministic and are never retried.
+DEFAULT_RETRY_EXCEPTIONS: Tuple[Type[Exception], ...] = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.WriteTimeout,
+    httpx.PoolTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How transient failures are retried: attempts, backoff, and which errors qualify."""
+    max_attempts: int = 3
+    base_delay: float = 0.5 # Seconds before the first retry; doubles every attempt
+    max_delay: float = 20.0 # Cap on a single backoff delay
+    deadline: float = 90.0 # Total seconds across all attempts and waits
+    max_retry_after: float = 60.0 # Longest Retry-After we are willing to honor
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: frozenset({429, 500, 502, 503, 504}))
+    retry_exceptions: Tuple[Type[Exception], ...] = DEFAULT_RETRY_EXCEPTIONS
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the wait after `attempt` failed."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def delay_for(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after exc, or None if it should not be retried."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            if exc.response.status_code not in self.retry_statuses:
+                return None
+            retry_after = parse_retry_after(exc.response.headers.get("retry-after"))
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+            return self.backoff(attempt)
+        if isinstance(exc, self.retry_exceptions):
+            return self.backoff(attempt)
+        return None
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=config.RETRY_MAX_ATTEMPTS,
+            base_delay=config.RETRY_BASE_DELAY,
+            max_delay=config.RETRY_MAX_DELAY,
+            deadline=config.RETRY_DEADLINE,
+            max_retry_after=config.RETRY_MAX_RETRY_AFTER,
+            retry_statuses=frozenset(config.RETRY_STATUSES),
+        )
+
+class RetryState:
+    """
+    Runs operations for one link under a RetryPolicy and counts the attempts made.
+
+    The same state can run several operations (e.g. a HEAD pre-check and the
+    download), so the attempt count and deadline cover the whole link.
+    """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.attempts = 0
+        self._deadline = time.monotonic() + policy.deadline
+
+    async def run(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Awaits operation(), retrying transient failures. The last error is re-raised."""
+        tries = 0
+        while True:
+            tries += 1
+            self.attempts += 1
+            try:
+                return await operation()
+            except Exception as exc:
+                if tries >= self.policy.max_attempts:
+                    raise
+                delay = self.policy.delay_for(exc, tries)
+                if delay is None or time.monotonic() + delay >= self._deadline:
+                    raise
+                metrics.RETRIES.inc(reason=_retry_reason(exc))
+            await asyncio.sleep(delay)
+
+def _retry_reason(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return str(exc.response.status_code)
+    return exc.__class__.__name__
+
+def raise_for_retryable_status(response: httpx.Response, policy: RetryPolicy) -> httpx.Response:
+    """Turns retryable status codes (429, 5xx) into HTTPStatusError so RetryState retries them."""
+    if response.status_code in policy.retry_statuses:
+        response.raise_for_status()
+    return response
@@ -0,0 +1,44 @@
+# backend/utils/sqlite_store.py
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+class SqliteStore:
+    """
+    Base for small local SQLite stores shared by the service.
+
+    One connection is shared behind a lock, and the async helpers run the
+    blocking database work in a worker thread so the event loop never waits on disk.
+    """
+
+    def __init__(self, path: Path, schema: Iterable[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def _locked(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            return func(*args)
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        """Runs func(*args) under the connection lock in a worker thread."""
+        return await asyncio.to_thread(self._locked, func, *args)
+
+    def _on_close(self) -> None:
+        """Hook for final maintenance before the connection closes. Caller holds the lock."""
+
+    def close(self) -> None:
+        with self._lock:
+            self._on_close()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,113 @@
+"""Tests for download bandwidth limits."""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from backend import config
+from backend.utils.bandwidth import RATE_WINDOW, BandwidthLimiter, BandwidthUsageStore, RateMeter, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_debt(self):
+        """A full bucket passes one burst at once; further bytes wait for the refill."""
+        bucket = TokenBucket(rate=1000, burst_seconds=1.0)
+        self.assertEqual(bucket.reserve(1000), 0.0)
+        self.assertAlmostEqual(bucket.reserve(500), 0.5, places=2)
+        # A second consumer queues behind the first one's debt
+        self.assertAlmostEqual(bucket.reserve(500), 1.0, places=2)
+
+    def test_unlimited_and_rate_changes(self):
+        """Rate 0 never delays; lowering the limit forgets the old debt, raising from 0 starts full."""
+        bucket = TokenBucket(rate=0)
+        self.assertEqual(bucket.reserve(10 ** 9), 0.0)
+        bucket.set_rate(100)
+        self.assertEqual(bucket.reserve(100), 0.0)
+        bucket.reserve(10 ** 6)
+        bucket.set_rate(50)
+        self.assertAlmostEqual(bucket.reserve(50), 1.0, places=1)
+
+
+class TestRateMeter(unittest.TestCase):
+    """Test cases for RateMeter."""
+
+    def test_window(self):
+        meter = RateMeter()
+        meter.add(1000, now=100.0)
+        meter.add(1500, now=101.0)
+        self.assertAlmostEqual(meter.rate(now=102.0), 2500 / RATE_WINDOW)
+        self.assertEqual(meter.rate(now=100.0 + RATE_WINDOW + 2), 0.0)
+        self.assertTrue(meter.idle(now=200.0))
+
+
+class TestBandwidthLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test cases for BandwidthLimiter."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name, file_name in (("BANDWIDTH_SETTINGS_PATH", "bandwidth.json"),
+                                ("BANDWIDTH_USAGE_PATH", "usage.sqlite3")):
+            patcher = mock.patch.object(config, name, Path(self.tmp.name) / file_name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    async def test_host_limit_paces_reads(self):
+        """Reads from a limited host slow to its rate while other hosts are unaffected."""
+        limiter = BandwidthLimiter(host_limits={"Slow.example": 20000}, burst_seconds=0.1)
+        started = time.monotonic()
+        for _ in range(8):
+            await limiter.throttle("fast.example", 10000)
+        self.assertLess(time.monotonic() - started, 0.05)
+        started = time.monotonic()
+        for _ in range(5):
+            await limiter.throttle("slow.example", 2000)
+        # 10 kB at 20 kB/s, less the 2 kB burst
+        self.assertGreater(time.monotonic() - started, 0.3)
+        self.assertEqual(set(limiter.host_rates()), {"fast.example", "slow.example"})
+        self.assertAlmostEqual(limiter.global_rate(), 90000 / RATE_WINDOW, delta=1)
+
+    async def test_settings_are_shared(self):
+        """Limits saved by one process's limiter are applied by another reading the same file."""
+        first, second = BandwidthLimiter(), BandwidthLimiter.from_config()
+        first.update(global_limit=5000, host_limits={"a.example": 100})
+        first.save_settings()
+        self.assertEqual(second.global_limit, 0)
+        await second.throttle("a.example", 1)
+        await second._refreshing # Reads the file in the background
+        self.assertEqual((second.global_limit, second.per_host_limit, second.limit_for("a.example")), (5000, 0, 100))
+        first.update(per_host_limit=300)
+        self.assertEqual((first.global_limit, first.limit_for("b.example")), (5000, 300))
+        second.close()
+
+    async def test_processes_share_limits(self):
+        """Processes receiving data split each limit between them and report their combined rates."""
+        first, second, idle = (BandwidthLimiter(global_limit=9000, per_host_limit=3000,
+                                                usage=BandwidthUsageStore(config.BANDWIDTH_USAGE_PATH))
+                               for _ in range(3))
+        await first.throttle("a.example", 1000)
+        await first.throttle("b.example", 1000)
+        await second.throttle("a.example", 500)
+        for limiter in (first, second, idle):
+            await limiter.exchange_usage()
+        await first.exchange_usage() # Sees second, which registered after its first exchange
+        # The idle process takes no share
+        self.assertEqual(first._global.rate, 4500)
+        self.assertEqual((first._hosts["a.example"].rate, first._hosts["b.example"].rate), (1500, 3000))
+        global_rate, host_rates = idle.total_rates()
+        self.assertAlmostEqual(global_rate * RATE_WINDOW, 2500)
+        self.assertEqual({host: round(rate * RATE_WINDOW) for host, rate in host_rates.items()},
+                         {"a.example": 1500, "b.example": 1000})
+        # A process that stops hands its share back
+        second.close()
+        await first.exchange_usage()
+        self.assertEqual((first._global.rate, first._hosts["a.example"].rate), (9000, 3000))
+        first.close()
+        idle.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
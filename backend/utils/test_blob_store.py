@@ -0,0 +1,71 @@
+"""Tests for the content-addressed download store."""
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.utils import blob_store
+
+
+class TestBlobStore(unittest.TestCase):
+    """Test cases for blob_store.commit."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        patcher = patch("backend.config.DOWNLOAD_DIR", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        blob_store.ensure_blob_dirs_exist()
+
+    def _stage(self, url: str, content: bytes):
+        staged = blob_store.staging_path(url)
+        staged.write_bytes(content)
+        return staged, hashlib.sha256(content).hexdigest()
+
+    def test_identical_content_is_stored_once(self):
+        """Two URLs with the same bytes share one blob."""
+        first = blob_store.commit(*self._stage("https://a/x.pdf", b"same"), self.root / "x.pdf", "https://a/x.pdf")
+        second = blob_store.commit(*self._stage("https://b/y.pdf", b"same"), self.root / "y.pdf", "https://b/y.pdf")
+        self.assertTrue(os.path.samefile(first, second))
+        self.assertEqual(len(list((self.root / blob_store.BLOB_DIR_NAME).glob("??/??/*.pdf"))), 1)
+
+    def test_basename_collision_does_not_overwrite(self):
+        """A different document with the same basename gets a URL-derived name."""
+        first = blob_store.commit(*self._stage("https://a/x.pdf", b"one"), self.root / "x.pdf", "https://a/x.pdf")
+        second = blob_store.commit(*self._stage("https://b/x.pdf", b"two"), self.root / "x.pdf", "https://b/x.pdf")
+        self.assertEqual(first, self.root / "x.pdf")
+        self.assertNotEqual(second, first)
+        self.assertEqual(first.read_bytes(), b"one")
+        self.assertEqual(second.read_bytes(), b"two")
+
+    def test_same_url_replaces_its_own_file(self):
+        """Updated content for the same URL replaces the name it owned before."""
+        url = "https://a/x.pdf"
+        first = blob_store.commit(*self._stage(url, b"v1"), self.root / "x.pdf", url)
+        second = blob_store.commit(*self._stage(url, b"v2"), self.root / "x.pdf", url, owned_path=str(first))
+        self.assertEqual(second, first)
+        self.assertEqual(second.read_bytes(), b"v2")
+
+    def test_replaced_content_frees_its_blob(self):
+        """The blob of a URL's old content is removed, unless another name still links to it."""
+        url = "https://a/x.pdf"
+        staged, old_sha = self._stage(url, b"v1")
+        first = blob_store.commit(staged, old_sha, self.root / "x.pdf", url)
+        blob_store.commit(*self._stage(url, b"v2"), self.root / "x.pdf", url,
+                          owned_path=str(first), owned_sha256=old_sha)
+        self.assertFalse(blob_store.blob_path(old_sha).exists())
+
+        shared = blob_store.commit(*self._stage("https://b/y.pdf", b"v2"), self.root / "y.pdf", "https://b/y.pdf")
+        staged, new_sha = self._stage(url, b"v3")
+        blob_store.commit(staged, new_sha, self.root / "x.pdf", url,
+                          owned_path=str(first), owned_sha256=hashlib.sha256(b"v2").hexdigest())
+        self.assertTrue(os.path.samefile(shared, blob_store.blob_path(hashlib.sha256(b"v2").hexdigest())))
+        self.assertEqual(first.read_bytes(), b"v3")
+
+
+if __name__ == '__main__':
+    unittest.main()
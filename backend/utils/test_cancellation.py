@@ -0,0 +1,78 @@
+"""Tests for abandoning and interrupting in-flight work."""
+import asyncio
+import unittest
+
+from backend.utils import cancellation
+
+
+class TestCancellation(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the cancellation helpers."""
+
+    async def asyncSetUp(self):
+        self.outcomes = []
+
+    async def _work(self):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError as exc:
+            await asyncio.sleep(0.01) # Cleanup that must finish before stop_remaining returns
+            self.outcomes.append("abandoned" if cancellation.is_abandoned(exc) else "interrupted")
+            raise
+
+    async def test_abandon_reaches_nested_work(self):
+        """The abandoned reason survives gather() and nested tasks down to the innermost await."""
+        async def nested():
+            await asyncio.ensure_future(self._work())
+
+        task = asyncio.ensure_future(asyncio.gather(nested(), nested()))
+        await asyncio.sleep(0.01)
+        cancellation.abandon(task)
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.outcomes, ["abandoned", "abandoned"])
+
+    async def test_stop_remaining_waits_for_cleanup(self):
+        """Work left by a consumer that stopped early is abandoned, and its cleanup awaited."""
+        tasks = [asyncio.ensure_future(self._work()) for _ in range(3)]
+        await asyncio.sleep(0)
+        await cancellation.stop_remaining(tasks, GeneratorExit())
+        self.assertEqual(self.outcomes, ["abandoned"] * 3)
+
+    async def test_plain_cancellation_passes_on(self):
+        """A consumer interrupted by a plain cancel (deadline, shutdown) interrupts its work the same way."""
+        tasks = [asyncio.ensure_future(self._work()) for _ in range(2)]
+        await asyncio.sleep(0)
+        await cancellation.stop_remaining(tasks, asyncio.CancelledError())
+        self.assertEqual(self.outcomes, ["interrupted"] * 2)
+        self.assertFalse(cancellation.is_abandoned(asyncio.CancelledError("abandoned")))
+
+    async def test_foreign_cancel_message_interrupts(self):
+        """A cancellation carrying another library's message (anyio cancel scopes) interrupts, keeping partial files."""
+        tasks = [asyncio.ensure_future(self._work()) for _ in range(2)]
+        await asyncio.sleep(0)
+        reason = asyncio.CancelledError("Cancelled by cancel scope 7f3a2c")
+        self.assertFalse(cancellation.is_abandoned(reason))
+        await cancellation.stop_remaining(tasks, reason)
+        self.assertEqual(self.outcomes, ["interrupted"] * 2)
+
+    async def test_abandoned_consumer_abandons_its_work(self):
+        """A consumer task that was abandoned passes that on, even where the message got lost."""
+        async def consumer():
+            tasks = [asyncio.ensure_future(self._work()) for _ in range(2)]
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await cancellation.stop_remaining(tasks, asyncio.CancelledError())
+                raise
+
+        task = asyncio.ensure_future(consumer())
+        await asyncio.sleep(0)
+        cancellation.abandon(task)
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.outcomes, ["abandoned"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
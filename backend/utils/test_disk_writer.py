@@ -0,0 +1,68 @@
+"""Tests for the asynchronous file writer."""
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from backend.utils import disk_writer
+from backend.utils.disk_writer import AsyncFileWriter
+
+
+class TestAsyncFileWriter(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncFileWriter."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "out.pdf.part"
+        self.chunks = [bytes([i]) * (100 + i) for i in range(200)]
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def test_chunks_land_in_order(self):
+        """Many small flushes keep the written bytes, size and digest in arrival order."""
+        digest = hashlib.sha256()
+        async with AsyncFileWriter(self.path, digest=digest, buffer_size=250) as writer:
+            for chunk in self.chunks:
+                await writer.write(chunk)
+        expected = b"".join(self.chunks)
+        self.assertEqual(self.path.read_bytes(), expected)
+        self.assertEqual(writer.size, len(expected))
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(expected).hexdigest())
+
+        async with AsyncFileWriter(self.path, append=True) as writer:
+            await writer.write(b"tail")
+        self.assertEqual(self.path.read_bytes(), expected + b"tail")
+        self.assertEqual(writer.size, len(expected) + 4)
+
+    @unittest.skipUnless(hasattr(os, "writev"), "platform without writev")
+    async def test_short_writev_is_completed(self):
+        """A vectored write that stops early is finished with plain writes."""
+        real_writev = os.writev
+
+        def short_writev(fd, buffers):
+            return real_writev(fd, [bytes(buffers[0])[:7]])
+
+        with mock.patch.object(disk_writer.os, "writev", side_effect=short_writev):
+            async with AsyncFileWriter(self.path, buffer_size=10 ** 6) as writer:
+                for chunk in self.chunks:
+                    await writer.write(chunk)
+        self.assertEqual(self.path.read_bytes(), b"".join(self.chunks))
+
+    async def test_write_errors_reach_the_caller(self):
+        """A failed write in the worker thread is raised to the writer's caller, and the file is closed."""
+        writer = AsyncFileWriter(self.path, buffer_size=100)
+        await writer.open()
+        with mock.patch.object(disk_writer, "_write_all", side_effect=OSError(28, "No space left on device")), \
+                self.assertRaises(OSError):
+            for chunk in self.chunks:
+                await writer.write(chunk)
+            await writer.close()
+        await writer.close()
+        self.assertIsNone(writer._fd)
+
+
+if __name__ == "__main__":
+    unittest.main()
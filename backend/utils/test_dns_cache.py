@@ -0,0 +1,80 @@
+"""Tests for the DNS-caching network backend."""
+import asyncio
+import unittest
+from unittest import mock
+
+import httpcore
+
+from backend.utils.dns_cache import CachingResolverBackend
+
+
+class _FakeBackend(httpcore.AsyncNetworkBackend):
+    """Refuses connections to the addresses in `down`, accepts the rest."""
+
+    def __init__(self, down=()):
+        self.down = set(down)
+        self.connected = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connected.append(host)
+        if host in self.down:
+            raise httpcore.ConnectError(f"{host} refused")
+        return mock.Mock(spec=httpcore.AsyncNetworkStream)
+
+
+class TestCachingResolverBackend(unittest.IsolatedAsyncioTestCase):
+    """Test cases for CachingResolverBackend."""
+
+    def _resolver(self, backend, addresses=("10.0.0.1", "10.0.0.2"), delay=0.0):
+        resolver = CachingResolverBackend(backend, ttl=60)
+        self.lookups = 0
+
+        async def lookup(host, port):
+            self.lookups += 1
+            await asyncio.sleep(delay)
+            return list(addresses)
+
+        resolver._lookup = lookup
+        return resolver
+
+    async def test_lookups_are_cached_until_ttl(self):
+        """Repeated and concurrent connections share one lookup until the TTL passes."""
+        resolver = self._resolver(_FakeBackend(), delay=0.01)
+        await asyncio.gather(*(resolver.connect_tcp("origin.example", 443) for _ in range(5)))
+        await resolver.connect_tcp("origin.example", 443)
+        self.assertEqual(self.lookups, 1)
+
+        resolver._ttl = 0 # Entries now expire as soon as they are stored
+        resolver._cache.clear()
+        await resolver.connect_tcp("origin.example", 443)
+        await resolver.connect_tcp("origin.example", 443)
+        self.assertEqual(self.lookups, 3)
+
+    async def test_fails_over_to_next_address(self):
+        """A refused address falls through to the next one; when all fail the entry is dropped."""
+        backend = _FakeBackend(down={"10.0.0.1"})
+        resolver = self._resolver(backend)
+        await resolver.connect_tcp("origin.example", 443)
+        self.assertEqual(backend.connected, ["10.0.0.1", "10.0.0.2"])
+
+        backend.down.add("10.0.0.2")
+        with self.assertRaises(httpcore.ConnectError):
+            await resolver.connect_tcp("origin.example", 443)
+        backend.down.clear()
+        await resolver.connect_tcp("origin.example", 443)
+        self.assertEqual(self.lookups, 2) # Resolved afresh after every address failed
+
+    async def test_slow_lookup_counts_against_connect_timeout(self):
+        """A lookup slower than the connect timeout raises ConnectTimeout, but still fills the cache."""
+        backend = _FakeBackend()
+        resolver = self._resolver(backend, delay=0.1)
+        with self.assertRaises(httpcore.ConnectTimeout):
+            await resolver.connect_tcp("origin.example", 443, timeout=0.01)
+        self.assertEqual(backend.connected, [])
+        await asyncio.sleep(0.15)
+        await resolver.connect_tcp("origin.example", 443, timeout=0.01)
+        self.assertEqual(self.lookups, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tests for download directory layouts."""
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import PurePosixPath
+from unittest import mock
+
+from backend import config
+from backend.utils.download_layout import Placement, relative_path, shard
+from backend.utils.file_utils import generate_filename_from_url
+
+
+class TestDownloadLayout(unittest.TestCase):
+    """Test cases for relative_path."""
+
+    def test_flat(self):
+        """The flat layout keeps the URL's file name at the top level."""
+        self.assertEqual(relative_path("https://a.org/docs/guide.pdf", layout="flat"), PurePosixPath("guide.pdf"))
+
+    def test_hashed_is_shared_by_url_variants(self):
+        """Viewer links and http/https variants of one document land in the same shard."""
+        with mock.patch.object(config, "DOWNLOAD_SHARD_LEVELS", 2):
+            path = relative_path("https://a.org/docs/guide.pdf", layout="hashed")
+            self.assertEqual(len(path.parts), 3)
+            self.assertEqual(path.name, "guide.pdf")
+            self.assertEqual(relative_path("http://A.org/viewer.html?file=/docs/guide.pdf", layout="hashed"), path)
+            self.assertNotEqual(shard("https://a.org/docs/other.pdf"), shard("https://a.org/docs/guide.pdf"))
+
+    def test_template_fields_are_sanitized(self):
+        """Guideline fields fill the template without escaping DOWNLOAD_DIR; missing ones fall back."""
+        with mock.patch.object(config, "DOWNLOAD_LAYOUT_TEMPLATE", "{domain}/{publish_year}/{guideline_id}"):
+            path = relative_path("https://a.org/x/guide.pdf", Placement(domain="../../etc", publish_year=2021),
+                                 layout="template")
+            self.assertEqual(path, PurePosixPath("etc/2021/unknown/guide.pdf"))
+            self.assertEqual(relative_path("https://a.org:8443/guide.pdf", layout="template"),
+                             PurePosixPath("a.org/unknown/unknown/guide.pdf"))
+        with mock.patch.object(config, "DOWNLOAD_LAYOUT_TEMPLATE", "../{host}/./by-id"):
+            self.assertEqual(relative_path("https://a.org/guide.pdf", layout="template"),
+                             PurePosixPath("_/a.org/by-id/guide.pdf"))
+
+    def test_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            relative_path("https://a.org/guide.pdf", layout="nested")
+
+    def test_fallback_name_is_stable_across_processes(self):
+        """Names for URLs without a file name do not depend on the per-process hash seed."""
+        url = "https://a.org/"
+        code = f"from backend.utils.file_utils import generate_filename_from_url; print(generate_filename_from_url({url!r}))"
+        other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                               env={**os.environ, "PYTHONHASHSEED": "1234"}).stdout.strip()
+        self.assertEqual(other, generate_filename_from_url(url))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Tests for cross-process path locks."""
+import asyncio
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend.utils.file_lock import PathLock
+
+# Holds the lock on argv[1] until stdin closes
+_HOLDER = """
+import asyncio, sys
+from pathlib import Path
+from backend.utils.file_lock import PathLock
+
+async def main():
+    async with PathLock(Path(sys.argv[1])):
+        print("locked", flush=True)
+        await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+
+asyncio.run(main())
+"""
+
+
+class TestPathLock(unittest.IsolatedAsyncioTestCase):
+    """Test cases for PathLock."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "guide.pdf"
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def test_locks_exclude_each_other(self):
+        """A second lock on the path waits until the first is released; the lock file is then removed."""
+        first, second = PathLock(self.path), PathLock(self.path)
+        self.assertTrue(await first.acquire())
+        self.assertFalse(await second.acquire(wait=False))
+        waiter = asyncio.ensure_future(second.acquire())
+        await asyncio.sleep(0.05)
+        self.assertFalse(waiter.done())
+        await first.release()
+        self.assertTrue(await asyncio.wait_for(waiter, 2))
+        await second.release()
+        self.assertFalse(second.lock_path.exists())
+
+    async def test_other_process_holds_lock(self):
+        """A lock held by another process keeps this one out until that process lets go."""
+        holder = subprocess.Popen([sys.executable, "-c", _HOLDER, str(self.path)],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), "locked")
+            lock = PathLock(self.path)
+            self.assertFalse(await lock.acquire(wait=False))
+            holder.stdin.close()
+            self.assertTrue(await asyncio.wait_for(lock.acquire(), 5))
+            await lock.release()
+        finally:
+            holder.kill()
+            holder.wait()
+            holder.stdout.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
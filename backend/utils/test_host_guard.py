@@ -0,0 +1,113 @@
+"""Tests for the per-host circuit breaker and rate limiter."""
+import unittest
+from unittest import mock
+
+import httpx
+
+from backend import config
+from backend.utils.host_guard import (
+    AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError, GuardedTransport, is_throttled
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker and AdaptiveRateLimiter."""
+
+    def test_opens_after_threshold_and_probes(self):
+        """Consecutive failures open the circuit; one probe decides whether it closes."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        self.assertTrue(breaker.allow_request()) # reset_timeout elapsed: the probe
+        self.assertFalse(breaker.allow_request()) # only one probe at a time
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_rate_backs_off_on_throttle(self):
+        """Throttling halves the rate (once per burst); successes recover it."""
+        limiter = AdaptiveRateLimiter(max_rate=8, min_rate=1, increase=1)
+        limiter.record_throttle()
+        limiter.record_throttle()
+        self.assertEqual(limiter.rate, 4)
+        limiter.record_success()
+        self.assertEqual(limiter.rate, 5)
+
+    def test_throttle_statuses(self):
+        """429 always throttles; 503 only with Retry-After, since bare 503s are plain server errors."""
+        self.assertTrue(is_throttled(httpx.Response(429)))
+        self.assertTrue(is_throttled(httpx.Response(503, headers={"retry-after": "2"})))
+        self.assertFalse(is_throttled(httpx.Response(503)))
+
+
+class TestAdaptiveRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AdaptiveRateLimiter without a configured maximum."""
+
+    async def test_unlimited_until_throttled_then_recovers(self):
+        """A healthy host is unlimited; throttling limits it to half its observed rate until it recovers."""
+        limiter = AdaptiveRateLimiter(max_rate=0, min_rate=0.2, increase=1)
+        for _ in range(10):
+            await limiter.acquire() # Never waits while unlimited
+        self.assertIsNone(limiter.rate)
+        limiter.record_throttle()
+        self.assertEqual(limiter.rate, 5) # 10 requests in the current second, halved
+        limiter.record_throttle()
+        self.assertEqual(limiter.rate, 5) # Same burst
+        for expected in (6, 7, 8, 9):
+            limiter.record_success()
+            self.assertEqual(limiter.rate, expected)
+        limiter.record_success()
+        self.assertIsNone(limiter.rate) # Back at the rate it was throttled from
+
+
+class TestGuardedTransport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for GuardedTransport."""
+
+    async def test_503_throttles_only_with_retry_after(self):
+        """A 503 with Retry-After slows the host down; without it only counts against the circuit."""
+        def handler(request):
+            headers = {"retry-after": "0"} if request.url.host == "busy.example" else {}
+            return httpx.Response(503, headers=headers)
+
+        with mock.patch.object(config, "RATE_LIMIT_MAX_RPS", 0.0), \
+                mock.patch.object(config, "RATE_LIMIT_ENABLED", True):
+            transport = GuardedTransport(httpx.MockTransport(handler))
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.head("https://busy.example/a.pdf")
+                await client.head("https://broken.example/a.pdf")
+        self.assertIsNotNone(transport.guard_for("busy.example").limiter.rate)
+        broken = transport.guard_for("broken.example")
+        self.assertIsNone(broken.limiter.rate)
+        self.assertEqual(broken.breaker.failures, 1)
+
+    async def test_dead_host_fails_fast(self):
+        """Once a host's circuit is open, its requests never reach the network."""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.host)
+            if request.url.host == "down.example":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200)
+
+        transport = GuardedTransport(httpx.MockTransport(handler))
+        transport.guard_for("down.example").breaker.failure_threshold = 2
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(2):
+                with self.assertRaises(httpx.ConnectError):
+                    await client.head("https://down.example/a.pdf")
+            with self.assertRaises(CircuitOpenError):
+                await client.head("https://down.example/a.pdf")
+            self.assertEqual((await client.head("https://up.example/a.pdf")).status_code, 200)
+        self.assertEqual(calls, ["down.example", "down.example", "up.example"])
+
+
+if __name__ == "__main__":
+    unittest.main()
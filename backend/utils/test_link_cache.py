@@ -0,0 +1,99 @@
+"""Tests for the persistent link check cache."""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from unittest import mock
+
+import httpx
+
+from backend.services.pdf_service import CHECK_STRATEGY_RANGE, PdfService
+from backend.utils import http_client, link_cache
+from backend.utils.link_cache import CachedLink, LinkCache, cache_entry_from_response, is_cacheable_status
+
+
+class TestLinkCache(unittest.IsolatedAsyncioTestCase):
+    """Test cases for LinkCache."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LinkCache(Path(self.tmp.name) / "cache.sqlite3", ttl=60, max_entries=2)
+
+    async def asyncTearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    async def test_round_trip(self):
+        """Stored entries come back with their validators."""
+        await self.cache.put(CachedLink(url="https://a/x.pdf", status_code=200, etag='"v1"',
+                                        last_modified="Mon, 01 Jan 2024 00:00:00 GMT", content_length=10,
+                                        checked_with="GET"))
+        entry = await self.cache.get("https://a/x.pdf")
+        self.assertEqual((entry.status_code, entry.checked_with), (200, "GET"))
+        self.assertTrue(entry.is_fresh(self.cache.ttl))
+        self.assertEqual(entry.validators(), {"If-None-Match": '"v1"',
+                                              "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        self.assertIsNone(await self.cache.get("https://a/missing.pdf"))
+
+    async def test_stale_after_ttl(self):
+        """Entries older than the TTL are reported stale."""
+        entry = CachedLink(url="https://a/x.pdf", status_code=200, checked_at=time.time() - 120)
+        self.assertFalse(entry.is_fresh(self.cache.ttl))
+
+    async def test_lru_bound_applied_on_close(self):
+        """Least recently used entries beyond max_entries are evicted."""
+        for name in ("a", "b", "c"):
+            await self.cache.put(CachedLink(url=f"https://h/{name}.pdf", status_code=200))
+            time.sleep(0.01)
+        await self.cache.get("https://h/a.pdf")  # Touch "a" so "b" becomes the LRU entry
+        path = self.cache.path
+        self.cache.close()
+        self.cache = LinkCache(path, ttl=60, max_entries=2)
+        self.assertIsNone(await self.cache.get("https://h/b.pdf"))
+        self.assertIsNotNone(await self.cache.get("https://h/a.pdf"))
+
+    async def test_hits_are_written_in_batches(self):
+        """Cache hits only write their access time along with the next put."""
+        await self.cache.put(CachedLink(url="https://h/a.pdf", status_code=200))
+        written = self.cache._conn.total_changes
+        for _ in range(5):
+            await self.cache.get("https://h/a.pdf")
+        self.assertEqual(self.cache._conn.total_changes, written)
+        await self.cache.put(CachedLink(url="https://h/b.pdf", status_code=200))
+        self.assertEqual(self.cache._conn.total_changes, written + 2)
+
+    def test_cacheable_statuses(self):
+        """Server errors and throttling are never cached."""
+        self.assertTrue(is_cacheable_status(200))
+        self.assertTrue(is_cacheable_status(404))
+        self.assertFalse(is_cacheable_status(503))
+        self.assertFalse(is_cacheable_status(429))
+
+    def test_entry_from_range_probe(self):
+        """A 206 to a ranged probe is cached as a 200 with the full size from Content-Range."""
+        response = httpx.Response(206, headers={"content-range": "bytes 0-1023/52000", "etag": '"v2"'})
+        entry = cache_entry_from_response("https://a/x.pdf", response)
+        self.assertEqual((entry.status_code, entry.content_length, entry.etag), (200, 52000, '"v2"'))
+        unknown = httpx.Response(206, headers={"content-range": "bytes 0-1023/*", "content-length": "1024"})
+        self.assertIsNone(cache_entry_from_response("https://a/x.pdf", unknown).content_length)
+
+    async def test_ranged_check_reports_200_live_and_cached(self):
+        """A ranged check answered with 206 reports 200, whether checked live or served from the cache."""
+        def handler(request):
+            return httpx.Response(206, headers={"content-type": "application/pdf",
+                                                "content-range": "bytes 0-8/9"}, content=b"%PDF-1.7\n")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with mock.patch.object(http_client, "_client", client), \
+                mock.patch.object(link_cache, "get_link_cache", return_value=self.cache):
+            service = PdfService()
+            live = await service._check_single_link("https://a/x.pdf", CHECK_STRATEGY_RANGE)
+            cached = await service._check_single_link("https://a/x.pdf", CHECK_STRATEGY_RANGE)
+        await client.aclose()
+        self.assertEqual((live.status, live.status_code, live.from_cache), ("OK", 200, False))
+        self.assertEqual((cached.status, cached.status_code, cached.from_cache), ("OK", 200, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
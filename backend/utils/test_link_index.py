@@ -0,0 +1,35 @@
+"""Tests for URL canonicalization and the dedup index."""
+import unittest
+
+from backend.utils.link_index import LinkIndex, canonical_url
+
+
+class TestLinkIndex(unittest.TestCase):
+    """Test cases for canonical_url and LinkIndex."""
+
+    def test_canonical_url(self):
+        """Equivalent spellings of a URL normalize to the same string."""
+        self.assertEqual(canonical_url("HTTPS://Example.ORG:443/a/%7euser/b%2fc.pdf#page=3"),
+                         "https://example.org/a/~user/b%2Fc.pdf")
+        self.assertEqual(canonical_url("http://example.org"), "http://example.org/")
+        self.assertEqual(canonical_url("http://example.org:8080/a b.pdf?x=%e3%81%82"),
+                         "http://example.org:8080/a%20b.pdf?x=%E3%81%82")
+        self.assertEqual(canonical_url("https://example.org/pdfjs/viewer.html?file=/docs/a.pdf"),
+                         "https://example.org/docs/a.pdf")
+
+    def test_index_groups_inputs_by_target(self):
+        """Inputs resolving to one document share a target; https wins over http."""
+        index = LinkIndex([
+            "http://example.org/docs/a.pdf",
+            "https://example.org/pdfjs/viewer.html?file=/docs/a.pdf",
+            "https://example.org/docs/b.pdf",
+        ])
+        self.assertEqual(len(index), 2)
+        key = index.add("https://EXAMPLE.org/docs/a.pdf#x")
+        self.assertEqual(index.target(key), "https://example.org/docs/a.pdf")
+        self.assertEqual(len(index.originals(key)), 3)
+        self.assertIsNone(index.add("http://example.org/docs/a.pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Tests for the metrics registry and HTTP instrumentation."""
+import asyncio
+import unittest
+
+import httpx
+
+from backend.utils import metrics
+from backend.utils.http_client import InstrumentedTransport
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for metric rendering, InstrumentedTransport and spans."""
+
+    def test_transport_records_latency_and_status(self):
+        """Responses land in the per-host histogram and status counter in Prometheus text format."""
+        transport = InstrumentedTransport(httpx.MockTransport(lambda request: httpx.Response(404)))
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.head("http://metrics-test.invalid/a.pdf")
+                await client.head("http://metrics-test.invalid/b.pdf")
+
+        asyncio.run(run())
+        text = metrics.render()
+        self.assertIn('pdf_http_responses_total{method="HEAD",host="metrics-test.invalid",status="404"} 2', text)
+        self.assertIn('pdf_http_request_duration_seconds_bucket{method="HEAD",host="metrics-test.invalid",le="+Inf"} 2',
+                      text)
+        self.assertIn('pdf_http_request_duration_seconds_count{method="HEAD",host="metrics-test.invalid"} 2', text)
+        self.assertIn("# TYPE pdf_http_request_duration_seconds histogram", text)
+
+    def test_transport_counts_errors(self):
+        """Transport failures are counted by error class and leave nothing in flight."""
+        def fail(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        transport = InstrumentedTransport(httpx.MockTransport(fail))
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as client:
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get("http://metrics-errors.invalid/")
+
+        asyncio.run(run())
+        self.assertEqual(metrics.HTTP_ERRORS.value(method="GET", host="metrics-errors.invalid", error="ConnectError"), 1)
+        self.assertIn('pdf_http_requests_in_flight{method="GET"} 0', metrics.render())
+
+    def test_span_records_outcome_and_phases(self):
+        """A span observes its duration under its final status, and each phase separately."""
+        with metrics.span("test-op") as span:
+            with span.phase("step"):
+                pass
+            span.set(status="OK")
+        text = metrics.render()
+        self.assertIn('pdf_operation_duration_seconds_count{operation="test-op",status="OK"} 1', text)
+        self.assertIn('pdf_operation_phase_seconds_count{operation="test-op",phase="step"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
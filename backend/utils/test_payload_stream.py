@@ -0,0 +1,85 @@
+"""Tests for incremental payload parsing."""
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from backend.utils.download_layout import Placement
+from backend.utils.payload_stream import PayloadFormatError, PayloadScanner, iter_pdf_links, pdf_links_in
+
+
+def scan(text: str, chunk_size: int):
+    scanner = PayloadScanner()
+    items = []
+    for start in range(0, len(text), chunk_size):
+        items += scanner.feed(text[start:start + chunk_size])
+    return items + scanner.close()
+
+
+class TestPayloadScanner(unittest.TestCase):
+    """Test cases for PayloadScanner."""
+
+    def setUp(self):
+        self.guidelines = [{"id": i, "title_japanese": "指針", "pdf_links": [f"https://a.org/{i}.pdf"]}
+                           for i in range(20)]
+
+    def test_accepted_formats(self):
+        """Arrays, the data wrapper, single objects and NDJSON yield the same guidelines."""
+        bodies = {
+            "array": json.dumps(self.guidelines),
+            "wrapper": json.dumps({"data": self.guidelines, "total": 20}),
+            "ndjson": "\n".join(json.dumps(g) for g in self.guidelines) + "\n",
+        }
+        for name, body in bodies.items():
+            for chunk_size in (1, 13, len(body)):
+                with self.subTest(name=name, chunk_size=chunk_size):
+                    self.assertEqual(scan(body, chunk_size), self.guidelines)
+        self.assertEqual(scan(json.dumps(self.guidelines[0]), 5), [self.guidelines[0]])
+
+    def test_malformed_payloads(self):
+        """Truncated or invalid bodies raise PayloadFormatError."""
+        for body in ('[{"pdf_links": []}, {"id":', '{"data": [{}]', "not json", '[{}] }'):
+            with self.subTest(body=body), self.assertRaises(PayloadFormatError):
+                scan(body, 4)
+
+    def test_large_item_in_small_chunks(self):
+        """One guideline split across thousands of chunks is decoded once it is complete, not on every chunk."""
+        item = {"id": 1, "summary": 'quote \\" brace } bracket ] \\\\' * 500,
+                "pdf_links": [f"https://a.org/{i}.pdf" for i in range(200)], "nested": [{"a": [1, {"b": "]"}]}]}
+        body = json.dumps([item, item])
+        for chunk_size in (1, 7):
+            with self.subTest(chunk_size=chunk_size):
+                scanner = PayloadScanner()
+                scanner._decoder = mock.Mock(wraps=json.JSONDecoder())
+                items = []
+                for start in range(0, len(body), chunk_size):
+                    items += scanner.feed(body[start:start + chunk_size])
+                self.assertEqual(items + scanner.close(), [item, item])
+                # Per item: at most one failed attempt on the partial text, then the successful decode
+                self.assertLessEqual(scanner._decoder.raw_decode.call_count, 4)
+
+    def test_pdf_links_in(self):
+        """Only http(s) links are taken, from pdf_links or the legacy pdf_link."""
+        self.assertEqual(list(pdf_links_in({"pdf_links": ["https://a/x.pdf", "ftp://a/y.pdf", None]})),
+                         ["https://a/x.pdf"])
+        self.assertEqual(list(pdf_links_in({"pdf_link": "http://a/z.pdf"})), ["http://a/z.pdf"])
+        self.assertEqual(list(pdf_links_in(["https://a/x.pdf"])), [])
+
+    def test_iter_pdf_links_records_placements(self):
+        """Each link's guideline fields are recorded before the link is yielded; the first guideline wins."""
+        body = json.dumps([{"id": 1, "domain": "a", "publish_year": 2020, "pdf_links": ["https://a.org/x.pdf"]},
+                           {"id": 2, "domain": "b", "pdf_links": ["http://A.org/x.pdf", "https://a.org/y.pdf"]}])
+        placements = {}
+
+        async def collect():
+            async def chunks():
+                yield body.encode()
+            return [(link, len(placements)) async for link in iter_pdf_links(chunks(), placements)]
+
+        self.assertEqual(asyncio.run(collect()),
+                         [("https://a.org/x.pdf", 1), ("http://A.org/x.pdf", 2), ("https://a.org/y.pdf", 2)])
+        self.assertEqual(list(placements.values()), [Placement("a", 2020, 1), Placement("b", None, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests for streaming PDF inspection."""
+import unittest
+
+from backend.utils.pdf_inspect import PdfInspector, header_version
+
+SIMPLE_PDF = (b"%PDF-1.4\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+              b"2 0 obj << /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >> endobj\n"
+              b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+              b"4 0 obj <</Type/Page/Parent 2 0 R>> endobj\n"
+              b"xref\n0 5\ntrailer << /Root 1 0 R >>\nstartxref\n123\n%%EOF\n")
+
+
+def inspect(body: bytes, chunk_size: int) -> PdfInspector:
+    inspector = PdfInspector()
+    for start in range(0, len(body), chunk_size):
+        inspector.update(body[start:start + chunk_size])
+    return inspector
+
+
+class TestPdfInspector(unittest.TestCase):
+    """Test cases for PdfInspector and header_version."""
+
+    def test_metadata_independent_of_chunking(self):
+        """Version and page count come out the same however the body is split."""
+        for chunk_size in (1, 3, 7, 64, len(SIMPLE_PDF)):
+            with self.subTest(chunk_size=chunk_size):
+                inspector = inspect(SIMPLE_PDF, chunk_size)
+                self.assertIsNone(inspector.problem())
+                self.assertEqual(inspector.version, "1.4")
+                self.assertEqual(inspector.page_count, 2)
+                self.assertEqual(inspector.size, len(SIMPLE_PDF))
+
+    def test_linearized_and_updated_files(self):
+        """Linearized files report /N; incrementally updated ones give no guessed count."""
+        linearized = b"%PDF-1.7\n%\xe2\xe3\n1 0 obj << /Linearized 1 /L 9000 /N 12 /T 800 >> endobj\n"
+        self.assertEqual(inspect(linearized + SIMPLE_PDF[9:], 16).page_count, 12)
+        updated = SIMPLE_PDF + b"5 0 obj << /Type /Page >> endobj\nstartxref\n456\n%%EOF\n"
+        self.assertIsNone(inspect(updated, 16).page_count)
+
+    def test_rejects_non_pdf_and_truncated_bodies(self):
+        """HTML bodies and files without %%EOF are reported as problems."""
+        self.assertIn("not a PDF", inspect(b"<!DOCTYPE html><html>login</html>", 8).problem())
+        self.assertIn("truncated", inspect(SIMPLE_PDF[:-8], 8).problem())
+        self.assertEqual(header_version(b"\xef\xbb\xbf%PDF-2.0\n"), "2.0")
+        self.assertIsNone(header_version(b" " * 1024 + b"%PDF-1.4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the retry engine."""
+import unittest
+
+import httpx
+
+from backend.utils.retry import RetryPolicy, RetryState, parse_retry_after, raise_for_retryable_status
+
+
+def _response(status_code: int, headers=None) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers, request=httpx.Request("GET", "https://a/x.pdf"))
+
+
+class TestRetry(unittest.IsolatedAsyncioTestCase):
+    """Test cases for RetryPolicy and RetryState."""
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+    def test_parse_retry_after(self):
+        """Both delta-seconds and HTTP-date forms are understood."""
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertEqual(parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=30), 30.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    async def test_retries_transient_status_until_success(self):
+        """Retryable statuses are retried and the attempts counted."""
+        responses = iter([_response(503), _response(429, {"Retry-After": "0"}), _response(200)])
+        retry = RetryState(self.policy)
+        response = await retry.run(lambda: self._respond(next(responses)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(retry.attempts, 3)
+
+    async def test_gives_up_after_max_attempts(self):
+        """The last error is raised once attempts are exhausted."""
+        retry = RetryState(self.policy)
+        with self.assertRaises(httpx.ConnectError):
+            await retry.run(self._fail_connect)
+        self.assertEqual(retry.attempts, 3)
+
+    async def test_non_retryable_errors_fail_fast(self):
+        """Deterministic failures and long Retry-After waits are not retried."""
+        retry = RetryState(self.policy)
+        with self.assertRaises(httpx.HTTPStatusError):
+            await retry.run(lambda: self._respond(_response(404)))
+        with self.assertRaises(httpx.HTTPStatusError):
+            await retry.run(lambda: self._respond(_response(503, {"Retry-After": "3600"})))
+        self.assertEqual(retry.attempts, 2)
+
+    async def _respond(self, response: httpx.Response) -> httpx.Response:
+        if response.status_code == 404:
+            response.raise_for_status()
+        return raise_for_retryable_status(response, self.policy)
+
+    async def _fail_connect(self):
+        raise httpx.ConnectError("refused")
+
+
+if __name__ == "__main__":
+    unittest.main()
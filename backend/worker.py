@@ -0,0 +1,110 @@
+"""
+Standalone job workers that process queued background jobs from the shared job store.
+
+Runs alongside (or instead of) the workers inside the API processes, so a large
+job is spread over more cores or hosts sharing the store. Every process claims
+links in small leased batches; if one dies, its links are handed to the others
+once the lease expires, and the parent starts a replacement.
+
+Usage:
+    python -m backend.worker --processes 4
+    PDF_JOB_WORKER_ENABLED=0 uvicorn backend.main:app --workers 2  # API processes only submit and report
+"""
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+import time
+from typing import List, Optional, Sequence
+
+from backend import config
+
+# Minimum seconds between restarts of crashed worker processes
+RESTART_DELAY = 1.0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend.worker", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(),
+                        help="Worker processes to run (default: one per CPU)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Links each process works on at once (default: PDF_JOB_WORKER_MAX_IN_FLIGHT "
+                             "or twice PDF_MAX_CONCURRENT_REQUESTS)")
+    return parser
+
+async def serve(max_in_flight: Optional[int] = None) -> None:
+    """Runs one JobWorker in this process until SIGTERM or SIGINT."""
+    from backend.services.job_service import JobWorker
+    from backend.services.job_store import close_job_store, get_job_store
+    from backend.services.pdf_service import PdfService
+    from backend.utils import http_client
+    from backend.utils.bandwidth import close_limiter
+    from backend.utils.disk_writer import shutdown_executor
+    from backend.utils.download_manifest import close_manifest
+    from backend.utils.link_cache import close_link_cache
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        async with http_client.lifespan_manager(None):
+            worker = JobWorker(get_job_store(), PdfService(), max_in_flight=max_in_flight)
+            worker.start()
+            print(f"Job worker {worker.worker_id} started.")
+            await stop.wait()
+            await worker.stop()
+            print(f"Job worker {worker.worker_id} stopped.")
+    finally:
+        close_job_store()
+        close_link_cache()
+        close_manifest()
+        close_limiter()
+        shutdown_executor()
+
+def _serve_process(max_in_flight: Optional[int]) -> None:
+    asyncio.run(serve(max_in_flight))
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.processes < 1:
+        print("--processes must be at least 1", file=sys.stderr)
+        return 2
+    if args.processes == 1:
+        asyncio.run(serve(args.max_in_flight))
+        return 0
+
+    # Fresh interpreters: no event loop or open SQLite connections inherited from the parent
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def start() -> multiprocessing.Process:
+        process = context.Process(target=_serve_process, args=(args.max_in_flight,), daemon=False)
+        process.start()
+        return process
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate() # SIGTERM: finish up and hand back leases
+
+    processes: List[multiprocessing.Process] = [start() for _ in range(args.processes)]
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Started {args.processes} job worker processes (store: {config.JOB_STORE_PATH}).")
+    while not stopping:
+        time.sleep(RESTART_DELAY)
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                # Its leased links are reclaimed by the others when the lease expires
+                print(f"Job worker process {process.pid} exited with {process.exitcode}; restarting.")
+                processes[index] = start()
+    for process in processes:
+        process.join()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Event-loop lag benchmark for download file writes.
+
+Simulates N concurrent downloads whose bodies arrive in socket-sized chunks
+and writes them either with blocking writes on the event loop (the previous
+behaviour) or with the AsyncFileWriter. A probe task measures how late the
+event loop wakes it up, which is the delay every other in-flight request sees.
+
+Usage:
+    python -m benchmarks.disk_writer_bench --downloads 100 --size-mb 8
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from backend.utils import disk_writer
+from benchmarks.stats import LoopLagProbe
+
+CHUNK = b"\0" * (64 * 1024)
+
+async def _body(size: int):
+    """Yields size bytes in 64 KiB chunks, yielding to the loop like a socket read would."""
+    sent = 0
+    while sent < size:
+        await asyncio.sleep(0)
+        chunk = CHUNK[: min(len(CHUNK), size - sent)]
+        sent += len(chunk)
+        yield chunk
+
+async def _download_blocking(path: Path, size: int, fsync: bool = False) -> None:
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        async for chunk in _body(size):
+            digest.update(chunk)
+            f.write(chunk)
+            if fsync:
+                # Approximates a slow or network-backed disk (e.g. a Docker bind mount)
+                f.flush()
+                os.fsync(f.fileno())
+
+class _FsyncingWriter(disk_writer.AsyncFileWriter):
+    """AsyncFileWriter that fsyncs after every write, in its worker thread."""
+
+    def _write(self, chunks):
+        super()._write(chunks)
+        os.fsync(self._fd)
+
+async def _download_writer(path: Path, size: int, fsync: bool = False) -> None:
+    if fsync:
+        # Same work as the blocking path: one write and one fsync per chunk, just off the loop
+        writer = _FsyncingWriter(path, digest=hashlib.sha256(), buffer_size=len(CHUNK))
+    else:
+        writer = disk_writer.AsyncFileWriter(path, digest=hashlib.sha256())
+    async with writer:
+        async for chunk in _body(size):
+            await writer.write(chunk)
+
+async def _run(mode: str, downloads: int, size: int, directory: Path, fsync: bool) -> dict:
+    download = _download_blocking if mode == "blocking" else _download_writer
+    async with LoopLagProbe(0.005) as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*(download(directory / f"{mode}-{i}.pdf", size, fsync) for i in range(downloads)))
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "mb_per_s": downloads * size / elapsed / 1e6,
+        **probe.summary_ms(),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--downloads", type=int, default=100, help="Concurrent downloads (default 100)")
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of each file in MB (default 8)")
+    parser.add_argument("--dir", type=Path, default=None, help="Directory to write to (default: temp dir)")
+    parser.add_argument("--fsync", action="store_true", help="fsync after every 64 KiB write in both modes to simulate a slow disk")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for mode in ("blocking", "writer"):
+            result = asyncio.run(_run(mode, args.downloads, size, Path(tmp), args.fsync))
+            print(f"{result['mode']:>8}: {result['seconds']:6.2f}s  {result['mb_per_s']:8.1f} MB/s  "
+                  f"loop lag p50 {result['lag_p50_ms']:6.2f} ms  p99 {result['lag_p99_ms']:7.2f} ms  "
+                  f"max {result['lag_max_ms']:7.2f} ms")
+            for path in Path(tmp).iterdir():
+                path.unlink()
+    disk_writer.shutdown_executor()
+
+if __name__ == "__main__":
+    main()
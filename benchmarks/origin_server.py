@@ -0,0 +1,220 @@
+"""
+Stand-in PDF origin server for benchmarks.
+
+A small asyncio HTTP/1.1 server (keep-alive, HEAD, GET, single byte ranges)
+with configurable latency, bandwidth, error rate and file sizes:
+
+    /files/<id>.pdf               a PDF whose size is derived from <id>
+    /redirect/<id>.pdf            302 to /files/<id>.pdf
+    /pdfjs/viewer.html?file=...   an HTML viewer page (the service resolves these itself)
+
+Run standalone:
+    python -m benchmarks.origin_server --port 8765 --latency-ms 20 --size-kb 256
+"""
+import argparse
+import asyncio
+import contextlib
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+FILLER = b"\0" * (64 * 1024)
+PDF_HEADER = b"%PDF-1.7\n"
+PDF_TRAILER = b"\ntrailer\n<< /Root 1 0 R >>\n%%EOF\n"
+LAST_MODIFIED = formatdate(1_700_000_000, usegmt=True)
+
+_FILE_PATH = re.compile(r"^/files/(\d+)\.pdf$")
+_REDIRECT_PATH = re.compile(r"^/redirect/(\d+)\.pdf$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+@dataclass
+class OriginConfig:
+    latency_ms: float = 0.0 # Mean delay before response headers (uniform +/-50%)
+    bandwidth_mbps: float = 0.0 # Per-response body rate in megabits/s (0 = unlimited)
+    error_rate: float = 0.0 # Fraction of requests answered with a 503
+    size_kb: int = 256 # Smallest file size
+    size_kb_max: int = 0 # Largest file size; sizes vary per file id between the two (0 = fixed)
+    seed: int = 0
+
+    def file_size(self, file_id: int) -> int:
+        low = self.size_kb * 1024
+        high = max(low, self.size_kb_max * 1024)
+        return low if high == low else random.Random(self.seed * 1_000_003 + file_id).randint(low, high)
+
+def _pdf_body(size: int, start: int, end: int) -> Iterator[bytes]:
+    """Yields bytes [start, end) of a size-byte PDF: header, zero padding, trailer."""
+    tail_at = size - len(PDF_TRAILER)
+    pos = start
+    while pos < end:
+        if pos < len(PDF_HEADER):
+            chunk = PDF_HEADER[pos:min(end, len(PDF_HEADER))]
+        elif pos >= tail_at:
+            chunk = PDF_TRAILER[pos - tail_at:end - tail_at]
+        else:
+            chunk = FILLER[:min(end, tail_at) - pos]
+        pos += len(chunk)
+        yield chunk
+
+class OriginServer:
+    def __init__(self, config: OriginConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+
+    async def _send(self, writer: asyncio.StreamWriter, status: str, headers: List[Tuple[str, str]],
+                    body: Iterator[bytes] = iter(()), head: bool = False) -> None:
+        lines = [f"HTTP/1.1 {status}"] + [f"{name}: {value}" for name, value in headers]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if head:
+            await writer.drain()
+            return
+        rate = self.config.bandwidth_mbps * 1e6 / 8
+        started, sent = time.monotonic(), 0
+        for chunk in body:
+            writer.write(chunk)
+            sent += len(chunk)
+            await writer.drain()
+            if rate:
+                ahead = sent / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, target: str, headers: dict) -> None:
+        if self.config.latency_ms:
+            await asyncio.sleep(self.config.latency_ms / 1000 * self._random.uniform(0.5, 1.5))
+        head = method == "HEAD"
+        if self._random.random() < self.config.error_rate:
+            await self._send(writer, "503 Service Unavailable", [("Content-Length", "0")], head=head)
+            return
+
+        path = target.split("?", 1)[0]
+        match = _FILE_PATH.match(path)
+        if match:
+            file_id = int(match.group(1))
+            size = self.config.file_size(file_id)
+            common = [("Content-Type", "application/pdf"), ("Accept-Ranges", "bytes"),
+                      ("ETag", f'"{file_id}-{size}"'), ("Last-Modified", LAST_MODIFIED)]
+            if headers.get("if-none-match") == f'"{file_id}-{size}"':
+                await self._send(writer, "304 Not Modified", common, head=True)
+                return
+            byte_range = _RANGE.match(headers.get("range", ""))
+            if byte_range and (byte_range.group(1) or byte_range.group(2)):
+                first, last = byte_range.groups()
+                start = int(first) if first else max(0, size - int(last))
+                end = min(size, int(last) + 1) if first and last else size
+                if start >= size:
+                    await self._send(writer, "416 Range Not Satisfiable",
+                                     [("Content-Range", f"bytes */{size}"), ("Content-Length", "0")], head=True)
+                    return
+                await self._send(writer, "206 Partial Content",
+                                 common + [("Content-Range", f"bytes {start}-{end - 1}/{size}"),
+                                           ("Content-Length", str(end - start))],
+                                 _pdf_body(size, start, end), head)
+                return
+            await self._send(writer, "200 OK", common + [("Content-Length", str(size))],
+                             _pdf_body(size, 0, size), head)
+            return
+
+        match = _REDIRECT_PATH.match(path)
+        if match:
+            await self._send(writer, "302 Found", [("Location", f"/files/{match.group(1)}.pdf"),
+                                                   ("Content-Length", "0")], head=True)
+            return
+        if path.endswith("/viewer.html"):
+            page = b"<html><body>PDF viewer</body></html>"
+            await self._send(writer, "200 OK", [("Content-Type", "text/html"), ("Content-Length", str(len(page)))],
+                             iter((page,)), head)
+            return
+        await self._send(writer, "404 Not Found", [("Content-Length", "0")], head=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("content-length"):
+                    await reader.readexactly(int(headers["content-length"]))
+                await self._respond(writer, method, target, headers)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(config: OriginConfig, hosts: Sequence[str], port: int) -> None:
+    origin = OriginServer(config)
+    server = await asyncio.start_server(origin.handle, host=list(hosts), port=port, backlog=1024)
+    print(f"Origin listening on {', '.join(hosts)} port {port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def add_origin_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean delay before response headers")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="Per-response body rate (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--size-kb", type=int, default=256, help="File size (or smallest size with --size-kb-max)")
+    parser.add_argument("--size-kb-max", type=int, default=0, help="Largest file size; sizes vary per file")
+    parser.add_argument("--seed", type=int, default=0)
+
+def origin_config_from_args(args: argparse.Namespace) -> OriginConfig:
+    return OriginConfig(latency_ms=args.latency_ms, bandwidth_mbps=args.bandwidth_mbps, error_rate=args.error_rate,
+                        size_kb=args.size_kb, size_kb_max=args.size_kb_max, seed=args.seed)
+
+@contextlib.contextmanager
+def run_origin(config: OriginConfig, hosts: Sequence[str] = ("127.0.0.1",), port: Optional[int] = None):
+    """Starts the origin in a subprocess (so it never competes for the benchmark's event loop).
+
+    Yields the port it listens on.
+    """
+    port = port or free_port()
+    command = [sys.executable, "-m", "benchmarks.origin_server", "--port", str(port), "--hosts", ",".join(hosts),
+               "--latency-ms", str(config.latency_ms), "--bandwidth-mbps", str(config.bandwidth_mbps),
+               "--error-rate", str(config.error_rate), "--size-kb", str(config.size_kb),
+               "--size-kb-max", str(config.size_kb_max), "--seed", str(config.seed)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            with contextlib.suppress(OSError), socket.create_connection((hosts[0], port), timeout=0.2):
+                break
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("Origin server failed to start")
+            time.sleep(0.05)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--hosts", default="127.0.0.1", help="Comma-separated addresses to listen on")
+    add_origin_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(origin_config_from_args(args), args.hosts.split(","), args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+End-to-end benchmark against a local stand-in origin (benchmarks/origin_server.py).
+
+Builds a payload of links (direct files, redirects and viewer URLs spread over
+several loopback hosts), then checks and/or downloads it through PdfService
+directly and through the /check-links and /download-pdfs endpoints (in-process,
+via ASGI). Reports throughput, p50/p95/p99 latency, errors, event-loop lag and
+peak RSS.
+
+Latency is the time from the start of the batch until each link's result (for
+the service) or until each API response (for the endpoints).
+
+Usage:
+    python -m benchmarks.service_bench --links 2000 --hosts 4 --latency-ms 20 --size-kb 256
+    python -m benchmarks.service_bench --op download --target api --requests 8 --json
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from backend import config
+from backend.api.models import SUCCESS_STATUSES
+from backend.utils.download_manifest import close_manifest
+from benchmarks.origin_server import add_origin_arguments, origin_config_from_args, run_origin
+from benchmarks.stats import LoopLagProbe, peak_rss_mb, percentile
+
+
+def build_links(count: int, hosts: List[str], port: int, redirect_fraction: float,
+                viewer_fraction: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    links = []
+    for file_id in range(count):
+        base = f"http://{hosts[file_id % len(hosts)]}:{port}"
+        roll = rng.random()
+        if roll < redirect_fraction:
+            links.append(f"{base}/redirect/{file_id}.pdf")
+        elif roll < redirect_fraction + viewer_fraction:
+            links.append(f"{base}/pdfjs/viewer.html?file=/files/{file_id}.pdf")
+        else:
+            links.append(f"{base}/files/{file_id}.pdf")
+    return links
+
+def _report(target: str, op: str, elapsed: float, latencies: List[float], results: List[dict],
+            probe: LoopLagProbe) -> dict:
+    failed = sum(1 for result in results if result["status"] not in SUCCESS_STATUSES)
+    downloaded = sum(result.get("size_bytes") or 0 for result in results)
+    return {
+        "target": target,
+        "op": op,
+        "links": len(results),
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "links_per_s": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "mb_per_s": round(downloaded / elapsed / 1e6, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        **{name: round(value, 2) for name, value in probe.summary_ms().items()},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+async def bench_service(op: str, links: List[str]) -> dict:
+    from backend.services.pdf_service import PdfService
+    from backend.utils import http_client
+
+    service = PdfService()
+    async with http_client.lifespan_manager(None):
+        async with LoopLagProbe() as probe:
+            started = time.perf_counter()
+            results, latencies = [], []
+            iterator = service.iter_link_checks(links) if op == "check" else service.iter_downloads(links)
+            async for result in iterator:
+                latencies.append(time.perf_counter() - started)
+                results.append(result.model_dump())
+            elapsed = time.perf_counter() - started
+    return _report("service", op, elapsed, latencies, results, probe)
+
+async def bench_api(op: str, links: List[str], requests: int) -> dict:
+    import httpx
+    from backend.main import app, app_lifespan
+
+    endpoint = "/api/v1/check-links" if op == "check" else "/api/v1/download-pdfs"
+    batches = [links[i::requests] for i in range(requests)]
+    transport = httpx.ASGITransport(app=app)
+    async with app_lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async with LoopLagProbe() as probe:
+            started = time.perf_counter()
+            latencies: List[float] = []
+
+            async def send(batch: List[str]) -> List[dict]:
+                response = await client.post(endpoint, json=[{"id": 1, "url": "bench", "domain": "bench",
+                                                               "pdf_links": batch}])
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                return response.json()["results"]
+
+            responses = await asyncio.gather(*(send(batch) for batch in batches if batch))
+            elapsed = time.perf_counter() - started
+    results = [result for response in responses for result in response]
+    return _report("api", op, elapsed, latencies, results, probe)
+
+def _print_table(rows: List[Dict]) -> None:
+    for row in rows:
+        print(f"{row['target']:>7} {row['op']:>8}: {row['links']:6d} links {row['failed']:5d} failed "
+              f"{row['seconds']:7.2f}s {row['links_per_s']:8.1f} links/s {row['mb_per_s']:7.1f} MB/s | "
+              f"latency p50 {row['latency_p50_ms']:8.1f} p95 {row['latency_p95_ms']:8.1f} "
+              f"p99 {row['latency_p99_ms']:8.1f} ms | loop lag p99 {row['lag_p99_ms']:6.2f} "
+              f"max {row['lag_max_ms']:7.2f} ms | peak RSS {row['peak_rss_mb']:7.1f} MB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=1000, help="Links in the payload (default 1000)")
+    parser.add_argument("--hosts", type=int, default=4, help="Distinct loopback hosts 127.0.0.1..N (default 4)")
+    parser.add_argument("--redirect-fraction", type=float, default=0.1, help="Share of links that redirect")
+    parser.add_argument("--viewer-fraction", type=float, default=0.1, help="Share of links given as viewer URLs")
+    parser.add_argument("--op", choices=("check", "download", "both"), default="both")
+    parser.add_argument("--target", choices=("service", "api", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=1, help="API requests the payload is split across")
+    parser.add_argument("--concurrency", type=int, default=None, help="Override PDF_MAX_CONCURRENT_REQUESTS")
+    parser.add_argument("--per-host", type=int, default=None, help="Override PDF_MAX_REQUESTS_PER_HOST")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    add_origin_arguments(parser)
+    args = parser.parse_args()
+
+    # Must be set before the service modules are imported (the API singleton reads them)
+    if args.concurrency:
+        config.MAX_CONCURRENT_REQUESTS = args.concurrency
+    if args.per_host:
+        config.MAX_REQUESTS_PER_HOST = args.per_host
+    config.LINK_CACHE_ENABLED = False # Every run must reach the origin
+
+    hosts = [f"127.0.0.{i}" for i in range(1, args.hosts + 1)]
+    ops = ("check", "download") if args.op == "both" else (args.op,)
+    targets = ("service", "api") if args.target == "both" else (args.target,)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, run_origin(origin_config_from_args(args), hosts) as port:
+        links = build_links(args.links, hosts, port, args.redirect_fraction, args.viewer_fraction, args.seed)
+        for target in targets:
+            for op in ops:
+                # Fresh download directory (and manifest) per run
+                config.DOWNLOAD_DIR = Path(tmp) / f"{target}-{op}"
+                close_manifest()
+                if target == "service":
+                    row = asyncio.run(bench_service(op, links))
+                else:
+                    row = asyncio.run(bench_api(op, links, args.requests))
+                rows.append(row)
+                if args.json:
+                    print(json.dumps(row))
+        close_manifest()
+    if not args.json:
+        _print_table(rows)
+
+if __name__ == "__main__":
+    main()
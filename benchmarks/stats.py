@@ -0,0 +1,56 @@
+"""Measurement helpers shared by the benchmarks."""
+import asyncio
+import resource
+import sys
+from typing import List, Optional, Sequence
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile (0-100) of values by nearest rank; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class LoopLagProbe:
+    """
+    Measures event-loop lag: how late a task that sleeps for `interval` wakes up.
+
+    Any lag is added latency for every other coroutine on the loop.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+
+    async def __aenter__(self) -> "LoopLagProbe":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary_ms(self) -> dict:
+        return {
+            "lag_p50_ms": percentile(self.lags, 50) * 1000,
+            "lag_p99_ms": percentile(self.lags, 99) * 1000,
+            "lag_max_ms": max(self.lags, default=0.0) * 1000,
+        }
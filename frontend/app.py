@@ -42,7 +42,10 @@ def main():
             # Call the appropriate API client function
             results = None
             if check_button:
-                results = check_links_api(input_data)
+                results = check_links_api(
+                    input_data,
+                    on_progress=lambda partial: display_results({"results": partial}, results_placeholder)
+                )
             elif download_button:
                 results = download_pdfs_api(input_data)
 
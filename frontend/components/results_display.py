@@ -45,8 +45,10 @@ def display_results(results_data: Optional[Dict[str, Any]], results_placeholder)
                     """, unsafe_allow_html=True)
                     
             elif 'file_path' in df.columns:  # Download operation
-                downloaded = df[df['status'] == 'DOWNLOADED'].shape[0]
-                failed = df[df['status'] != 'DOWNLOADED'].shape[0]
+                # Files confirmed unchanged since the last sync count as successes
+                succeeded = df['status'].isin(['DOWNLOADED', 'UNCHANGED'])
+                downloaded = df[succeeded].shape[0]
+                failed = df[~succeeded].shape[0]
                 
                 with col1:
                     st.markdown(f"""
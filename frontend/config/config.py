@@ -7,4 +7,15 @@ API_BASE_URL = f"{BACKEND_URL}/api/v1"
 
 # Endpoints
 CHECK_LINKS_ENDPOINT = f"{API_BASE_URL}/check-links"
-DOWNLOAD_PDFS_ENDPOINT = f"{API_BASE_URL}/download-pdfs" 
\ No newline at end of file
+DOWNLOAD_PDFS_ENDPOINT = f"{API_BASE_URL}/download-pdfs" 
+
+# Background job endpoints (used for batches that outlive a single request)
+DOWNLOAD_JOBS_ENDPOINT = f"{API_BASE_URL}/jobs/download-pdfs"
+JOBS_ENDPOINT = f"{API_BASE_URL}/jobs"
+
+# Seconds between job progress polls
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+
+# Streaming results: max seconds to wait between two results, and how often to refresh the table
+STREAM_READ_TIMEOUT = float(os.environ.get("STREAM_READ_TIMEOUT", "120"))
+STREAM_UPDATE_INTERVAL = float(os.environ.get("STREAM_UPDATE_INTERVAL", "0.5"))
@@ -1,9 +1,10 @@
 """API client for the backend."""
 import json
+import time
 import requests
 import streamlit as st
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 
 from frontend import config
 
@@ -72,7 +73,7 @@ def _make_api_request(endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[s
             timeout=30  # 30 second timeout
         )
         
-        if response.status_code == 200:
+        if response.status_code in (200, 202):
             return response.json()
         else:
             st.error(f"API Error: {response.status_code} - {response.text}")
@@ -85,12 +86,62 @@ def _make_api_request(endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[s
         st.error(f"Unexpected error: {e}")
         return None
 
-def check_links_api(data_str: str) -> Optional[Dict[str, Any]]:
+def _stream_api_request(endpoint: str, payload: Dict[str, Any],
+                        on_progress: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Make a streaming (NDJSON) API request, collecting results as they arrive.
+    
+    Args:
+        endpoint: API endpoint URL
+        payload: Request payload
+        on_progress: Optional callback invoked with the results received so far
+        
+    Returns:
+        Dict with the collected results, or None on error
+    """
+    results: List[Dict[str, Any]] = []
+    try:
+        with requests.post(
+            endpoint,
+            json=payload,
+            # Someone is watching the table fill in: go ahead of background batches
+            params={"stream": "ndjson", "priority": "interactive"},
+            headers={"Content-Type": "application/json"},
+            stream=True,
+            timeout=(10, config.STREAM_READ_TIMEOUT)  # Timeout applies between results, not overall
+        ) as response:
+            if response.status_code != 200:
+                st.error(f"API Error: {response.status_code} - {response.text}")
+                return None
+            last_update = 0.0
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                results.append(json.loads(line))
+                now = time.monotonic()
+                if on_progress and now - last_update >= config.STREAM_UPDATE_INTERVAL:
+                    on_progress(results)
+                    last_update = now
+        return {"results": results}
+    except requests.RequestException as e:
+        st.error(f"Connection error: {e}")
+        # Keep whatever arrived before the connection failed
+        return {"results": results} if results else None
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+        return None
+
+def check_links_api(data_str: str,
+                    on_progress: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Optional[Dict[str, Any]]:
     """
     Check PDF links API call.
     
+    Results are streamed from the backend so the table can be filled in
+    while slower links are still being checked.
+    
     Args:
         data_str: JSON string of data containing PDF links
+        on_progress: Optional callback invoked with the results received so far
         
     Returns:
         API response or None on error
@@ -98,21 +149,84 @@ def check_links_api(data_str: str) -> Optional[Dict[str, Any]]:
     with st.spinner("Checking PDF links..."):
         payload = _prepare_payload(data_str)
         if payload:
-            return _make_api_request(config.CHECK_LINKS_ENDPOINT, payload)
+            return _stream_api_request(config.CHECK_LINKS_ENDPOINT, payload, on_progress)
     return None
 
+def _get_job_status(job_id: str, offset: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch job progress and the results produced since `offset`.
+    
+    Args:
+        job_id: Identifier returned when the job was submitted
+        offset: Number of results already received
+        
+    Returns:
+        Job status data or None on error
+    """
+    try:
+        response = requests.get(
+            f"{config.JOBS_ENDPOINT}/{job_id}",
+            params={"offset": offset},
+            timeout=30
+        )
+        if response.status_code == 200:
+            return response.json()
+        st.error(f"API Error: {response.status_code} - {response.text}")
+        return None
+    except requests.RequestException as e:
+        st.error(f"Connection error: {e}")
+        return None
+
+def _run_job(endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Submit a background job and poll it until it finishes, showing progress.
+    
+    Args:
+        endpoint: Job submission endpoint URL
+        payload: Request payload
+        
+    Returns:
+        Dict with the collected results, or None on error
+    """
+    job = _make_api_request(endpoint, payload)
+    if not job:
+        return None
+
+    results: List[Dict[str, Any]] = []
+    progress = st.progress(0.0, text="Submitted job...")
+    while True:
+        status = _get_job_status(job["job_id"], len(results))
+        if status is None:
+            return None
+        results.extend(status["results"])
+        total = status["total"]
+        fraction = len(results) / total if total else 1.0
+        progress.progress(min(fraction, 1.0), text=f"{len(results)} / {total} links processed")
+        if status["state"] in ("COMPLETED", "FAILED", "CANCELLED") and len(results) >= status["completed"]:
+            break
+        # Only wait when there is nothing more to page through
+        if len(status["results"]) == 0:
+            time.sleep(config.JOB_POLL_INTERVAL)
+
+    progress.empty()
+    if status["state"] != "COMPLETED":
+        st.warning(f"Job {status['state'].lower()}: {status.get('error_message') or 'partial results shown'}")
+    return {"results": results}
+
 def download_pdfs_api(data_str: str) -> Optional[Dict[str, Any]]:
     """
     Download PDFs API call.
     
+    Runs as a background job on the backend so large batches are not
+    bound by the HTTP request timeout.
+    
     Args:
         data_str: JSON string of data containing PDF links
         
     Returns:
         API response or None on error
     """
-    with st.spinner("Downloading PDFs..."):
-        payload = _prepare_payload(data_str)
-        if payload:
-            return _make_api_request(config.DOWNLOAD_PDFS_ENDPOINT, payload)
-    return None 
\ No newline at end of file
+    payload = _prepare_payload(data_str)
+    if payload:
+        return _run_job(config.DOWNLOAD_JOBS_ENDPOINT, payload)
+    return None